@@ -0,0 +1,62 @@
+"""Browser startup benchmark: cold launch vs launch through the startup cache.
+
+Usage:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --browsers chrome firefox --launches 5
+
+Unlike run_benchmarks this needs the real browsers installed; browsers that
+fail to start are reported as unavailable. Cold launches let Selenium Manager
+resolve the driver and start from an empty temporary profile; cached launches
+use the stored binary paths and a copy of the pre-initialized profile.
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.config import Config
+from utils.driver_factory import DriverFactory
+
+
+def time_launches(browser, cached, launches):
+    """Median seconds from create_driver() to a usable session."""
+    Config.BROWSER = browser
+    Config.STARTUP_CACHE = cached
+    if cached:
+        # The first cached launch builds the template and resolves binaries
+        DriverFactory.quit_driver(DriverFactory.create_driver())
+
+    timings = []
+    for _ in range(launches):
+        started = time.perf_counter()
+        driver = DriverFactory.create_driver()
+        driver.get("about:blank")
+        timings.append(time.perf_counter() - started)
+        DriverFactory.quit_driver(driver)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_startup",
+                                     description="Compare cold and cached browser startup times.")
+    parser.add_argument("--browsers", nargs="+", default=["chrome", "firefox", "edge"])
+    parser.add_argument("--launches", type=int, default=3, help="Timed launches per mode")
+    args = parser.parse_args(argv)
+
+    Config.HEADLESS = True
+    print(f"{'browser':10} {'cold (s)':>10} {'cached (s)':>11} {'saved':>8}")
+    for browser in args.browsers:
+        try:
+            cold = time_launches(browser, False, args.launches)
+            cached = time_launches(browser, True, args.launches)
+        except (WebDriverException, ValueError, OSError) as error:
+            print(f"{browser:10} unavailable: {str(error).splitlines()[0] if str(error) else type(error).__name__}")
+            continue
+        print(f"{browser:10} {cold:10.2f} {cached:11.2f} {(1 - cached / cold) * 100:7.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""In-process stand-in for a Selenium WebDriver, used by the benchmarks.
+
+Elements are registered per locator with a scripted appearance time, and every
+command can be given an artificial latency to emulate a local or remote
+driver. The fake counts commands so benchmarks can report round trips per
+action, which is independent of the machine running them.
+"""
+import base64
+import time
+from collections import Counter
+
+from selenium.common.exceptions import NoSuchElementException
+
+from pages.element_cache import CACHED_ELEMENT_JS, READ_TEXT
+from pages.form_fill import FILL_FORM_JS, RESET_FORM_JS
+from utils.dom_wait import WAIT_JS
+from pages.page_snapshot import SNAPSHOT_JS
+from utils.js_locator import to_js_locator
+
+# 1x1 transparent PNG
+BLANK_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+
+class FakeElement:
+    def __init__(self, driver, key, text="", enabled=True, on_click=None):
+        self._driver = driver
+        self.key = key
+        self._text = text
+        self.value = ""
+        self.enabled = enabled
+        self.displayed = True
+        self.on_click = on_click
+
+    @property
+    def text(self):
+        self._driver._command("getElementText")
+        return self._text
+
+    def is_displayed(self):
+        self._driver._command("isElementDisplayed")
+        return self.displayed
+
+    def is_enabled(self):
+        self._driver._command("isElementEnabled")
+        return self.enabled
+
+    def click(self):
+        self._driver._command("clickElement")
+        if self.on_click:
+            self.on_click(self._driver)
+
+    def clear(self):
+        self._driver._command("clearElement")
+        self.value = ""
+
+    def send_keys(self, *values):
+        self._driver._command("sendKeysToElement")
+        self.value += "".join(values)
+
+    def get_attribute(self, name):
+        self._driver._command("getElementAttribute")
+        return self.value if name == "value" else None
+
+
+class FakeWebDriver:
+    """Scriptable fake driver.
+
+    latency: seconds slept per command (0 measures pure framework overhead).
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.commands = Counter()
+        self.current_url = "about:blank"
+        self.title = ""
+        self._elements = {}
+        self._appear_at = {}
+        self._implicit_wait = 0
+        # Bumped whenever elements are added or removed, like the page's MutationObserver count
+        self._dom_version = 0
+
+    #----------------------------------- Scripting -----------------------------------#
+
+    def add_element(self, locator, appear_after=0.0, **kwargs) -> FakeElement:
+        """Register an element that becomes visible `appear_after` seconds from now."""
+        key = tuple(to_js_locator(locator))
+        element = FakeElement(self, key, **kwargs)
+        self._elements[key] = element
+        self._appear_at[key] = time.monotonic() + appear_after
+        self._dom_version += 1
+        return element
+
+    def remove_element(self, locator) -> None:
+        key = tuple(to_js_locator(locator))
+        self._elements.pop(key, None)
+        self._appear_at.pop(key, None)
+        self._dom_version += 1
+
+    def reset_commands(self) -> None:
+        self.commands.clear()
+
+    def _command(self, name):
+        self.commands[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _lookup(self, key):
+        element = self._elements.get(key)
+        if element is None or time.monotonic() < self._appear_at[key]:
+            return None
+        return element
+
+    #----------------------------------- WebDriver API -----------------------------------#
+
+    def find_element(self, by, value):
+        self._command("findElement")
+        element = self._lookup(tuple(to_js_locator((by, value))))
+        if element is None:
+            raise NoSuchElementException(f"{by}={value}")
+        return element
+
+    def find_elements(self, by, value):
+        self._command("findElements")
+        element = self._lookup(tuple(to_js_locator((by, value))))
+        return [element] if element is not None else []
+
+    def execute_script(self, script, *args):
+        self._command("executeScript")
+        if script == SNAPSHOT_JS:
+            return self._snapshot(*args)
+        if script == FILL_FORM_JS:
+            return self._fill_form(*args)
+        if script == RESET_FORM_JS:
+            return self._reset_form(*args)
+        if script == CACHED_ELEMENT_JS:
+            return self._cached_element(*args)
+        return None
+
+    def execute_async_script(self, script, *args):
+        self._command("executeAsyncScript")
+        if script == WAIT_JS:
+            return self._wait_in_page(*args)
+        return None
+
+    def _wait_in_page(self, targets, timeout_ms):
+        """Answer the moment a target reaches its state, like the page's MutationObserver."""
+        deadline = time.monotonic() + timeout_ms / 1000
+        waited = False
+        while True:
+            for name, kind, query, state, text in targets:
+                element = self._lookup((kind, query))
+                visible = element is not None and element.displayed
+                if state == "present" and element is not None:
+                    return [name, element, waited]
+                if state in ("visible", "clickable") and visible and (state == "visible" or element.enabled):
+                    return [name, element, waited]
+                if state == "text" and element is not None and text in element._text:
+                    return [name, element, waited]
+                if state == "absent" and element is None or state == "hidden" and not visible:
+                    return [name, None, waited]
+            now = time.monotonic()
+            pending = [self._appear_at[(kind, query)] for _, kind, query, _, _ in targets
+                       if self._appear_at.get((kind, query), 0) > now]
+            if now >= deadline:
+                return None
+            time.sleep(max(0.0, min(pending + [deadline]) - now))
+            waited = True
+
+    def _cached_element(self, element, version, kind, query, read):
+        if not element.displayed or self._lookup((kind, query)) is not element:
+            return None
+        if read == READ_TEXT:
+            value = element._text
+        elif read == "disabled":
+            value = None if element.enabled else "true"
+        else:
+            value = element.value if read == "value" else None
+        return [str(self._dom_version), value]
+
+    def _reset_form(self, path, fields, stale):
+        inputs = [self._lookup(tuple(field)) for field in fields]
+        if path not in self.current_url or any(element is None for element in inputs):
+            return False
+        for kind, query in stale:
+            self._elements.pop((kind, query), None)
+        self._dom_version += 1
+        for element in inputs:
+            element.value = ""
+        return True
+
+    def _fill_form(self, fields):
+        skipped = []
+        for index, (kind, query, value) in enumerate(fields):
+            element = self._lookup((kind, query))
+            if element is None or not element.displayed or not element.enabled:
+                skipped.append(index)
+            else:
+                element.value = value
+        return skipped
+
+    def _snapshot(self, targets, attributes):
+        result = {}
+        for name, kind, query in targets:
+            element = self._lookup((kind, query))
+            state = {"count": 0, "visible": False, "text": None, "attributes": {}}
+            if element is not None:
+                state = {"count": 1, "visible": element.displayed,
+                         "text": element._text if element.displayed else "",
+                         "attributes": {attribute: element.value if attribute == "value" else None
+                                        for attribute in attributes}}
+            result[name] = state
+        return result
+
+    def get(self, url):
+        self._command("get")
+        self.current_url = url
+
+    def refresh(self):
+        self._command("refresh")
+
+    def maximize_window(self):
+        self._command("maximizeWindow")
+
+    def implicitly_wait(self, seconds):
+        self._command("setTimeouts")
+        self._implicit_wait = seconds
+
+    def get_screenshot_as_base64(self):
+        self._command("takeScreenshot")
+        return base64.b64encode(BLANK_PNG).decode("ascii")
+
+    def get_screenshot_as_png(self):
+        return base64.b64decode(self.get_screenshot_as_base64())
+
+    def quit(self):
+        self._command("quit")
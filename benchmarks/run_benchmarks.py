@@ -0,0 +1,352 @@
+"""Browser-free benchmarks for the page-object and wait layers.
+
+Usage:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --filter login --latency 2
+    python -m benchmarks.run_benchmarks --fail-on-regression
+
+Every benchmark runs against FakeWebDriver, so no browser or network is
+needed. Two numbers are reported per action:
+  - us/op:   wall time per action (framework overhead when --latency is 0)
+  - cmds/op: WebDriver commands (round trips) per action, which does not
+             depend on the machine and catches accidental extra calls
+
+Results are appended to benchmarks/results/history.jsonl together with the
+current git commit, and compared with the last run recorded for a
+different commit.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from pages.form_fill import FILL_JS
+from pages.base_page import BasePage
+from pages.login_page import LoginPage
+from pages.new_base_page import BasePage as NewBasePage
+from utils.config import Config
+from utils.wait_helper import WaitHelper
+
+HISTORY_FILE = Path(__file__).resolve().parent / "results" / "history.jsonl"
+
+BENCHMARKS = {}
+
+
+def benchmark(name, iterations=200):
+    """Register a benchmark. The decorated function gets a driver and returns the action to time."""
+    def register(setup):
+        BENCHMARKS[name] = (setup, iterations)
+        return setup
+    return register
+
+
+def build_login_page(driver, outcome=LoginPage.OUTCOME_ERROR, render_delay=0.0):
+    """Script the OrangeHRM login form on a fake driver."""
+    def submit(fake):
+        locator = LoginPage.DASHBOARD_HEADER if outcome == LoginPage.OUTCOME_SUCCESS else LoginPage.ERROR_MESSAGE
+        fake.add_element(locator, appear_after=render_delay, text="Invalid credentials")
+
+    for locator in (LoginPage.LOGIN_LOGO, LoginPage.USERNAME_INPUT, LoginPage.PASSWORD_INPUT,
+                    LoginPage.FORGOT_PASSWORD_LINK):
+        driver.add_element(locator)
+    driver.add_element(LoginPage.LOGIN_BUTTON, on_click=submit)
+    return LoginPage(driver)
+
+
+#----------------------------------- Element actions -----------------------------------#
+
+LOCATOR = LoginPage.USERNAME_INPUT
+
+
+def register_element_actions(page_class, prefix):
+    """Same actions for both BasePage implementations."""
+    @benchmark(f"{prefix}.find_element")
+    def _find_element(driver):
+        driver.add_element(LOCATOR)
+        page = page_class(driver)
+        return lambda: page.find_element(LOCATOR)
+
+    @benchmark(f"{prefix}.click")
+    def _click(driver):
+        driver.add_element(LOCATOR)
+        page = page_class(driver)
+        return lambda: page.click(LOCATOR, "field")
+
+    @benchmark(f"{prefix}.enter_text")
+    def _enter_text(driver):
+        driver.add_element(LOCATOR)
+        page = page_class(driver)
+        return lambda: page.enter_text(LOCATOR, "Admin", "field")
+
+    @benchmark(f"{prefix}.is_element_visible")
+    def _is_element_visible(driver):
+        driver.add_element(LOCATOR)
+        page = page_class(driver)
+        return lambda: page.is_element_visible(LOCATOR)
+
+
+register_element_actions(BasePage, "base_page")
+register_element_actions(NewBasePage, "new_base_page")
+
+
+@benchmark("base_page.is_element_absent")
+def _is_element_absent(driver):
+    page = BasePage(driver)
+    return lambda: page.is_element_absent(LoginPage.ERROR_MESSAGE)
+
+
+@benchmark("base_page.enter_text_js")
+def _enter_text_js(driver):
+    driver.add_element(LOCATOR)
+    page = BasePage(driver)
+    page.fill_strategy = FILL_JS
+    return lambda: page.enter_text(LOCATOR, "Admin", "field")
+
+
+@benchmark("base_page.get_element_text")
+def _get_element_text(driver):
+    driver.add_element(LOCATOR, text="Admin")
+    page = BasePage(driver)
+    return lambda: page.get_element_text(LOCATOR)
+
+
+@benchmark("base_page.get_element_text_cached")
+def _get_element_text_cached(driver):
+    driver.add_element(LOCATOR, text="Admin")
+    page = BasePage(driver)
+    page.element_cache = True
+    return lambda: page.get_element_text(LOCATOR)
+
+
+@benchmark("base_page.click_cached")
+def _click_cached(driver):
+    driver.add_element(LOCATOR)
+    page = BasePage(driver)
+    page.element_cache = True
+    return lambda: page.click(LOCATOR, "button")
+
+
+@benchmark("base_page.enter_text_cached")
+def _enter_text_cached(driver):
+    driver.add_element(LOCATOR)
+    page = BasePage(driver)
+    page.element_cache = True
+    return lambda: page.enter_text(LOCATOR, "Admin", "field")
+
+
+@benchmark("base_page.snapshot")
+def _snapshot(driver):
+    page = build_login_page(driver)
+    return lambda: page.get_state()
+
+
+#----------------------------------- Wait conditions -----------------------------------#
+
+@benchmark("wait.visible")
+def _wait_visible(driver):
+    driver.add_element(LOCATOR)
+    return lambda: WaitHelper.wait_for_element_visible(driver, LOCATOR)
+
+
+@benchmark("wait.clickable")
+def _wait_clickable(driver):
+    driver.add_element(LOCATOR)
+    return lambda: WaitHelper.wait_element_clickable(driver, LOCATOR)
+
+
+@benchmark("wait.any")
+def _wait_any(driver):
+    driver.add_element(LoginPage.ERROR_MESSAGE)
+    return lambda: WaitHelper.wait_for_any(driver, LoginPage.LOGIN_OUTCOMES)
+
+
+@benchmark("wait.absent")
+def _wait_absent(driver):
+    return lambda: WaitHelper.wait_for_element_absent(driver, LoginPage.ERROR_MESSAGE)
+
+
+@benchmark("wait.visible_after_50ms", iterations=3)
+def _wait_visible_delayed(driver):
+    """Time from the element rendering to the wait returning (poll dead time)."""
+    def action():
+        driver.add_element(LOCATOR, appear_after=0.05)
+        WaitHelper.wait_for_element_visible(driver, LOCATOR)
+        driver.remove_element(LOCATOR)
+    return action
+
+
+@benchmark("wait.visible_after_50ms_observer", iterations=3)
+def _wait_visible_delayed_observer(driver):
+    """Same as wait.visible_after_50ms with WAIT_BACKEND=observer."""
+    def action():
+        driver.add_element(LOCATOR, appear_after=0.05)
+        backend, Config.WAIT_BACKEND = Config.WAIT_BACKEND, "observer"
+        try:
+            WaitHelper.wait_for_element_visible(driver, LOCATOR)
+        finally:
+            Config.WAIT_BACKEND = backend
+        driver.remove_element(LOCATOR)
+    return action
+
+
+#----------------------------------- Full scenarios -----------------------------------#
+
+@benchmark("login.failed_scenario", iterations=50)
+def _login_failed(driver):
+    page = build_login_page(driver, LoginPage.OUTCOME_ERROR)
+
+    def action():
+        page.open()
+        page.login("Admin", "wrongpass")
+        assert page.is_error_message_displayed()
+        driver.remove_element(LoginPage.ERROR_MESSAGE)
+    return action
+
+
+@benchmark("login.successful_scenario", iterations=50)
+def _login_successful(driver):
+    page = build_login_page(driver, LoginPage.OUTCOME_SUCCESS)
+
+    def action():
+        page.open()
+        page.login("Admin", "admin123")
+        assert page.is_login_successful()
+        driver.remove_element(LoginPage.DASHBOARD_HEADER)
+    return action
+
+
+@benchmark("login.failed_scenario_js_fill", iterations=50)
+def _login_failed_js_fill(driver):
+    page = build_login_page(driver, LoginPage.OUTCOME_ERROR)
+    page.fill_strategy = FILL_JS
+
+    def action():
+        page.open()
+        page.login("Admin", "wrongpass")
+        assert page.is_error_message_displayed()
+        driver.remove_element(LoginPage.ERROR_MESSAGE)
+    return action
+
+
+@benchmark("login.outline_row_reset_in_place", iterations=50)
+def _login_outline_row(driver):
+    """Failed login where the previous outline row's page is reset instead of reopened."""
+    page = build_login_page(driver, LoginPage.OUTCOME_ERROR)
+    page.url = Config.BASE_URL + LoginPage.LOGIN_PATH
+    page.open()
+
+    def action():
+        assert page.reset_form()
+        page.login("Admin", "wrongpass")
+        assert page.is_error_message_displayed()
+    return action
+
+
+#----------------------------------- Runner -----------------------------------#
+
+def run_benchmark(name, latency, repeats):
+    setup, iterations = BENCHMARKS[name]
+    driver = FakeWebDriver(latency=latency)
+    action = setup(driver)
+    action()  # warm-up
+
+    timings = []
+    driver.reset_commands()
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            action()
+        timings.append((time.perf_counter() - started) / iterations)
+    commands = sum(driver.commands.values()) / (iterations * repeats)
+    return {"us_per_op": round(statistics.median(timings) * 1e6, 2), "cmds_per_op": round(commands, 2)}
+
+
+def current_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_baseline(commit, latency_ms):
+    """Most recent history entry recorded for another commit with the same latency."""
+    if not HISTORY_FILE.is_file():
+        return None
+    baseline = None
+    for line in HISTORY_FILE.read_text(encoding="utf-8").splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if entry.get("commit") != commit and entry.get("latency_ms") == latency_ms:
+            baseline = entry
+    return baseline
+
+
+def find_regressions(results, baseline, threshold, commands_only=False):
+    """Names whose time grew by more than `threshold` or that issue more commands."""
+    regressions = []
+    for name, result in results.items():
+        previous = (baseline or {}).get("results", {}).get(name)
+        if not previous:
+            continue
+        slower = not commands_only and result["us_per_op"] > previous["us_per_op"] * (1 + threshold) \
+            and result["us_per_op"] - previous["us_per_op"] > 5
+        if slower or result["cmds_per_op"] > previous["cmds_per_op"]:
+            regressions.append(name)
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run_benchmarks",
+                                     description="Benchmark the page-object and wait layers without a browser.")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated ms per WebDriver command")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed repetitions per benchmark")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as regression")
+    parser.add_argument("--commands-only", action="store_true",
+                        help="Only count extra WebDriver commands as regressions (stable on shared CI runners)")
+    parser.add_argument("--no-save", action="store_true", help="Do not append results to the history file")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with 1 when a regression is found")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    latency = args.latency / 1000
+    commit = current_commit()
+    baseline = load_baseline(commit, args.latency)
+
+    results = {}
+    print(f"{'benchmark':36} {'us/op':>12} {'cmds/op':>8} {'baseline':>12}")
+    for name in BENCHMARKS:
+        if args.filter not in name:
+            continue
+        results[name] = run_benchmark(name, latency, args.repeats)
+        previous = (baseline or {}).get("results", {}).get(name, {}).get("us_per_op")
+        print(f"{name:36} {results[name]['us_per_op']:12.1f} {results[name]['cmds_per_op']:8.1f} "
+              f"{previous if previous is not None else '-':>12}")
+
+    regressions = find_regressions(results, baseline, args.threshold, args.commands_only)
+    if baseline:
+        print(f"\nCompared with commit {baseline['commit']}: "
+              + (f"{len(regressions)} regression(s): {', '.join(regressions)}" if regressions else "no regressions"))
+
+    if not args.no_save:
+        HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"commit": commit, "timestamp": time.time(), "python": platform.python_version(),
+                 "latency_ms": args.latency, "results": results}
+        with open(HISTORY_FILE, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry) + "\n")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
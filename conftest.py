@@ -2,7 +2,7 @@ import pytest
 from utils.driver_factory import DriverFactory
 
 
-@pytest.fixture(scope="Session")
+@pytest.fixture(scope="session")
 def driver():
     """Fixture to initialize and quit the WebDriver."""
     print("\n🚀 Launching the browser ...")
@@ -47,4 +47,16 @@ Feature: OrangeHRM Login functionality
             | invalidUser1    | invalidPass1    |
             | invalidUser2    | invalidPass2    |
             | invalidUser3    | invalidPass3    |
-            | Admin           | wrongpass       |
\ No newline at end of file
+            | Admin           | wrongpass       |
+
+    @performance
+    Scenario: Login page loads within the performance budget
+        Then the login page should load within 5 seconds
+
+    @performance
+    Scenario: Dashboard loads within the performance budget after login
+        When I enter valid username "admin"
+        And I enter valid password "admin123"
+        And I click on the login button
+        Then I should be redirected to the dashboard page
+        And the dashboard should load within 5 seconds
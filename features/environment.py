@@ -55,8 +55,19 @@
 #     print("🏁 Test Execution Completed")
 #     print("="*50)
 
-from utils.driver_factory import DriverFactory
+import time
+
+from behave.model import ScenarioOutline
+
+from utils.driver_factory import DriverFactory, DriverPool, DriverPrewarmer
+from utils.attachment_writer import attachment_writer
 from utils.config import Config
+from utils.page_metrics import page_metrics_log
+from utils.profiler import profiler
+from utils.replay_server import MODE_OFF, REPLAY_MODES, ReplayServer
+from utils.scenario_history import ScenarioHistory, scenario_location
+from utils.wait_stats import wait_stats
+from utils.session_cache import SessionCache
 
 print("✅ environment.py: Imports successful")  # Debug line
 
@@ -66,19 +77,141 @@ def before_all(context):
     print("\n" + "="*50)
     print("🚀 Starting Test Execution")
     print("="*50)
+    
+    # Recorded stand-in for the application (REPLAY_MODE=record|replay), before anything reads BASE_URL
+    if Config.REPLAY_MODE not in REPLAY_MODES:
+        raise ValueError(f"Unsupported replay mode: {Config.REPLAY_MODE}")
+    context.replay_server = ReplayServer() if Config.REPLAY_MODE != MODE_OFF else None
+    if context.replay_server:
+        Config.BASE_URL = context.replay_server.start()
+        print(f"🎞️  {Config.REPLAY_MODE.capitalize()} mode: {context.replay_server.upstream} at {Config.BASE_URL}")
+    
+    # Spare browsers start in the background while scenarios run
+    context.driver_prewarmer = DriverPrewarmer() if Config.PREWARM_DEPTH > 0 else None
+    if context.driver_prewarmer:
+        context.driver_prewarmer.start()
+    
+    # Warm browsers are shared between scenarios unless the pool is disabled
+    context.driver_pool = DriverPool(prewarmer=context.driver_prewarmer) if Config.DRIVER_POOL else None
+    
+    # Logged-in sessions are shared on disk between scenarios and workers
+    context.session_cache = SessionCache()
+    
+    # Driver and pages handed from one Scenario Outline row to the next (see _carry_to_next_row)
+    context.outline_carry = {}
+    
+    # Durations/outcomes of earlier runs decide the order (SCENARIO_ORDER), this run is recorded
+    context.scenario_history = ScenarioHistory() if Config.SCENARIO_HISTORY else None
+    if context.scenario_history:
+        # behave has no public API for the parsed features; keep the file order without it
+        features = getattr(getattr(context, "_runner", None), "features", None)
+        if features is not None:
+            context.scenario_history.reorder(features)
+        elif Config.SCENARIO_ORDER != "file":
+            print(f"⚠️  SCENARIO_ORDER={Config.SCENARIO_ORDER} ignored: behave does not expose its features")
+
+
+# Page objects the Background steps keep on the context. Between consecutive
+# Scenario Outline rows they are reset in place instead of being reloaded.
+RESETTABLE_PAGES = ("login_page",)
+
+
+def _is_isolated(scenario):
+    """Scenarios tagged with Config.ISOLATION_TAG always get a brand-new browser."""
+    return Config.ISOLATION_TAG in scenario.effective_tags
+
+
+def _next_outline_row(scenario):
+    """The Examples row generated right after `scenario`, or None."""
+    for outline in scenario.feature.scenarios:
+        if isinstance(outline, ScenarioOutline) and scenario in outline.scenarios:
+            rows = outline.scenarios
+            index = rows.index(scenario)
+            return rows[index + 1] if index + 1 < len(rows) else None
+    return None
+
+
+def _carry_to_next_row(context, scenario) -> bool:
+    """Keep the driver and page objects for the next row of the same outline.
+
+    Only a passed, non-isolated row hands over, and only when its next row
+    shares the Background and has pages that know how to reset themselves.
+    """
+    if not Config.OUTLINE_RESET or scenario.status != "passed" or _is_isolated(scenario):
+        return False
+    next_row = _next_outline_row(scenario)
+    if next_row is None or _is_isolated(next_row):
+        return False
+    pages = {name: getattr(context, name) for name in RESETTABLE_PAGES
+             if hasattr(getattr(context, name, None), "reset_form")}
+    if not pages:
+        return False
+    context.outline_carry.update(next_row=next_row, driver=context.driver, pages=pages)
+    return True
+
+
+def _take_carried_driver(context, scenario):
+    """Driver carried over from the previous outline row, or None.
+
+    The carried pages are reset in place; if any cannot be, the driver state
+    is wiped as the pool would and the Background navigates as usual.
+    """
+    carry = dict(context.outline_carry)
+    context.outline_carry.clear()
+    driver = carry.get("driver")
+    if driver is None:
+        return None
+    if carry["next_row"] is not scenario:
+        # The next row was filtered out; hand the driver back as usual
+        _release_driver(context, driver)
+        return None
+    
+    if all(page.reset_form() for page in carry["pages"].values()):
+        for name, page in carry["pages"].items():
+            setattr(context, name, page)
+        context.page_reset_in_place = True
+        return driver
+    if DriverPool.reset_driver(driver):
+        return driver
+    _release_driver(context, driver, discard=True)
+    return None
+
+
+def _release_driver(context, driver, discard=False):
+    """Close the browser, or hand it back to the pool for the next scenario."""
+    if context.driver_pool:
+        context.driver_pool.release(driver, discard=discard)
+    else:
+        # use DriverFactory.quit_driver which exists
+        DriverFactory.quit_driver(driver)
 
 
 def before_scenario(context, scenario):
     """Runs before each scenario"""
     print(f"\n▶️  Starting Scenario: {scenario.name}")
-    print("Creating driver...")  # Debug line
-    
-    # Create WebDriver instance
-    context.driver = DriverFactory.create_driver()
-    print("Driver created successfully")  # Debug line
+    context.scenario_started = time.perf_counter()
+    page_metrics_log.start_scenario(scenario.name)
     
-    context.driver.maximize_window()
-    print("Window maximized")  # Debug line
+    # Next row of the same outline: keep the browser and the page on screen
+    context.page_reset_in_place = False
+    carried = _take_carried_driver(context, scenario)
+    if carried is not None:
+        context.driver = carried
+        print("♻️  Reusing the previous outline row's browser")
+    else:
+        print("Creating driver...")  # Debug line
+        
+        # Create WebDriver instance (or reuse a warm one from the pool)
+        if context.driver_pool:
+            context.driver = context.driver_pool.acquire(fresh=_is_isolated(scenario))
+        elif context.driver_prewarmer:
+            context.driver = context.driver_prewarmer.take()
+        else:
+            context.driver = DriverFactory.create_driver()
+        print("Driver created successfully")  # Debug line
+        
+        context.driver.maximize_window()
+        print("Window maximized")  # Debug line
     
     # Store config under a different attribute name to avoid clashing with behave's internal 'config'
     print("Setting context.config_obj...")  # Debug line
@@ -86,6 +219,18 @@ def before_scenario(context, scenario):
     print(f"context.config_obj set to: {context.config_obj}")  # Debug line
 
 
+def before_step(context, step):
+    """Runs before each step"""
+    profiler.start_step(f"{step.keyword} {step.name}")
+
+
+def after_step(context, step):
+    """Runs after each step"""
+    profiler.end_step()
+    # The allure step is still open here, so background screenshots attach to it
+    attachment_writer.attach_pending()
+
+
 def after_scenario(context, scenario):
     """Runs after each scenario"""
     if scenario.status == "failed":
@@ -93,14 +238,51 @@ def after_scenario(context, scenario):
     else:
         print(f"✅ Scenario Passed: {scenario.name}")
     
-    # Close browser
-    if hasattr(context, 'driver'):
-        # use DriverFactory.quit_driver which exists
-        DriverFactory.quit_driver(context.driver)
+    attachment_writer.attach_pending()
+    
+    if Config.ASSET_CACHE and hasattr(context, 'driver'):
+        DriverFactory.asset_cache.sample(context.driver)
+    
+    # Close browser, or hand it back to the pool (or to the next outline row)
+    if hasattr(context, 'driver') and not _carry_to_next_row(context, scenario):
+        _release_driver(context, context.driver, discard=_is_isolated(scenario))
+    
+    if context.scenario_history and scenario.status in ("passed", "failed", "error"):
+        context.scenario_history.record(scenario_location(scenario), scenario.status.name,
+                                        time.perf_counter() - context.scenario_started)
 
 
 def after_all(context):
     """Runs once after all tests"""
+    carried = getattr(context, 'outline_carry', {}).get("driver")
+    if carried is not None:
+        DriverFactory.quit_driver(carried)
+    if getattr(context, 'driver_pool', None):
+        context.driver_pool.shutdown()
+    if getattr(context, 'driver_prewarmer', None):
+        context.driver_prewarmer.shutdown()
+        print(context.driver_prewarmer.summary())
+    # Only quits the shared browser if this process launched it (BROWSER_CONTEXTS)
+    DriverFactory.browser_host.shutdown()
+    if Config.ASSET_CACHE:
+        print(DriverFactory.asset_cache.summary())
+    # After the drivers are gone, so the recording is complete
+    if getattr(context, 'replay_server', None):
+        context.replay_server.stop()
+        print(context.replay_server.summary())
+    
+    profiler.write_report()
+    wait_stats.flush()
+    if page_metrics_log.written:
+        print(f"📈 {page_metrics_log.summary()}")
+    
+    if getattr(context, 'scenario_history', None):
+        context.scenario_history.prune()
+        context.scenario_history.close()
+    
+    # Stop the screenshot worker and remove its temporary files
+    attachment_writer.close()
+    
     print("\n" + "="*50)
     print("🏁 Test Execution Completed")
     print("="*50)
\ No newline at end of file
@@ -109,6 +109,7 @@
 
 from behave import given, when, then
 from pages.login_page import LoginPage
+from utils.config import Config
 import allure
 
 
@@ -122,11 +123,40 @@ def step_impl_given_on_login_page(context):
     Args:
         context: Behave context object containing driver
     """
+    if context.page_reset_in_place:
+        # Next Scenario Outline row: environment.py already reset the form in place
+        return
     context.login_page = LoginPage(context.driver)
     context.login_page.open()
     assert context.login_page.is_login_page_displayed(), "Login page not loaded"
 
 
+@given('I am logged in as "{username}" with password "{password}"')
+def step_impl_given_logged_in_with_password(context, username, password):
+    """
+    Start the scenario on the dashboard, logging in through the UI only when
+    no valid cached session exists for these credentials
+    """
+    context.session_cache.login(context.driver, username, password)
+    context.login_page = LoginPage(context.driver)
+
+
+# Registered after the "with password" variant: behave rejects a new step
+# whose text an already registered pattern matches
+@given('I am logged in as "{username}"')
+def step_impl_given_logged_in_as(context, username):
+    """
+    Start the scenario on the dashboard using a cached session
+    
+    Args:
+        context: Behave context
+        username: Configured user (Config.USERNAME) to log in as
+    """
+    assert username.lower() == Config.USERNAME.lower(), \
+        f"No password configured for user '{username}', use the 'with password' step"
+    step_impl_given_logged_in_with_password(context, username, Config.PASSWORD)
+
+
 # ==================== WHEN STEPS (Actions) ====================
 
 @when('I enter valid username "{username}"')
@@ -324,9 +354,7 @@ def step_impl_verify_forgot_password_link(context):
     """
     Verify forgot password link is visible
     """
-    assert context.login_page.is_element_visible(
-        context.login_page.FORGOT_PASSWORD_LINK
-    ), "Forgot password link not visible"
+    assert context.login_page.is_forgot_password_link_displayed(), "Forgot password link not visible"
 
 
 @then('I should be redirected to password reset page')
@@ -336,4 +364,23 @@ def step_impl_verify_password_reset_page(context):
     """
     current_url = context.login_page.get_current_url()
     assert "requestPasswordResetCode" in current_url, \
-        f"Not on password reset page. Current URL: {current_url}"
\ No newline at end of file
+        f"Not on password reset page. Current URL: {current_url}"
+
+# ==================== PERFORMANCE BUDGETS ====================
+
+@then('the login page should load within {seconds:g} seconds')
+def step_impl_verify_login_page_load_time(context, seconds):
+    """
+    Fail on a performance regression: the login page's load event (Navigation Timing)
+    must fire within the budget. Use right after the Background navigation.
+    """
+    context.login_page.assert_load_within(seconds, "login page")
+
+
+@then('the dashboard should load within {seconds:g} seconds')
+def step_impl_verify_dashboard_load_time(context, seconds):
+    """
+    Fail on a performance regression: the dashboard reached after login
+    (redirect included) must load within the budget
+    """
+    context.login_page.assert_load_within(seconds, "dashboard")
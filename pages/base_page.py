@@ -1,14 +1,25 @@
+import json
 import logging
-from typing import Any
+from contextlib import contextmanager
+from typing import Any, Optional
 
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import (TimeoutException, NoSuchElementException, WebDriverException,
+                                        StaleElementReferenceException, ElementNotInteractableException,
+                                        ElementClickInterceptedException)
 
+from pages.element_cache import CACHED_ELEMENT_JS, READ_TEXT
+from pages.form_fill import FILL_FORM_JS, FILL_JS, FILL_STRATEGIES, RESET_FORM_JS
+from pages.page_snapshot import PageSnapshot, SNAPSHOT_JS
+from utils.attachment_writer import attachment_writer
 from utils.config import Config
+from utils.dom_wait import SCRIPT_TIMEOUT, SCRIPT_TIMEOUT_MARGIN
+from utils.js_locator import to_js_locator
+from utils.page_metrics import ARM_JS, METRICS_JS, load_seconds, page_metrics_log
 from utils.wait_helper import WaitHelper
 
 import allure
@@ -20,16 +31,39 @@ logger = logging.getLogger(__name__)
 class BasePage:
     """Base class that provides common methods for all page objects."""
     
+    # {name: locator} read by snapshot() when no locators are given
+    SNAPSHOT_LOCATORS = {}
+    
+    # Locators always filled with real keystrokes, even with FILL_STRATEGY=js
+    # (fields with key handlers, masks or autocomplete)
+    KEYSTROKE_SENSITIVE = frozenset()
+    
     def __init__(self, driver: WebDriver) -> None:
         self.driver = driver
         self.wait_helper = WaitHelper()
+        self.fill_strategy = Config.FILL_STRATEGY
+        if self.fill_strategy not in FILL_STRATEGIES:
+            raise ValueError(f"Unsupported FILL_STRATEGY: {self.fill_strategy}")
+        
+        # Opt-in locator -> WebElement cache, checked against the page's DOM version (see _cached_element)
+        self.element_cache = Config.ELEMENT_CACHE
+        self._elements = {}
+        self._clicks = 0
+        
+        # Opt-in client-side metrics after navigations and measured actions (see capture_metrics)
+        self.metrics_enabled = Config.PERF_METRICS
+        self.navigation_metrics = None
+        self.last_metrics = None
         
     
     #----------------------------------- NAVIGATION METHODS -----------------------------------#
-    def navigate_to_url(self, url: str) -> str:
+    def navigate_to_url(self, url: str, label=None) -> str:
         with allure.step(f"Navigating to URL: {url}"):
             logger.info(f"Navigating to URL: {url}")
             self.driver.get(url)
+            self.invalidate_elements()
+            if self.metrics_enabled:
+                self.navigation_metrics = self.capture_metrics(label or url)
             
     def get_current_url(self) -> str:
         return self.driver.current_url
@@ -44,11 +78,10 @@ class BasePage:
         
         try:
             element = self.wait_helper.wait_for_element_visible(self.driver, locator)
+            self._remember(locator, element)
             return element
         except TimeoutException:
-            allure.attach(self.driver.get_screenshot_as_png(),
-                          name="Element_not_found",
-                          attachment_type=allure.attachment_type.PNG)
+            attachment_writer.attach_screenshot(self.driver, name="Element_not_found")
             raise NoSuchElementException(f"Element with locator {locator} not found on the page.")
         
         
@@ -58,25 +91,195 @@ class BasePage:
     
     def click(self, locator, element_name="element"):
         with allure.step(f"Clicking on : {element_name} with locator: {locator}"):
-            element = self.wait_helper.wait_element_clickable(self.driver, locator)
-            element.click()
+            if not self._click_cached(locator):
+                element = self.wait_helper.wait_element_clickable(self.driver, locator)
+                self._remember(locator, element)
+                element.click()
+            # A click may navigate or re-render the page: cached elements are checked before their next use
+            self._clicks += 1
             
     def enter_text(self, locator, text, element_name="field"):
         with allure.step(f"Entering : '{text}' into : {element_name} with locator: {locator}"):
-            element = self.find_element(locator)
+            if self._fills_with_js(locator):
+                self._fill_with_js({locator: text})
+            else:
+                self._type_text(locator, text)
+                
+    def fill_form(self, fields) -> None:
+        """Fill several fields, {locator: value}.
+
+        With FILL_STRATEGY=js every field not in KEYSTROKE_SENSITIVE is set in a
+        single round trip; the rest are typed one by one.
+        """
+        with allure.step(f"Filling {len(fields)} field(s)"):
+            scripted = {locator: text for locator, text in fields.items() if self._fills_with_js(locator)}
+            if scripted:
+                self._fill_with_js(scripted)
+            for locator, text in fields.items():
+                if locator not in scripted:
+                    self._type_text(locator, text)
+                    
+    def reset_form_in_place(self, path, fields, stale=()) -> bool:
+        """Clear `fields` and remove `stale` elements without reloading the page.
+
+        Only done when the current URL path contains `path` and every field is
+        visible; returns False otherwise so the caller can navigate instead.
+        """
+        try:
+            return bool(self.driver.execute_script(RESET_FORM_JS, path,
+                                                   [to_js_locator(locator) for locator in fields],
+                                                   [to_js_locator(locator) for locator in stale]))
+        except WebDriverException:
+            return False
+        
+    def _fills_with_js(self, locator) -> bool:
+        return self.fill_strategy == FILL_JS and locator not in self.KEYSTROKE_SENSITIVE
+    
+    def _fill_with_js(self, fields) -> None:
+        """Set the values through JavaScript; fields not ready yet are waited for and typed."""
+        locators = list(fields)
+        payload = [[*to_js_locator(locator), "" if fields[locator] is None else str(fields[locator])]
+                   for locator in locators]
+        skipped = self.driver.execute_script(FILL_FORM_JS, payload) or []
+        for index in skipped:
+            self._type_text(locators[index], fields[locators[index]])
+            
+    def _type_text(self, locator, text) -> None:
+        def type_into(element):
             element.clear()
             element.send_keys(text)
+        self._interact(locator, type_into)
             
     def get_element_text(self, locator) -> str:
-            element = self.find_element(locator)
-            return element.text
+        found, text = self._read_cached(locator, READ_TEXT)
+        return text if found else self.find_element(locator).text
         
     def get_attribute(self, locator, attribute_name) -> Any:
-        element = self.find_element(locator)
-        return element.get_attribute(attribute_name)
+        found, value = self._read_cached(locator, attribute_name)
+        return value if found else self.find_element(locator).get_attribute(attribute_name)
+    
+    #----------------------------------- Element Cache -----------------------------------#
+    
+    def invalidate_elements(self) -> None:
+        """Drop every cached element: they are looked up again on next use.
+
+        Called on navigation and refresh. Other changes to the page are
+        caught by the DOM-version check in _cached_element.
+        """
+        self._elements.clear()
+        
+    def _probe(self, locator, read=None):
+        """Check the cached element in the page (CACHED_ELEMENT_JS): (True, value) or (False, None).
+
+        One round trip that also reads `read` (READ_TEXT or an attribute
+        name). The element must be visible and, if any node was added or
+        removed since the last check, still be the first match of the locator.
+        """
+        version, _, element = self._elements[locator]
+        try:
+            result = self.driver.execute_script(CACHED_ELEMENT_JS, element, version, *to_js_locator(locator), read)
+        except WebDriverException:
+            # Stale reference: the element left the page
+            result = None
+        if result is None:
+            self._elements.pop(locator, None)
+            return False, None
+        self._elements[locator] = (result[0], self._clicks, element)
+        return True, result[1]
+        
+    def _cached_element(self, locator):
+        """Element found earlier and still valid, or None (cache disabled or miss).
+
+        Interactions check visibility themselves (WebDriver refuses to click
+        or type into hidden elements), so the element is only probed when a
+        click happened since it was last checked.
+        """
+        if not self.element_cache or locator not in self._elements:
+            return None
+        if self._elements[locator][1] != self._clicks and not self._probe(locator)[0]:
+            return None
+        return self._elements[locator][2]
+    
+    def _read_cached(self, locator, read):
+        """(True, value) read from the cached element in one round trip, else (False, None)."""
+        if not self.element_cache or locator not in self._elements:
+            return False, None
+        return self._probe(locator, read)
+    
+    def _remember(self, locator, element) -> None:
+        if self.element_cache:
+            self._elements[locator] = (None, self._clicks, element)
+            
+    def _click_cached(self, locator) -> bool:
+        """Click the cached element; False when there is none or it cannot take the click.
+
+        A click can land on whatever now covers the element, so unlike typing
+        the element is always probed first, and must be clickable like in
+        wait_element_clickable: visible (the probe) and not disabled, read in
+        the same round trip.
+        """
+        if not self.element_cache or locator not in self._elements:
+            return False
+        found, disabled = self._probe(locator, "disabled")
+        if not found or disabled:
+            # A disabled element is left to the regular path, which waits for it
+            return False
+        try:
+            self._elements[locator][2].click()
+            return True
+        except (StaleElementReferenceException, ElementNotInteractableException,
+                ElementClickInterceptedException):
+            self._elements.pop(locator, None)
+            return False
+            
+    def _interact(self, locator, action):
+        """Run `action(element)`, reusing a cached element when there is one.
+
+        A cached element that went stale or stopped being interactable (the
+        DOM changed under it) is dropped and the element looked up again, so
+        callers never see the cache.
+        """
+        element = self._cached_element(locator)
+        if element is not None:
+            try:
+                return action(element)
+            except (StaleElementReferenceException, ElementNotInteractableException):
+                self._elements.pop(locator, None)
+        return action(self.find_element(locator))
     
     #----------------------------------- Element State -----------------------------------#
     
+    def snapshot(self, locators=None, attributes=()) -> PageSnapshot:
+        """Read visibility, text and attributes of many elements in one round trip.
+
+        locators: {name: locator}; defaults to the page's SNAPSHOT_LOCATORS.
+        attributes: attribute/property names to read from each element.
+        No waiting is done: the snapshot reflects the page right now.
+        """
+        locators = self.SNAPSHOT_LOCATORS if locators is None else locators
+        targets = [[name, *to_js_locator(locator)] for name, locator in locators.items()]
+        result = self.driver.execute_script(SNAPSHOT_JS, targets, list(attributes))
+        return PageSnapshot.from_script_result(result)
+    
+    def wait_for_state(self, condition, timeout=Config.EXPLICIT_WAIT, attributes=()) -> PageSnapshot:
+        """Take snapshots until `condition(snapshot)` holds or `timeout` passes.
+
+        Every poll is one round trip, however many elements the condition
+        looks at. Returns the last snapshot, also on timeout, so the caller
+        asserts against what was on screen.
+        """
+        last = []
+        
+        def satisfied(driver):
+            last[:] = [self.snapshot(attributes=attributes)]
+            return condition(last[0])
+        
+        try:
+            self.wait_helper.wait_until(self.driver, satisfied, timeout)
+        except TimeoutException:
+            pass
+        return last[0]
+    
     def is_element_visible(self, locator, timeout=Config.EXPLICIT_WAIT):
         try:
             self.wait_helper.wait_for_element_visible(self.driver, locator, timeout)
@@ -84,19 +287,104 @@ class BasePage:
         except TimeoutException:
             return False
         
+    def is_element_absent(self, locator, timeout=0) -> bool:
+        """Fast negative check: True if no element matches (polls up to `timeout` seconds)."""
+        try:
+            self.wait_helper.wait_for_element_absent(self.driver, locator, timeout)
+            return True
+        except TimeoutException:
+            return False
+        
+    def is_element_not_visible(self, locator, timeout=0) -> bool:
+        """Fast negative check: True if the element is hidden or missing."""
+        try:
+            self.wait_helper.wait_for_element_not_visible(self.driver, locator, timeout)
+            return True
+        except TimeoutException:
+            return False
+        
+    def assert_element_absent(self, locator, element_name="element", timeout=0) -> None:
+        with allure.step(f"Asserting {element_name} is absent"):
+            assert self.is_element_absent(locator, timeout), \
+                f"{element_name} with locator {locator} should not be on the page"
+            
+    def assert_element_not_visible(self, locator, element_name="element", timeout=0) -> None:
+        with allure.step(f"Asserting {element_name} is not visible"):
+            assert self.is_element_not_visible(locator, timeout), \
+                f"{element_name} with locator {locator} should not be visible"
+        
     def wait_for_element_to_disappear(self, locator, timeout=Config.EXPLICIT_WAIT) -> None:
         """Wait for an element to disappear from the page, like (spinner/loading)..."""
         try:
-            WebDriverWait(self.driver, timeout).until(EC.invisibility_of_element_located(locator))
+            self.wait_helper.wait_for_element_not_visible(self.driver, locator, timeout)
         except TimeoutException:
             pass 
         
+    def take_screenshot(self, name="screenshot") -> None:
+        """Attach a screenshot of the current page (written in the background)."""
+        attachment_writer.attach_screenshot(self.driver, name=name)
+        
     def take_screenshots(self, name="screenshots") -> None:
         """Take screenshots of the current page."""
+        self.take_screenshot(name)
         
-        allure.attach(self.driver.get_screenshot_as_png(),
-                      name=name,
-                        attachment_type=allure.attachment_type.PNG)
+    #----------------------------------- Page Metrics -----------------------------------#
+    
+    def capture_metrics(self, label, armed=None, wait_for_load=False) -> Optional[dict]:
+        """Collect client-side metrics of the current document, attach them to Allure and log them.
+
+        Navigation Timing, paint timings, resource count/bytes and long tasks,
+        as a dict (see utils/page_metrics.py). `armed` is the ARM_JS result
+        taken before an action (see measure_action): the metrics then describe
+        the document the action led to, or only what the action added when it
+        stayed on the page. Returns None when the browser cannot provide them.
+        """
+        timeout = 0
+        if armed is not None or wait_for_load:
+            timeout = min(Config.PAGE_LOAD_TIMEOUT, SCRIPT_TIMEOUT - SCRIPT_TIMEOUT_MARGIN) * 1000
+        metrics = None
+        # The first attempt ends with an error when the action's navigation unloads the page
+        for attempt in range(2):
+            try:
+                metrics = self.driver.execute_async_script(METRICS_JS, armed, Config.PERF_NAVIGATION_GRACE, timeout)
+                break
+            except WebDriverException:
+                if attempt:
+                    logger.debug("Page metrics unavailable", exc_info=True)
+        if not isinstance(metrics, dict):
+            return None
+        metrics = {"label": label, **metrics}
+        self.last_metrics = metrics
+        allure.attach(json.dumps(metrics, indent=2), name=f"Page metrics: {label}",
+                      attachment_type=allure.attachment_type.JSON)
+        page_metrics_log.write(metrics)
+        return metrics
+    
+    @contextmanager
+    def measure_action(self, label):
+        """Capture page metrics after the action run in the block (only with PERF_METRICS)."""
+        armed = None
+        if self.metrics_enabled:
+            try:
+                armed = self.driver.execute_script(ARM_JS)
+            except WebDriverException:
+                logger.debug("Could not prepare page metrics for %s", label, exc_info=True)
+        yield
+        if armed is not None:
+            self.capture_metrics(label, armed)
+            
+    def assert_load_within(self, seconds, page_name="page") -> None:
+        """Fail when the current document took longer than `seconds` to load.
+
+        Measures it again after waiting for its load event: metrics captured
+        at navigation time may predate it (PAGE_LOAD_STRATEGY eager/none).
+        """
+        with allure.step(f"Asserting {page_name} loads within {seconds:g} s"):
+            metrics = self.capture_metrics(page_name, wait_for_load=True)
+            loaded = load_seconds(metrics)
+            assert loaded is not None, f"No navigation timing available for the {page_name}"
+            assert loaded <= seconds, \
+                f"{page_name} loaded in {loaded:.2f} s, budget {seconds:g} s: {metrics['navigation']}"
         
     #----------------------------------- Windows Management -----------------------------------#
     
@@ -105,4 +393,5 @@ class BasePage:
         
     def refresh_page(self) -> None:
         with allure.step("Refreshing the current page"):
-            self.driver.refresh()
\ No newline at end of file
+            self.driver.refresh()
+            self.invalidate_elements()
\ No newline at end of file
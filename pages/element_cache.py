@@ -0,0 +1,47 @@
+from utils.js_locator import FIND_ALL_JS
+
+# Read by BasePage instead of an attribute name: the element's visible text
+READ_TEXT = "__text__"
+
+# Checks that a cached element is still what its locator resolves to, and
+# optionally reads from it, in one round trip. A MutationObserver counts
+# childList mutations per document; while the count (and the document) is
+# unchanged the locator is not evaluated again.
+# arguments: element, last version (or null), kind, query, read (READ_TEXT,
+# an attribute name or null). Returns [version, value], or null when the
+# element is hidden or the locator now finds another element.
+CACHED_ELEMENT_JS = FIND_ALL_JS + """
+const [element, version, kind, query, read] = arguments;
+if (!window.__secucumberDom) {
+    const dom = window.__secucumberDom = {count: 0};
+    new MutationObserver(() => { dom.count += 1; }).observe(document, {childList: true, subtree: true});
+}
+const current = performance.timeOrigin + ':' + window.__secucumberDom.count;
+if (!isVisible(element)) {
+    return null;
+}
+if (current !== version) {
+    let elements = [];
+    try {
+        elements = findAll(kind, query);
+    } catch (e) {
+        elements = [];
+    }
+    if (elements[0] !== element) {
+        return null;
+    }
+}
+let value = null;
+if (read === '__text__') {
+    value = element.innerText.trim();
+} else if (read) {
+    value = (read in element) ? element[read] : element.getAttribute(read);
+    // Same conventions as WebElement.get_attribute
+    if (typeof value === 'boolean') {
+        value = value ? 'true' : null;
+    } else if (value !== null && value !== undefined) {
+        value = String(value);
+    }
+}
+return [current, value === undefined ? null : value];
+"""
@@ -0,0 +1,68 @@
+from utils.js_locator import FIND_ALL_JS
+
+# Fill strategies for BasePage.enter_text / fill_form
+FILL_TYPE = "type"  # clear() + send_keys(), one keystroke event per character
+FILL_JS = "js"      # set the value through JavaScript and dispatch input/change
+FILL_STRATEGIES = (FILL_TYPE, FILL_JS)
+
+# arguments[0]: [[kind, query, value], ...]
+# Returns the indexes of the fields that could not be filled (missing, hidden,
+# disabled or read-only) so the caller can fall back to waiting and typing.
+#
+# The value is set through the prototype's native setter: frameworks such as
+# Vue track the last value they saw on the element itself, and assigning
+# `element.value` directly would make them ignore the following input event.
+FILL_FORM_JS = FIND_ALL_JS + """
+const fields = arguments[0];
+const skipped = [];
+fields.forEach(([kind, query, value], index) => {
+    let element = null;
+    try {
+        element = findAll(kind, query).find(isVisible) || null;
+    } catch (e) {
+        element = null;
+    }
+    if (!element || element.disabled || element.readOnly || !('value' in element)) {
+        skipped.push(index);
+        return;
+    }
+    const descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(element), 'value');
+    element.focus();
+    if (descriptor && descriptor.set) {
+        descriptor.set.call(element, value);
+    } else {
+        element.value = value;
+    }
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+});
+return skipped;
+"""
+
+# arguments[0]: path the page must be on, arguments[1]: [[kind, query], ...]
+# fields to clear, arguments[2]: [[kind, query], ...] stale elements to remove.
+# Returns false, touching nothing, when the page is not in the expected state.
+RESET_FORM_JS = FIND_ALL_JS + """
+const [path, fields, stale] = arguments;
+if (document.readyState === 'loading' || !window.location.pathname.includes(path)) {
+    return false;
+}
+const inputs = fields.map(([kind, query]) => findAll(kind, query).find(isVisible));
+if (inputs.some(input => !input)) {
+    return false;
+}
+for (const [kind, query] of stale) {
+    for (const element of findAll(kind, query)) {
+        element.remove();
+    }
+}
+for (const input of inputs) {
+    const descriptor = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(input), 'value');
+    descriptor.set.call(input, '');
+    input.dispatchEvent(new Event('input', {bubbles: true}));
+}
+if (document.activeElement) {
+    document.activeElement.blur();
+}
+return true;
+"""
@@ -1,6 +1,9 @@
+from typing import Optional
+
 from utils.config import Config
 from pages.base_page import BasePage
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
 import allure
 
 
@@ -11,12 +14,35 @@ class LoginPage(BasePage):
     PASSWORD_INPUT = (By.NAME, "password")
     LOGIN_BUTTON = (By.XPATH, "//button[@type='submit']")
     ERROR_MESSAGE = (By.XPATH, "//p[@class='oxd-text oxd-text--p oxd-alert-content-text']")
+    ERROR_ALERT = (By.XPATH, "//div[@role='alert' and contains(@class, 'oxd-alert')]")
     FORGOT_PASSWORD_LINK = (By.XPATH, "//p[@class='oxd-text oxd-text--p orangehrm-login-forgot-header']")
     LOGIN_LOGO = (By.XPATH, "//div[@class='orangehrm-login-logo']/img")
     
     #-------------------------- Dashboard header locator to verify successful login -------------------------- #
     DASHBOARD_HEADER = (By.XPATH, "//h6[text()='Dashboard']")
     USER_DROPDOWN = (By.XPATH, "//p[@class='oxd-userdropdown-name']")
+    DASHBOARD_PATH = "/web/index.php/dashboard/index"
+    LOGIN_PATH = "/auth/login"
+    
+    #-------------------------- Elements read together by snapshot() -------------------------- #
+    SNAPSHOT_LOCATORS = {
+        "logo": LOGIN_LOGO,
+        "username": USERNAME_INPUT,
+        "password": PASSWORD_INPUT,
+        "login_button": LOGIN_BUTTON,
+        "error": ERROR_MESSAGE,
+        "forgot_password": FORGOT_PASSWORD_LINK,
+        "dashboard": DASHBOARD_HEADER,
+        "user_dropdown": USER_DROPDOWN,
+    }
+    
+    #-------------------------- Possible results of submitting the login form -------------------------- #
+    OUTCOME_SUCCESS = "success"
+    OUTCOME_ERROR = "error"
+    LOGIN_OUTCOMES = {
+        OUTCOME_SUCCESS: DASHBOARD_HEADER,
+        OUTCOME_ERROR: ERROR_MESSAGE,
+    }
     
     def __init__(self, driver):
         super().__init__(driver)
@@ -24,9 +50,20 @@ class LoginPage(BasePage):
         
     @allure.step("Navigate to Login Page")
     def open(self) -> None:
-        self.navigate_to_url(self.url)
+        self.navigate_to_url(self.url, "login page")
         self.maximize_window()
         
+    @allure.step("Reset the login form in place")
+    def reset_form(self) -> bool:
+        """Get back to an empty login form without reloading the page.
+
+        Removes the error banner left by a failed attempt (so the next
+        assertion cannot see a stale one) and clears both inputs. Returns
+        False when the login form is not what is on screen; call open() then.
+        """
+        return self.reset_form_in_place(self.LOGIN_PATH, (self.USERNAME_INPUT, self.PASSWORD_INPUT),
+                                        stale=(self.ERROR_ALERT, self.ERROR_MESSAGE))
+        
     @allure.step("Enter username")
     def enter_username(self, username: str) -> None:
         self.enter_text(self.USERNAME_INPUT, username, "Username Input")
@@ -39,12 +76,13 @@ class LoginPage(BasePage):
     
     @allure.step("Click on login button")
     def click_login_button(self) -> None:
-        self.click(self.LOGIN_BUTTON, "login Button")
+        with self.measure_action("login submit"):
+            self.click(self.LOGIN_BUTTON, "login Button")
         
     @allure.step("Login with username: {username} and password: {password}")
     def login(self, username: str, password: str):
-        self.enter_username(username)
-        self.enter_password(password)
+        # One round trip for both fields with FILL_STRATEGY=js
+        self.fill_form({self.USERNAME_INPUT: username, self.PASSWORD_INPUT: password})
         self.click_login_button()
         return self
     
@@ -52,29 +90,51 @@ class LoginPage(BasePage):
     def click_forgot_password(self) -> None:
         self.click(self.FORGOT_PASSWORD_LINK, "Forgot Password Link")
 
-    def is_login_page_displayed(self) -> bool:
-        return self.is_element_visible(self.LOGIN_LOGO)
+    def is_login_page_displayed(self, timeout=Config.EXPLICIT_WAIT) -> bool:
+        # With images blocked (lean mode) the logo never gets a size, check the form instead
+        marker = "username" if Config.BLOCK_IMAGES else "logo"
+        return self.get_state(lambda state: state.is_visible(marker), timeout).is_visible(marker)
+    
+    def get_login_outcome(self, timeout=10) -> Optional[str]:
+        """Wait once for whichever login result renders first.
+
+        Returns OUTCOME_SUCCESS, OUTCOME_ERROR, or None if neither appeared in time.
+        """
+        try:
+            return self.wait_helper.wait_for_any(self.driver, self.LOGIN_OUTCOMES, timeout)
+        except TimeoutException:
+            return None
     
     def is_error_message_displayed(self) -> bool:
-        return self.is_element_visible(self.ERROR_MESSAGE, timeout=3)
+        return self.get_login_outcome(timeout=3) == self.OUTCOME_ERROR
         
     def is_login_successful(self) -> bool:
-        return self.is_element_visible(self.DASHBOARD_HEADER, timeout=10)
+        return self.get_login_outcome(timeout=10) == self.OUTCOME_SUCCESS
     
     def is_user_dropdown_displayed(self) -> bool:
-        return self.is_element_visible(self.USER_DROPDOWN, timeout=5)
+        return self.get_state(lambda state: state.is_visible("user_dropdown"), 5).is_visible("user_dropdown")
+    
+    def is_forgot_password_link_displayed(self) -> bool:
+        return self.get_state(lambda state: state.is_visible("forgot_password")).is_visible("forgot_password")
     
     @allure.step("Watch for the page to load")
     def wait_for_page_to_load(self) -> None:
         # Wait once for the login logo to appear
-        self.is_element_visible(self.LOGIN_LOGO, timeout=10)
+        self.get_state(lambda state: state.is_visible("logo"), 10)
+
+    def get_state(self, until=None, timeout=0):
+        """Snapshot of every login page element (plus input values) in one call.
+
+        With `until`, snapshots are taken until `until(state)` holds or
+        `timeout` passes, one call each; the last one is returned.
+        """
+        if until is None:
+            return self.snapshot(attributes=("value",))
+        return self.wait_for_state(until, timeout, attributes=("value",))
 
     def get_error_message_text(self) -> str:
-        """Return the visible error message text on the login page."""
-        try:
-            return self.get_element_text(self.ERROR_MESSAGE)
-        except Exception:
-            return ""
+        """Return the visible error message text on the login page (empty if none shows up)."""
+        return self.get_state(lambda state: state.is_visible("error"), Config.EXPLICIT_WAIT).text("error")
     
     
         
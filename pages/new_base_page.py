@@ -10,6 +10,7 @@ from selenium.webdriver.common.by import By
 
 import allure
 
+from utils.attachment_writer import attachment_writer
 from utils.wait_helper import WaitHelper
 from utils.config import Config
 
@@ -70,8 +71,7 @@ class BasePage:
             logger.exception("Element not found: %s", locator)
             with allure.step(f"Attach screenshot on failure for locator: {locator}"):
                 try:
-                    allure.attach(self.driver.get_screenshot_as_png(), name="element_not_found",
-                                  attachment_type=allure.attachment_type.PNG)
+                    attachment_writer.attach_screenshot(self.driver, name="element_not_found")
                 except WebDriverException:
                     logger.exception("Failed to capture screenshot")
             raise ElementNotFoundError(f"Element not found: {locator}") from e
@@ -136,8 +136,7 @@ class BasePage:
     # ----------------------- Utilities -----------------------
     def take_screenshot(self, name: str = "screenshot") -> None:
         try:
-            png = self.driver.get_screenshot_as_png()
-            allure.attach(png, name=name, attachment_type=allure.attachment_type.PNG)
+            attachment_writer.attach_screenshot(self.driver, name=name)
         except WebDriverException:
             logger.exception("Failed to take screenshot")
 
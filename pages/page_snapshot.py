@@ -0,0 +1,85 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from utils.js_locator import FIND_ALL_JS
+
+# arguments[0]: [[name, kind, query], ...], arguments[1]: attribute names
+SNAPSHOT_JS = FIND_ALL_JS + """
+const targets = arguments[0];
+const attributes = arguments[1];
+const result = {};
+for (const [name, kind, query] of targets) {
+    let elements = [];
+    try {
+        elements = findAll(kind, query);
+    } catch (e) {
+        elements = [];
+    }
+    const element = elements.find(isVisible) || elements[0];
+    const state = {count: elements.length, visible: false, text: null, attributes: {}};
+    if (element) {
+        state.visible = isVisible(element);
+        state.text = state.visible ? element.innerText.trim() : '';
+        for (const attribute of attributes) {
+            const value = (attribute in element) ? element[attribute] : element.getAttribute(attribute);
+            state.attributes[attribute] = (value === undefined) ? null : value;
+        }
+    }
+    result[name] = state;
+}
+return result;
+"""
+
+
+@dataclass(frozen=True)
+class ElementState:
+    """State of one locator at the moment the snapshot was taken."""
+    count: int = 0
+    visible: bool = False
+    text: Optional[str] = None
+    attributes: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def present(self) -> bool:
+        return self.count > 0
+
+
+class PageSnapshot:
+    """Result of BasePage.snapshot(): element states keyed by the locator names."""
+
+    def __init__(self, states: Dict[str, ElementState]):
+        self.states = states
+
+    def __getitem__(self, name) -> ElementState:
+        return self.states[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self.states
+
+    def __repr__(self) -> str:
+        return f"PageSnapshot({self.states!r})"
+
+    def is_visible(self, name) -> bool:
+        return self.states[name].visible
+
+    def text(self, name) -> str:
+        return self.states[name].text or ""
+
+    def attribute(self, name, attribute_name):
+        return self.states[name].attributes.get(attribute_name)
+
+    def assert_visible(self, *names) -> None:
+        hidden = [name for name in names if not self.states[name].visible]
+        assert not hidden, f"Expected visible but not displayed: {', '.join(hidden)}"
+
+    def assert_not_visible(self, *names) -> None:
+        shown = [name for name in names if self.states[name].visible]
+        assert not shown, f"Expected hidden but displayed: {', '.join(shown)}"
+
+    @classmethod
+    def from_script_result(cls, result) -> "PageSnapshot":
+        return cls({name: ElementState(count=state.get("count", 0),
+                                       visible=bool(state.get("visible")),
+                                       text=state.get("text"),
+                                       attributes=state.get("attributes") or {})
+                    for name, state in (result or {}).items()})
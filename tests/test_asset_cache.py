@@ -0,0 +1,104 @@
+import os
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+from utils import asset_cache
+from utils.asset_cache import AssetCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AssetCache(cache_dir=tmp_path / "seeds", max_age=60)
+
+
+def browser_cache(tmp_path, name, content="asset"):
+    """A quit browser's cache directory with one entry."""
+    directory = tmp_path / name
+    directory.mkdir()
+    (directory / "entry").write_text(content, encoding="utf-8")
+    return str(directory)
+
+
+def seed_content(cache):
+    return (cache.seed_dir("chrome") / "entry").read_text(encoding="utf-8")
+
+
+def test_first_cache_becomes_the_seed(cache, tmp_path):
+    released = browser_cache(tmp_path, "first")
+    cache.release("chrome", released)
+    assert seed_content(cache) == "asset"
+    assert not Path(released).exists()
+
+
+def test_fresh_seed_is_kept(cache, tmp_path):
+    cache.release("chrome", browser_cache(tmp_path, "first", "old"))
+    released = browser_cache(tmp_path, "second", "new")
+    cache.release("chrome", released)
+    assert seed_content(cache) == "old"
+    assert not Path(released).exists()
+
+
+def test_expired_seed_is_replaced(cache, tmp_path):
+    cache.release("chrome", browser_cache(tmp_path, "first", "old"))
+    expired = time.time() - 120
+    os.utime(cache.seed_dir("chrome"), (expired, expired))
+    cache.release("chrome", browser_cache(tmp_path, "second", "new"))
+    assert seed_content(cache) == "new"
+    # The seed's age restarts at promotion, and the retired seed is gone
+    assert time.time() - cache.seed_dir("chrome").stat().st_mtime < 60
+    assert [path.name for path in cache.cache_dir.iterdir()] == ["chrome"]
+
+
+def test_empty_cache_is_not_promoted(cache, tmp_path):
+    released = tmp_path / "empty"
+    released.mkdir()
+    cache.release("chrome", str(released))
+    assert not cache.seed_dir("chrome").exists()
+    assert not released.exists()
+
+
+def test_promote_loses_the_race_quietly(cache, tmp_path, monkeypatch):
+    released = browser_cache(tmp_path, "mine", "mine")
+    seed = cache.seed_dir("chrome")
+    replace = os.replace
+
+    def other_worker_first(source, target):
+        # Another worker renames its cache into place between our checks and our rename
+        if str(source) == released:
+            browser_cache(tmp_path, "theirs", "theirs")
+            replace(tmp_path / "theirs", target)
+        replace(source, target)
+
+    monkeypatch.setattr(asset_cache.os, "replace", other_worker_first)
+    AssetCache._promote(released, seed)
+    assert seed_content(cache) == "theirs"
+    assert not Path(released).exists()
+
+
+def test_new_cache_dir_starts_from_the_seed(cache, tmp_path):
+    cache.release("chrome", browser_cache(tmp_path, "first"))
+    copy = cache.new_cache_dir("chrome")
+    try:
+        assert (Path(copy) / "entry").read_text(encoding="utf-8") == "asset"
+        assert Path(copy) != cache.seed_dir("chrome")
+    finally:
+        shutil.rmtree(copy)
+
+
+class TimingDriver:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def execute_script(self, script):
+        return self.entries
+
+
+def test_sample_classifies_assets(cache):
+    cache.sample(TimingDriver([[0, 1000, 4000], [300, 2000, 6000], [2300, 2000, 6000]]))
+    assert (cache.hits, cache.revalidated, cache.misses) == (1, 1, 1)
+    assert cache.downloaded_bytes == 2600
+    assert cache.saved_bytes == 3000
+    assert cache.summary().startswith("Asset cache: 1/3 static asset(s) from cache")
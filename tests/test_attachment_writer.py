@@ -0,0 +1,78 @@
+import os
+from types import SimpleNamespace
+
+import allure
+import pytest
+
+from benchmarks.fake_webdriver import BLANK_PNG, FakeWebDriver
+from utils import attachment_writer
+from utils.attachment_writer import AttachmentWriter
+
+
+class Attachments:
+    """Stands in for allure.attach (and allure.attach.file) and keeps what was attached."""
+
+    def __init__(self):
+        self.files = []
+        self.data = []
+
+    def file(self, source, name=None, attachment_type=None, extension=None):
+        with open(source, "rb") as file:
+            self.files.append((name, file.read(), attachment_type, extension))
+
+    def __call__(self, body, name=None, attachment_type=None, extension=None):
+        self.data.append((name, body, attachment_type))
+
+
+@pytest.fixture
+def attachments(monkeypatch):
+    attachments = Attachments()
+    fake_allure = SimpleNamespace(attach=attachments, attachment_type=allure.attachment_type)
+    monkeypatch.setattr(attachment_writer, "allure", fake_allure)
+    return attachments
+
+
+@pytest.fixture
+def writer():
+    writer = AttachmentWriter(image_format="png", max_width=0, enabled=True)
+    yield writer
+    writer.close()
+
+
+def test_screenshots_are_attached_after_the_step(writer, attachments):
+    writer.attach_screenshot(FakeWebDriver(), name="login")
+    assert attachments.files == []
+    writer.attach_pending()
+    assert attachments.files == [("login", BLANK_PNG, allure.attachment_type.PNG, "png")]
+    writer.attach_pending()
+    assert len(attachments.files) == 1
+
+
+def test_identical_screenshots_are_written_once(writer, attachments):
+    driver = FakeWebDriver()
+    writer.attach_screenshot(driver, name="first")
+    writer.attach_screenshot(driver, name="second")
+    writer.attach_pending()
+    assert [name for name, *_ in attachments.files] == ["first", "second"]
+    assert len(os.listdir(writer._dir)) == 1
+
+
+def test_close_removes_the_temporary_files(attachments):
+    writer = AttachmentWriter(image_format="png", max_width=0, enabled=True)
+    writer.attach_screenshot(FakeWebDriver(), name="login")
+    writer.attach_pending()
+    directory = writer._dir
+    writer.close()
+    assert not os.path.exists(directory)
+
+
+def test_disabled_writer_attaches_synchronously(attachments):
+    writer = AttachmentWriter(image_format="png", max_width=0, enabled=False)
+    writer.attach_screenshot(FakeWebDriver(), name="login")
+    assert attachments.data == [("login", BLANK_PNG, allure.attachment_type.PNG)]
+    assert writer._thread is None
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        AttachmentWriter(image_format="bmp")
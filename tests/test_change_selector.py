@@ -0,0 +1,178 @@
+import textwrap
+
+import pytest
+
+from utils.change_selector import DependencyIndex, parse_diff, select_scenarios
+
+FILES = {
+    "features/Demo.feature": """
+        Feature: Demo
+
+          Background:
+            Given I am on the demo page
+
+          @smoke
+          Scenario: Click the button
+            When I click the button
+
+          Scenario: Click the link
+            When I click the link
+
+          Scenario Outline: Search
+            When I search for "<term>"
+
+            Examples:
+              | term  |
+              | one   |
+              | two   |
+
+          @performance
+          Scenario: Click the button quickly
+            When I click the button
+        """,
+    "features/environment.py": """
+        def before_scenario(context, scenario):
+            context.started = True
+        """,
+    "features/steps/demo_steps.py": """
+        from behave import given, when
+
+        from pages.demo_page import DemoPage
+
+
+        @given('I am on the demo page')
+        def step_open(context):
+            context.demo_page = DemoPage()
+
+
+        @when('I click the button')
+        def step_button(context):
+            context.demo_page.click_button()
+
+
+        @when('I click the link')
+        def step_link(context):
+            context.demo_page.click_link()
+
+
+        @when('I search for "{term}"')
+        def step_search(context, term):
+            context.demo_page.search(term)
+        """,
+    "pages/base.py": """
+        class Base:
+            def click(self, locator):
+                return locator
+        """,
+    "pages/demo_page.py": """
+        from pages.base import Base
+
+
+        class DemoPage(Base):
+            BUTTON = ("id", "button")
+            LINK = ("id", "link")
+
+            def click_button(self):
+                return self.click(self.BUTTON)
+
+            def click_link(self):
+                return self.LINK
+
+            def search(self, term):
+                return term
+        """,
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    for relative, content in FILES.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(content).lstrip(), encoding="utf-8")
+    return DependencyIndex(root=tmp_path, cache_file=tmp_path / "index.json").build()
+
+
+def line_of(index, relative, text):
+    lines = (index.root / relative).read_text(encoding="utf-8").splitlines()
+    return next(number for number, line in enumerate(lines, 1) if text in line)
+
+
+def diff(path, line, count=1):
+    return f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n@@ -{line},{count} +{line},{count} @@\n"
+
+
+def everything(index):
+    """Every scenario a plain `behave` runs (behave.ini's default_tags leave out @performance)."""
+    return [location for location in sorted(index.scenarios) if "performance" not in index.scenarios[location]["tags"]]
+
+
+def selected(index, diff_text, tags=None):
+    return select_scenarios(index, parse_diff(diff_text), tags)[0]
+
+
+def location(index, text):
+    return f"features/Demo.feature:{line_of(index, 'features/Demo.feature', text)}"
+
+
+def test_change_to_a_locator_selects_the_scenarios_using_it(index):
+    line = line_of(index, "pages/demo_page.py", "LINK = ")
+    assert selected(index, diff("pages/demo_page.py", line)) == [location(index, "Scenario: Click the link")]
+
+
+def test_change_to_a_base_method_follows_the_call_chain(index):
+    line = line_of(index, "pages/base.py", "return locator")
+    assert selected(index, diff("pages/base.py", line)) == [location(index, "Scenario: Click the button")]
+
+
+def test_change_to_an_examples_row_selects_only_that_row(index):
+    line = line_of(index, "features/Demo.feature", "| two")
+    assert selected(index, diff("features/Demo.feature", line)) == [f"features/Demo.feature:{line}"]
+
+
+def test_change_to_the_background_selects_the_whole_feature(index):
+    line = line_of(index, "features/Demo.feature", "Given I am on the demo page")
+    assert selected(index, diff("features/Demo.feature", line)) == everything(index)
+
+
+def test_change_to_a_hook_selects_everything(index):
+    line = line_of(index, "features/environment.py", "context.started")
+    assert selected(index, diff("features/environment.py", line)) == everything(index)
+
+
+def test_unattributable_change_selects_everything(index):
+    assert selected(index, diff("utils/data.json", 1)) == everything(index)
+
+
+def test_ignored_paths_select_nothing(index):
+    assert selected(index, diff("README.md", 1) + diff(".github/workflows/ci.yml", 3)) == []
+
+
+def test_performance_scenarios_need_their_tag(index):
+    line = line_of(index, "pages/base.py", "return locator")
+    quickly = location(index, "Scenario: Click the button quickly")
+    assert quickly not in selected(index, diff("pages/base.py", line))
+    assert selected(index, diff("pages/base.py", line), ["@performance"]) == [quickly]
+
+
+def test_tags_filter_the_selection(index):
+    line = line_of(index, "pages/base.py", "return locator")
+    assert selected(index, diff("pages/base.py", line), ["@smoke"]) == [location(index, "Scenario: Click the button")]
+    # Explicit tags replace default_tags
+    assert selected(index, diff("pages/base.py", line), ["not @smoke"]) == [
+        location(index, "Scenario: Click the button quickly")]
+
+
+def test_deleted_file_selects_everything(index):
+    deleted = "diff --git a/pages/old.py b/pages/old.py\ndeleted file mode 100644\n"
+    assert selected(index, deleted) == everything(index)
+
+
+def test_parse_diff_pure_deletion_touches_the_surrounding_lines():
+    assert parse_diff("diff --git a/x.py b/x.py\n+++ b/x.py\n@@ -10,2 +9,0 @@\n") == {"x.py": {9, 10}}
+
+
+def test_index_reparses_only_changed_files(index, tmp_path):
+    (tmp_path / "pages" / "base.py").write_text("class Base:\n    pass\n", encoding="utf-8")
+    rebuilt = DependencyIndex(root=tmp_path, cache_file=tmp_path / "index.json").build()
+    assert rebuilt.reparsed == ["pages/base.py"]
@@ -0,0 +1,140 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from utils.driver_factory import DriverFactory, DriverPool, DriverPrewarmer
+
+
+class StubDriver:
+    """The WebDriver calls made by the pool's health check and reset."""
+
+    name = "chrome"
+
+    def __init__(self):
+        self.alive = True
+        self.handles = ["main"]
+        self.current = "main"
+        self.cookies = {"session": "abc"}
+        self.current_url = "https://example.test/dashboard"
+        self.switch_to = self
+
+    @property
+    def window_handles(self):
+        if not self.alive:
+            raise WebDriverException("session deleted")
+        return list(self.handles)
+
+    def window(self, handle):
+        self.current = handle
+
+    def close(self):
+        self.handles.remove(self.current)
+
+    def execute_script(self, script, *args):
+        pass
+
+    def delete_all_cookies(self):
+        if not self.alive:
+            raise WebDriverException("session deleted")
+        self.cookies.clear()
+
+    def get(self, url):
+        self.current_url = url
+
+
+class Launcher:
+    """Stands in for DriverFactory.create_driver; fails the launches listed in `failures`."""
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.launched = []
+        self.quit = []
+
+    def create(self):
+        if self.failures:
+            raise self.failures.pop(0)
+        driver = StubDriver()
+        self.launched.append(driver)
+        return driver
+
+
+@pytest.fixture
+def launcher(monkeypatch):
+    launcher = Launcher()
+    monkeypatch.setattr(DriverFactory, "create_driver", staticmethod(launcher.create))
+    monkeypatch.setattr(DriverFactory, "quit_driver", staticmethod(launcher.quit.append))
+    return launcher
+
+
+def test_prewarmer_falls_back_to_an_inline_launch_on_any_error(launcher):
+    launcher.failures.append(OSError("driver binary missing"))
+    prewarmer = DriverPrewarmer(depth=1)
+    prewarmer.start()
+    driver = prewarmer.take()
+    prewarmer.shutdown()
+    assert driver in launcher.launched
+    assert prewarmer.misses == 1
+    # The replacement spare scheduled by take() is quit on shutdown
+    assert launcher.quit == [spare for spare in launcher.launched if spare is not driver]
+
+
+def test_prewarmer_hands_out_ready_spares(launcher):
+    prewarmer = DriverPrewarmer(depth=1)
+    prewarmer.start()
+    prewarmer._pending[0].result()
+    driver = prewarmer.take()
+    prewarmer.shutdown()
+    assert driver is launcher.launched[0]
+    assert (prewarmer.hits, prewarmer.misses) == (1, 0)
+
+
+def test_released_driver_is_reset_and_reused(launcher):
+    pool = DriverPool(recycle_after=0)
+    driver = pool.acquire()
+    driver.handles.append("popup")
+    pool.release(driver)
+    assert pool.acquire() is driver
+    assert (driver.handles, driver.current, driver.cookies) == (["main"], "main", {})
+    assert driver.current_url == "about:blank"
+    assert len(launcher.launched) == 1
+
+
+def test_driver_is_recycled_after_its_quota(launcher):
+    pool = DriverPool(recycle_after=2)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    pool.release(first)
+    assert launcher.quit == [first]
+    assert pool.acquire() is not first
+    assert len(launcher.launched) == 2
+
+
+def test_discarded_and_unresettable_drivers_are_quit(launcher):
+    pool = DriverPool(recycle_after=0)
+    isolated = pool.acquire()
+    pool.release(isolated, discard=True)
+    broken = pool.acquire()
+    broken.alive = False
+    pool.release(broken)
+    assert launcher.quit == [isolated, broken]
+    assert pool.acquire() not in (isolated, broken)
+
+
+def test_unhealthy_idle_driver_is_replaced(launcher):
+    pool = DriverPool(recycle_after=0)
+    driver = pool.acquire()
+    pool.release(driver)
+    driver.alive = False
+    assert pool.acquire() is not driver
+    assert launcher.quit == [driver]
+
+
+def test_fresh_skips_idle_drivers_and_shutdown_quits_them(launcher):
+    pool = DriverPool(recycle_after=0)
+    idle = pool.acquire()
+    pool.release(idle)
+    fresh = pool.acquire(fresh=True)
+    assert fresh is not idle
+    pool.shutdown()
+    assert launcher.quit == [idle]
+
@@ -0,0 +1,45 @@
+from selenium.webdriver.common.by import By
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from pages.base_page import BasePage
+
+BUTTON = (By.CSS_SELECTOR, "button[type='submit']")
+
+
+def cached_page(driver):
+    page = BasePage(driver)
+    page.element_cache = True
+    page.click(BUTTON, "button")
+    driver.reset_commands()
+    return page
+
+
+def test_cached_click_is_checked_in_the_page_first():
+    driver = FakeWebDriver()
+    driver.add_element(BUTTON)
+    page = cached_page(driver)
+    page.click(BUTTON, "button")
+    assert driver.commands["executeScript"] == 1
+    assert driver.commands["clickElement"] == 1
+    assert driver.commands["findElement"] == 0
+
+
+def test_replaced_element_is_looked_up_again():
+    driver = FakeWebDriver()
+    old = driver.add_element(BUTTON)
+    page = cached_page(driver)
+    driver.remove_element(BUTTON)
+    clicked = []
+    driver.add_element(BUTTON, on_click=lambda _: clicked.append("new"))
+    old.on_click = lambda _: clicked.append("old")
+    page.click(BUTTON, "button")
+    assert clicked == ["new"]
+
+
+def test_disabled_cached_element_is_not_clicked():
+    driver = FakeWebDriver()
+    button = driver.add_element(BUTTON)
+    page = cached_page(driver)
+    button.enabled = False
+    assert not page._click_cached(BUTTON)
+    assert driver.commands["clickElement"] == 0
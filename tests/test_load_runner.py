@@ -0,0 +1,98 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from pages.login_page import LoginPage
+from utils.config import Config
+from utils.load_runner import (ConnectionPool, LoadStats, LoginFlow, RatePacer, VirtualUser, load_flows,
+                               print_report, run_load)
+from utils.login_stub import LoginStubServer
+
+LOGIN_FEATURE = Path(Config.PROJECT_ROOT) / "features" / "Login.feature"
+
+
+@pytest.fixture
+def stub():
+    # Explicit credentials: USERNAME is often set by the OS
+    server = LoginStubServer(username="Admin", password="admin123")
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_login_scenarios_become_flows():
+    flows, skipped = load_flows([LOGIN_FEATURE])
+    by_name = {}
+    for flow in flows:
+        by_name.setdefault(flow.name, []).append(flow)
+    success = by_name["Successful login with valid credentials"][0]
+    assert (success.username, success.password, success.expected) == ("admin", "admin123", LoginPage.OUTCOME_SUCCESS)
+    empty = by_name["Failed login with empty credentials"][0]
+    assert (empty.username, empty.password, empty.expected) == ("", "", LoginPage.OUTCOME_ERROR)
+    # One flow per Examples row
+    rows = [flow for flow in flows if flow.name.startswith("Login with multiple invalid credentials")]
+    assert [(flow.username, flow.expected) for flow in rows][-1] == ("Admin", LoginPage.OUTCOME_ERROR)
+    assert len(rows) == 4
+    # Budget steps have no HTTP equivalent
+    assert "Login page loads within the performance budget" in skipped
+
+
+def test_tags_filter_the_flows():
+    flows, _ = load_flows([LOGIN_FEATURE], ["@smoke"])
+    assert [flow.expected for flow in flows] == [LoginPage.OUTCOME_SUCCESS]
+
+
+def test_load_against_the_stub_matches_every_outcome(stub):
+    flows, _ = load_flows([LOGIN_FEATURE])
+    report = asyncio.run(run_load(stub.url, flows, users=4, ramp_up=0.2, duration=1.0))
+    assert report["iterations"] >= len(flows)
+    assert report["failed_iterations"] == 0
+    assert report["errors"] == 0
+    requests = report["requests_by_name"]
+    assert {"GET login page", "POST auth/validate", "GET dashboard", "GET login page (error)"} <= set(requests)
+    # Empty credentials never post the form
+    assert requests["POST auth/validate"]["count"] < requests["GET login page"]["count"]
+    assert report["requests"] == sum(row["count"] for name, row in requests.items()
+                                     if not name.startswith("scenario:"))
+
+
+def test_unexpected_outcome_fails_the_iteration(stub):
+    flows = [LoginFlow("expects an error", "Admin", "admin123", expected=LoginPage.OUTCOME_ERROR)]
+    report = asyncio.run(run_load(stub.url, flows, users=1, ramp_up=0, duration=0.3))
+    assert report["iterations"] > 0
+    assert report["failed_iterations"] == report["iterations"]
+    assert report["errors"] == 0
+
+
+def test_timed_out_request_is_an_error_and_drops_its_connection(monkeypatch):
+    monkeypatch.setattr(Config, "PAGE_LOAD_TIMEOUT", 0.2)
+
+    async def scenario():
+        async def never_answer(reader, writer):
+            await reader.read()
+        server = await asyncio.start_server(never_answer, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        stats = LoadStats()
+        pool = ConnectionPool(f"http://127.0.0.1:{port}", 1)
+        user = VirtualUser(f"http://127.0.0.1:{port}", pool, RatePacer(0), stats)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await user.send("GET login page", "GET", f"http://127.0.0.1:{port}/")
+            return stats, pool._idle
+        finally:
+            server.close()
+
+    stats, idle = asyncio.run(scenario())
+    assert stats.report()["requests_by_name"]["GET login page"]["errors"] == 1
+    assert idle == []
+
+
+def test_report_keeps_outline_rows_apart(stub, capsys):
+    flows = [flow for flow in load_flows([LOGIN_FEATURE])[0] if "--" in flow.name]
+    report = asyncio.run(run_load(stub.url, flows, users=2, ramp_up=0, duration=0.3))
+    print_report(report)
+    output = capsys.readouterr().out
+    for flow in flows:
+        assert f"scenario: {flow.name}" in output
+
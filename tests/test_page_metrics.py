@@ -0,0 +1,56 @@
+import json
+import threading
+
+from utils.page_metrics import RUN_ID_ENV, PageMetricsLog, load_seconds
+
+METRICS = {"label": "login page", "navigation": {"ttfb_ms": 120.0, "load_ms": 850.0}}
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_lines_carry_run_worker_and_scenario(tmp_path, monkeypatch):
+    monkeypatch.setenv(RUN_ID_ENV, "nightly-42")
+    monkeypatch.setenv("BEHAVE_WORKER_ID", "3")
+    path = tmp_path / "reports" / "perf-metrics.jsonl"
+    log = PageMetricsLog(path=str(path))
+    log.start_scenario("Successful login with valid credentials")
+    log.write(METRICS)
+    [line] = read_lines(path)
+    assert (line["run"], line["worker"], line["scenario"]) == ("nightly-42", "3",
+                                                               "Successful login with valid credentials")
+    assert line["navigation"] == METRICS["navigation"]
+    assert log.written == 1
+
+
+def test_lines_from_other_runs_are_kept(tmp_path, monkeypatch):
+    path = tmp_path / "perf-metrics.jsonl"
+    for run in ("first", "second"):
+        monkeypatch.setenv(RUN_ID_ENV, run)
+        PageMetricsLog(path=str(path)).write(METRICS)
+    assert [line["run"] for line in read_lines(path)] == ["first", "second"]
+
+
+def test_concurrent_writes_keep_lines_whole(tmp_path):
+    path = tmp_path / "perf-metrics.jsonl"
+    logs = [PageMetricsLog(path=str(path)) for _ in range(4)]
+    threads = [threading.Thread(target=lambda log=log: [log.write(METRICS) for _ in range(50)]) for log in logs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(read_lines(path)) == 200
+
+
+def test_unwritable_file_is_only_logged(tmp_path):
+    log = PageMetricsLog(path=str(tmp_path))
+    log.write(METRICS)
+    assert log.written == 0
+
+
+def test_load_seconds_falls_back_to_dom_content_loaded():
+    assert load_seconds(METRICS) == 0.85
+    assert load_seconds({"navigation": {"load_ms": None, "dom_content_loaded_ms": 400.0}}) == 0.4
+    assert load_seconds({"navigation": {}}) is None
+    assert load_seconds(None) is None
@@ -0,0 +1,49 @@
+import pytest
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.run_benchmarks import build_login_page
+from pages.login_page import LoginPage
+from pages.page_snapshot import PageSnapshot
+
+
+def test_script_result_becomes_element_states():
+    snapshot = PageSnapshot.from_script_result({
+        "error": {"count": 1, "visible": True, "text": "Invalid credentials", "attributes": {"class": "alert"}},
+        "dashboard": {"count": 0, "visible": False, "text": None, "attributes": {}},
+    })
+    assert snapshot.text("error") == "Invalid credentials"
+    assert snapshot.attribute("error", "class") == "alert"
+    assert snapshot["error"].present and not snapshot["dashboard"].present
+    assert snapshot.text("dashboard") == ""
+    snapshot.assert_visible("error")
+    snapshot.assert_not_visible("dashboard")
+    with pytest.raises(AssertionError, match="dashboard"):
+        snapshot.assert_visible("error", "dashboard")
+
+
+def test_login_page_state_is_one_round_trip():
+    driver = FakeWebDriver()
+    page = build_login_page(driver)
+    driver.find_element(*LoginPage.USERNAME_INPUT).value = "Admin"
+    driver.reset_commands()
+    state = page.get_state()
+    assert sum(driver.commands.values()) == 1
+    assert state.is_visible("logo") and state.is_visible("login_button")
+    assert not state.is_visible("error") and not state["dashboard"].present
+    assert state.attribute("username", "value") == "Admin"
+
+
+def test_wait_for_state_polls_until_the_condition_holds():
+    driver = FakeWebDriver()
+    page = build_login_page(driver)
+    driver.add_element(LoginPage.ERROR_MESSAGE, appear_after=0.2, text="Invalid credentials")
+    state = page.get_state(lambda state: state.is_visible("error"), timeout=5)
+    assert state.text("error") == "Invalid credentials"
+
+
+def test_wait_for_state_returns_the_last_snapshot_on_timeout():
+    driver = FakeWebDriver()
+    page = build_login_page(driver)
+    state = page.get_state(lambda state: state.is_visible("dashboard"), timeout=0.3)
+    assert not state.is_visible("dashboard")
+    assert state.is_visible("logo")
@@ -0,0 +1,93 @@
+import json
+import time
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from pages.base_page import BasePage
+from utils.profiler import CommandProfiler, merge_reports, worker_report_path
+
+BUTTON = (By.CSS_SELECTOR, "button")
+
+
+class ExecuteDriver:
+    """Every call goes through execute(), like a remote WebDriver."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def execute(self, driver_command, params=None):
+        time.sleep(self.latency)
+        return {"value": ["element-1"] if driver_command == "findElements" else None}
+
+    def find_elements(self, by, value):
+        return self.execute("findElements", {"using": by, "value": value})["value"]
+
+
+def profiled(latency=0.0):
+    profiler = CommandProfiler(enabled=True)
+    return profiler, profiler.instrument(ExecuteDriver(latency))
+
+
+def test_disabled_profiler_does_not_wrap():
+    profiler = CommandProfiler(enabled=False)
+    driver = ExecuteDriver()
+    execute = driver.execute
+    assert profiler.instrument(driver).execute == execute
+    with profiler.wait_span():
+        pass
+    assert profiler.steps == []
+
+
+def test_commands_are_recorded_per_step_and_page_method():
+    profiler, driver = profiled()
+    profiler.start_step("When I click the button")
+    BasePage(driver).find_elements(BUTTON)
+    driver.execute("getTitle")
+    profiler.end_step()
+    # Outside a step nothing is recorded
+    driver.execute("getTitle")
+
+    [step] = profiler.steps
+    assert {name: stats.count for name, stats in step.commands.items()} == {"findElements": 1, "getTitle": 1}
+    assert set(step.page_methods) == {"BasePage.find_elements", "<step>"}
+    assert step.commands["findElements"].bytes_sent > 0
+    assert step.commands["findElements"].bytes_received == len(json.dumps(["element-1"]))
+
+
+def test_wait_span_separates_sleeping_from_commands():
+    profiler, driver = profiled(latency=0.05)
+    profiler.start_step("Then I see the dashboard")
+    with profiler.wait_span():
+        driver.execute("findElements")
+        # Nested waits are accounted for by the outer span only
+        with profiler.wait_span():
+            time.sleep(0.1)
+    profiler.end_step()
+
+    [step] = profiler.steps
+    assert step.command_seconds >= 0.05
+    assert step.wait_sleep_seconds >= 0.1
+    assert step.wait_sleep_seconds == pytest.approx(step.wait_seconds - step.command_seconds)
+
+
+def test_worker_reports_are_merged(tmp_path, capsys):
+    path = str(tmp_path / "profile.json")
+    parts = [worker_report_path(path, worker_id=index) for index in range(3)]
+    for part in parts[:2]:
+        profiler, driver = profiled()
+        profiler.start_step("Given I am on the login page")
+        driver.execute("get")
+        driver.execute("findElements")
+        profiler.end_step()
+        profiler.write_report(part, top_n=1)
+
+    # The third worker wrote nothing
+    assert merge_reports(parts, path) == 2
+    with open(path, encoding="utf-8") as file:
+        report = json.load(file)
+    assert report["commands"]["get"]["count"] == 2
+    assert report["page_methods"]["<step>"]["count"] == 4
+    assert len(report["steps"]) == 2
+    assert not any((tmp_path / name).exists() for name in ("profile.worker-0.json", "profile.worker-1.json"))
+    assert "Slowest steps" in capsys.readouterr().out
@@ -0,0 +1,122 @@
+import http.client
+
+import pytest
+
+from utils.config import Config
+from utils.replay_server import MODE_REPLAY, Archive, ReplayServer, _form_key, default_port
+
+FORM = {"Content-Type": "application/x-www-form-urlencoded"}
+JSON = {"Content-Type": "application/json"}
+
+
+#----------------------------------- _form_key -----------------------------------#
+
+def test_form_key_sorts_fields_and_drops_the_csrf_token():
+    first = _form_key(FORM, b"username=Admin&_token=abc&password=admin123")
+    second = _form_key(FORM, b"password=admin123&username=Admin&_token=xyz")
+    assert first == second == "password=admin123&username=Admin"
+
+
+def test_form_key_keeps_blank_fields():
+    assert _form_key(FORM, b"username=&password=x") == "password=x&username="
+
+
+def test_form_key_of_json_ignores_key_order_and_token():
+    assert _form_key(JSON, b'{"b": 1, "a": 2, "_token": "t"}') == _form_key(JSON, b'{"a": 2, "b": 1}')
+
+
+def test_form_key_of_other_bodies_is_a_hash():
+    assert _form_key({}, b"\x00binary") == _form_key({}, b"\x00binary") != _form_key({}, b"\x00other")
+    assert _form_key(FORM, b"") == ""
+
+
+#----------------------------------- Archive.find -----------------------------------#
+
+@pytest.fixture
+def archive():
+    archive = Archive("https://example.test")
+    archive.add(("GET", "/auth/login", "", ""), 200, [], b"login page")
+    archive.add(("GET", "/auth/login", "/auth/login", ""), 200, [], b"login page after error")
+    archive.add(("POST", "/auth/validate", "/auth/login", "password=admin123&username=Admin"), 302, [], b"")
+    return archive
+
+
+def body(exchange):
+    return exchange and exchange["body"]
+
+
+def test_find_exact_key(archive):
+    assert body(archive.find(("GET", "/auth/login", "/auth/login", ""))) == b"login page after error"
+
+
+def test_get_falls_back_to_the_latest_recording_of_the_path(archive):
+    assert body(archive.find(("GET", "/auth/login", "/dashboard", ""))) == b"login page after error"
+
+
+def test_post_falls_back_across_referers_with_the_same_form(archive):
+    found = archive.find(("POST", "/auth/validate", "/other", "password=admin123&username=Admin"))
+    assert found["status"] == 302
+
+
+def test_post_with_an_unrecorded_form_is_not_found(archive):
+    assert archive.find(("POST", "/auth/validate", "/auth/login", "password=wrong&username=Admin")) is None
+    assert archive.find(("PUT", "/auth/login", "", "")) is None
+
+
+def test_archive_round_trip(archive, tmp_path):
+    path = tmp_path / "archive.json.gz"
+    archive.save(path)
+    loaded = Archive.load(path)
+    assert loaded.origin == archive.origin
+    assert loaded.exchanges == archive.exchanges
+
+
+def test_save_merges_only_the_same_origin(archive, tmp_path):
+    path = tmp_path / "archive.json.gz"
+    archive.save(path)
+    newer = Archive(archive.origin)
+    newer.add(("GET", "/dashboard", "", ""), 200, [], b"dashboard")
+    newer.save(path)
+    assert len(Archive.load(path).exchanges) == 4
+    other = Archive("https://other.test")
+    other.add(("GET", "/", "", ""), 200, [], b"other")
+    other.save(path)
+    assert list(Archive.load(path).exchanges) == [("GET", "/", "", "")]
+
+
+#----------------------------------- ReplayServer -----------------------------------#
+
+def test_default_port_is_fixed_per_worker(monkeypatch):
+    monkeypatch.delenv("BEHAVE_WORKER_ID", raising=False)
+    assert default_port() == Config.REPLAY_PORT
+    monkeypatch.setenv("BEHAVE_WORKER_ID", "2")
+    assert default_port() == Config.REPLAY_PORT + 2
+
+
+def test_replay_serves_localized_responses_and_counts_misses(archive, tmp_path):
+    archive.add(("GET", "/redirect", "", ""), 302,
+                [("Location", "https://example.test/auth/login"),
+                 ("Set-Cookie", "session=1; Secure; Domain=example.test; SameSite=None")], b"")
+    path = tmp_path / "archive.json.gz"
+    archive.save(path)
+    server = ReplayServer(MODE_REPLAY, path, port=0)
+    server.start()
+    try:
+        port = int(server.url.rpartition(":")[2])
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        connection.request("GET", "/redirect")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 302
+        assert response.getheader("Location") == f"{server.url}/auth/login"
+        assert response.getheader("Set-Cookie") == "session=1; SameSite=Lax"
+        connection.request("POST", "/auth/validate", body="username=Admin&password=wrong",
+                           headers={**FORM, "Referer": f"{server.url}/auth/login"})
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 404
+        connection.close()
+    finally:
+        server.stop()
+    assert (server.served, server.unmatched) == (1, 1)
+    assert server.summary() == "Replay server: 1 response(s) served, 1 request(s) not in the archive"
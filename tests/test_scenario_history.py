@@ -0,0 +1,126 @@
+import textwrap
+
+import pytest
+from behave.parser import parse_file
+
+from utils.scenario_history import (ORDER_FAILED_FIRST, ORDER_FILE, ORDER_LONGEST_FIRST, ScenarioHistory,
+                                    scenario_location)
+
+FIRST = """
+    Feature: First
+
+      Scenario: Quick
+        Given a step
+
+      Scenario Outline: Rows
+        Given a step with <value>
+
+        Examples:
+          | value |
+          | 1     |
+          | 2     |
+    """
+
+SECOND = """
+    Feature: Second
+
+      Scenario: Slow
+        Given a step
+
+      Scenario: Flaky
+        Given a step
+    """
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = ScenarioHistory(db_path=str(tmp_path / "history.sqlite3"), runs=3)
+    yield history
+    history.close()
+
+
+@pytest.fixture
+def features(tmp_path):
+    parsed = []
+    for name, text in (("First", FIRST), ("Second", SECOND)):
+        path = tmp_path / f"{name}.feature"
+        path.write_text(textwrap.dedent(text).lstrip(), encoding="utf-8")
+        parsed.append(parse_file(str(path)))
+    return parsed
+
+
+def scenarios(features):
+    """{name: scenario}, outline rows under their own names."""
+    found = {}
+    for feature in features:
+        for item in feature.walk_scenarios():
+            found[item.name] = item
+    return found
+
+
+def names(features):
+    return [[item.name for item in feature.walk_scenarios()] for feature in features]
+
+
+def record(history, scenario, status, duration, times=1):
+    for _ in range(times):
+        history.record(scenario_location(scenario), status, duration)
+
+
+def test_without_history_the_file_order_is_kept(history, features):
+    before = names(features)
+    history.reorder(features, ORDER_FAILED_FIRST)
+    history.reorder(features, ORDER_LONGEST_FIRST)
+    assert names(features) == before
+
+
+def test_failed_first(history, features):
+    by_name = scenarios(features)
+    record(history, by_name["Quick"], "passed", 1.0)
+    record(history, by_name["Slow"], "passed", 1.0)
+    record(history, by_name["Flaky"], "failed", 1.0)
+    history.reorder(features, ORDER_FAILED_FIRST)
+    # The outline has no history: after the last failure, before the scenarios that passed
+    assert names(features)[0][0] == "Flaky"
+    assert [feature.name for feature in features] == ["Second", "First"]
+    assert names(features)[1][0].startswith("Rows")
+
+
+def test_recent_failure_ranks_after_the_last_failure(history, features):
+    by_name = scenarios(features)
+    record(history, by_name["Quick"], "failed", 1.0)
+    record(history, by_name["Quick"], "passed", 1.0)
+    record(history, by_name["Flaky"], "failed", 1.0)
+    stats = history.stats()
+    assert stats[scenario_location(by_name["Quick"])].failures == 1
+    assert not stats[scenario_location(by_name["Quick"])].last_failed
+    history.reorder(features, ORDER_FAILED_FIRST)
+    assert [feature.name for feature in features] == ["Second", "First"]
+
+
+def test_longest_first_uses_the_median_duration(history, features):
+    by_name = scenarios(features)
+    record(history, by_name["Quick"], "passed", 0.1, times=3)
+    record(history, by_name["Slow"], "passed", 5.0, times=2)
+    # One outlier does not outweigh the median
+    record(history, by_name["Flaky"], "passed", 0.2, times=2)
+    record(history, by_name["Flaky"], "passed", 60.0)
+    history.reorder(features, ORDER_LONGEST_FIRST)
+    assert names(features)[0] == ["Slow", "Flaky"]
+
+
+def test_file_order_and_unknown_orders(history, features):
+    record(history, scenarios(features)["Flaky"], "failed", 1.0)
+    before = names(features)
+    history.reorder(features, ORDER_FILE)
+    assert names(features) == before
+    with pytest.raises(ValueError):
+        history.reorder(features, "random")
+
+
+def test_prune_keeps_the_last_runs(history, features):
+    scenario = scenarios(features)["Slow"]
+    for duration in (1.0, 2.0, 3.0, 4.0, 5.0):
+        record(history, scenario, "passed", duration)
+    history.prune()
+    assert [run[2] for run in history.runs_since(0)] == [3.0, 4.0, 5.0]
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from utils.session_cache import SessionCache
+
+class CookieDriver:
+    """Just the cookie jar SessionCache touches."""
+
+    def __init__(self):
+        self.cookies = []
+
+    def get(self, url):
+        pass
+
+    def delete_all_cookies(self):
+        self.cookies = []
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+
+class Server:
+    """Decides which sessions are valid and counts UI logins."""
+
+    def __init__(self):
+        self.valid = set()
+        self.ui_logins = 0
+        self.on_check = None
+
+    def is_authenticated(self, driver):
+        if self.on_check:
+            self.on_check()
+        return any(cookie["value"] in self.valid for cookie in driver.cookies)
+
+    def ui_login(self, driver, username, password):
+        self.ui_logins += 1
+        time.sleep(0.1)
+        session = f"session-{self.ui_logins}"
+        self.valid.add(session)
+        driver.cookies = [{"name": "orangehrm", "value": session, "path": "/"}]
+        return list(driver.cookies)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = Server()
+    monkeypatch.setattr(SessionCache, "_is_authenticated", staticmethod(server.is_authenticated))
+    monkeypatch.setattr(SessionCache, "_ui_login", staticmethod(server.ui_login))
+    return server
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SessionCache(cache_dir=tmp_path, ttl=60)
+
+
+def entry(cache, username="Admin", password="admin123"):
+    return json.loads(cache._path(cache._key(username, password)).read_text(encoding="utf-8"))
+
+
+def test_second_login_reuses_the_cached_session(cache, server):
+    cache.login(CookieDriver(), "Admin", "admin123")
+    driver = CookieDriver()
+    cache.login(driver, "Admin", "admin123")
+    assert server.ui_logins == 1
+    assert driver.cookies == entry(cache)["cookies"]
+
+
+def test_expired_entry_is_replaced(cache, server):
+    cache.login(CookieDriver(), "Admin", "admin123")
+    cache.ttl = 0
+    time.sleep(0.01)
+    cache.login(CookieDriver(), "Admin", "admin123")
+    assert server.ui_logins == 2
+    assert time.time() - entry(cache)["created"] < 1
+
+
+def test_rejected_session_is_refreshed(cache, server):
+    cache.login(CookieDriver(), "Admin", "admin123")
+    # The server forgot every session (e.g. it was restarted)
+    server.valid.clear()
+    driver = CookieDriver()
+    cache.login(driver, "Admin", "admin123")
+    assert server.ui_logins == 2
+    assert entry(cache)["cookies"][0]["value"] == "session-2"
+    assert driver.cookies == entry(cache)["cookies"]
+
+
+def test_entry_refreshed_by_another_worker_is_not_deleted(cache, server):
+    cache.login(CookieDriver(), "Admin", "admin123")
+    key = cache._key("Admin", "admin123")
+    server.valid = {"fresh"}
+
+    def other_worker_logs_in():
+        # Runs while this worker finds its copy rejected
+        server.on_check = None
+        cache._store(key, "Admin", [{"name": "orangehrm", "value": "fresh", "path": "/"}])
+
+    server.on_check = other_worker_logs_in
+    driver = CookieDriver()
+    cache.login(driver, "Admin", "admin123")
+    assert server.ui_logins == 1
+    assert entry(cache)["cookies"][0]["value"] == "fresh"
+    assert driver.cookies[0]["value"] == "fresh"
+
+
+def test_concurrent_logins_share_one_ui_login(cache, server):
+    threads = [threading.Thread(target=cache.login, args=(CookieDriver(), "Admin", "admin123"))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.ui_logins == 1
+    assert not list(cache.cache_dir.glob("*.lock"))
+
+
+def test_lock_left_by_a_crashed_worker_is_taken_over(cache):
+    lock_path = cache.cache_dir / "key.lock"
+    lock_path.touch()
+    old = time.time() - 120
+    os.utime(lock_path, (old, old))
+    started = time.perf_counter()
+    with cache._lock("key", timeout=60):
+        pass
+    assert time.perf_counter() - started < 1
+    assert not lock_path.exists()
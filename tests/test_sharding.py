@@ -0,0 +1,134 @@
+import functools
+import json
+import textwrap
+from pathlib import Path
+
+import pytest
+from behave.configuration import read_configuration
+
+from utils import sharding
+from utils.config import Config
+from utils.parallel_runner import collect_scenarios, default_tags, write_worker_config
+from utils.scenario_history import ScenarioHistory
+from utils.sharding import merge_shards, shard_partition
+
+FEATURE = """
+    Feature: Sharding
+
+      Scenario: One
+        Given a step
+
+      Scenario: Two
+        Given a step
+
+      Scenario Outline: Rows
+        Given a step with <value>
+
+        Examples:
+          | value |
+          | 1     |
+          | 2     |
+          | 3     |
+
+      Scenario: Three
+        Given a step
+    """
+
+
+@pytest.fixture
+def locations(tmp_path):
+    feature = tmp_path / "Sharding.feature"
+    feature.write_text(textwrap.dedent(FEATURE).lstrip(), encoding="utf-8")
+    return collect_scenarios([feature])
+
+
+def test_every_scenario_lands_on_exactly_one_shard(locations):
+    shards = shard_partition(locations, 3)
+    assert len(shards) == 3
+    assert sorted(location for shard in shards for location in shard) == sorted(locations)
+
+
+def test_outline_rows_stay_on_one_shard(locations):
+    rows = locations[2:5]
+    for total in (2, 3, 6):
+        assert any(set(rows) <= set(shard) for shard in shard_partition(locations, total))
+
+
+def test_split_does_not_depend_on_input_order(locations):
+    assert shard_partition(list(reversed(locations)), 3) == shard_partition(locations, 3)
+
+
+def test_split_is_balanced_by_duration(locations):
+    one, two, *rows, three = locations
+    durations = {one: 10.0, two: 4.0, three: 3.0, **{row: 1.0 for row in rows}}
+    shards = shard_partition(locations, 2, durations)
+    assert [one] in shards
+    assert sorted(next(shard for shard in shards if one not in shard)) == sorted([two, three, *rows])
+
+
+def test_more_shards_than_scenarios_leaves_some_empty(locations):
+    shards = shard_partition(locations, 8)
+    assert len(shards) == 8
+    assert sum(1 for shard in shards if shard) == 4
+
+
+#----------------------------------- merge -----------------------------------#
+
+def write_shard(directory, index, total, exit_code, runs=()):
+    (directory / "allure-results").mkdir(parents=True)
+    (directory / "allure-results" / f"{index}-result.json").write_text("{}", encoding="utf-8")
+    (directory / sharding.STATUS_FILE).write_text(json.dumps(
+        {"index": index, "total": total, "exit_code": exit_code, "scenarios": []}), encoding="utf-8")
+    (directory / sharding.RUNS_FILE).write_text(json.dumps(list(runs)), encoding="utf-8")
+    return str(directory)
+
+
+@pytest.fixture
+def history_db(tmp_path, monkeypatch):
+    db_path = tmp_path / "history.sqlite3"
+    monkeypatch.setattr(sharding, "ScenarioHistory", functools.partial(ScenarioHistory, db_path=str(db_path)))
+    return db_path
+
+
+def merge(tmp_path, shards, total=0):
+    args = sharding.build_parser().parse_args(
+        ["merge", "--total", str(total), "--results", str(tmp_path / "merged"), *shards])
+    return merge_shards(args)
+
+
+def test_merge_combines_results_and_imports_runs(tmp_path, history_db):
+    shards = [write_shard(tmp_path / f"shard-{index}", index, 2, 0,
+                          [[f"features/Login.feature:{index + 10}", "passed", 2.0 + index, 1000.0]])
+              for index in range(2)]
+    assert merge(tmp_path, shards) == 0
+    assert len(list((tmp_path / "merged").iterdir())) == 2
+    history = ScenarioHistory(db_path=str(history_db))
+    try:
+        assert history.durations() == {"features/Login.feature:10": 2.0, "features/Login.feature:11": 3.0}
+    finally:
+        history.close()
+
+
+def test_merge_fails_when_a_shard_failed(tmp_path, history_db):
+    shards = [write_shard(tmp_path / f"shard-{index}", index, 2, index) for index in range(2)]
+    assert merge(tmp_path, shards) == 1
+
+
+def test_merge_fails_when_a_shard_is_missing(tmp_path, history_db):
+    assert merge(tmp_path, [write_shard(tmp_path / "shard-0", 0, 2, 0)]) == 1
+    assert merge(tmp_path, [write_shard(tmp_path / "shard-1", 1, 1, 0)], total=2) == 1
+
+
+def test_performance_scenarios_are_excluded_by_default():
+    feature = Path(Config.PROJECT_ROOT) / "features" / "Login.feature"
+    tagged = set(collect_scenarios([feature], ["@performance"]))
+    assert tagged
+    assert not tagged & set(collect_scenarios([feature]))
+    assert not tagged & {location for shard in shard_partition(collect_scenarios([feature]), 2) for location in shard}
+
+
+def test_workers_get_behave_ini_without_the_output_options(tmp_path):
+    write_worker_config(tmp_path)
+    config = read_configuration(str(tmp_path / "behave.ini"))
+    assert config["default_tags"] == default_tags() == ["not @performance"]
+    assert not {"format", "outfiles", "paths"} & set(config)
@@ -0,0 +1,104 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from utils.config import Config
+from utils.wait_helper import WaitHelper
+from utils.wait_stats import WaitStats, locator_key
+
+BUTTON = (By.ID, "button")
+LINK = (By.ID, "link")
+
+
+@pytest.fixture(autouse=True)
+def adaptive_config(monkeypatch):
+    monkeypatch.setattr(Config, "ADAPTIVE_WAIT_PERCENTILE", 50)
+    monkeypatch.setattr(Config, "ADAPTIVE_WAIT_FACTOR", 2.0)
+    monkeypatch.setattr(Config, "ADAPTIVE_WAIT_MIN", 0.5)
+    monkeypatch.setattr(Config, "ADAPTIVE_WAIT_SAMPLES", 3)
+
+
+@pytest.fixture
+def stats(tmp_path):
+    return WaitStats(enabled=True, db_path=str(tmp_path / "waits.sqlite3"), keep=5)
+
+
+def record(stats, locator, *samples):
+    for seconds in samples:
+        stats.record(locator, seconds)
+
+
+def test_learned_timeout_is_percentile_times_factor(stats):
+    record(stats, BUTTON, 1.0, 2.0, 3.0)
+    assert stats.timeout_for([BUTTON], 10) == pytest.approx(4.0)
+
+
+def test_too_few_samples_keep_the_static_timeout(stats):
+    record(stats, BUTTON, 1.0, 2.0)
+    assert stats.timeout_for([BUTTON], 10) == 10
+
+
+def test_learned_timeout_is_bounded(stats):
+    record(stats, BUTTON, 0.01, 0.01, 0.01)
+    record(stats, LINK, 8.0, 8.0, 8.0)
+    assert stats.timeout_for([BUTTON], 10) == 0.5
+    assert stats.timeout_for([LINK], 10) == 10
+
+
+def test_wait_on_several_locators_uses_the_longest(stats):
+    record(stats, BUTTON, 1.0, 1.0, 1.0)
+    record(stats, LINK, 2.0, 2.0, 2.0)
+    assert stats.timeout_for([BUTTON, LINK], 10) == pytest.approx(4.0)
+    # One locator without history keeps the static timeout for the whole wait
+    assert stats.timeout_for([BUTTON, (By.ID, "new")], 10) == 10
+
+
+def test_disabled_or_zero_timeout_is_returned_unchanged(stats, tmp_path):
+    record(stats, BUTTON, 1.0, 1.0, 1.0)
+    assert stats.timeout_for([BUTTON], 0) == 0
+    disabled = WaitStats(enabled=False, db_path=str(tmp_path / "off.sqlite3"))
+    record(disabled, BUTTON, 1.0, 1.0, 1.0)
+    assert disabled.timeout_for([BUTTON], 10) == 10
+    assert not (tmp_path / "off.sqlite3").exists()
+
+
+def test_samples_are_saved_and_trimmed(stats, tmp_path):
+    record(stats, BUTTON, *range(1, 8))
+    stats.flush()
+    reloaded = WaitStats(enabled=True, db_path=str(tmp_path / "waits.sqlite3"), keep=5)
+    assert reloaded._load()[locator_key(BUTTON)] == [3, 4, 5, 6, 7]
+
+
+@pytest.mark.parametrize("percentile, valid", [("1", True), ("99", True), ("0", False), ("100", False)])
+def test_percentile_outside_1_to_99_is_rejected(percentile, valid):
+    result = subprocess.run([sys.executable, "-c", "import utils.config"], capture_output=True, text=True,
+                            cwd=Config.PROJECT_ROOT, env={**os.environ, "ADAPTIVE_WAIT_PERCENTILE": percentile})
+    assert (result.returncode == 0) == valid
+    assert valid or "ADAPTIVE_WAIT_PERCENTILE must be between 1 and 99" in result.stderr
+
+
+@pytest.mark.parametrize("backend", ["poll", "observer"])
+def test_only_waits_that_waited_are_recorded(stats, monkeypatch, backend):
+    monkeypatch.setattr(Config, "WAIT_BACKEND", backend)
+    monkeypatch.setattr("utils.wait_helper.wait_stats", stats)
+    driver = FakeWebDriver()
+    driver.add_element(BUTTON)
+    driver.add_element(LINK, appear_after=0.2)
+    WaitHelper.wait_for_element_visible(driver, BUTTON, 5)
+    WaitHelper.wait_for_element_visible(driver, LINK, 5)
+    samples = stats._load()
+    assert locator_key(BUTTON) not in samples
+    # The element appears 0.2 s after it was added; the wait starts a little later
+    assert samples[locator_key(LINK)][0] > 0.1
+
+
+def test_learned_timeout_gives_up_early(stats, monkeypatch):
+    monkeypatch.setattr("utils.wait_helper.wait_stats", stats)
+    record(stats, BUTTON, 0.1, 0.1, 0.1)
+    with pytest.raises(TimeoutException):
+        WaitHelper.wait_for_element_visible(FakeWebDriver(), BUTTON, 30)
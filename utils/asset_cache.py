@@ -0,0 +1,120 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# [[transferSize, encodedBodySize, decodedBodySize], ...] for the static assets of
+# the current page. Sizes are 0 for cross-origin resources without
+# Timing-Allow-Origin, so those (decodedBodySize 0) cannot be classified.
+ASSET_TIMING_JS = """
+const types = ['script', 'link', 'css', 'img', 'image', 'font'];
+return performance.getEntriesByType('resource')
+    .filter(entry => types.includes(entry.initiatorType) && entry.decodedBodySize > 0)
+    .map(entry => [entry.transferSize, entry.encodedBodySize, entry.decodedBodySize]);
+"""
+
+
+class AssetCache:
+    """HTTP disk cache shared by every browser the run starts (Config.ASSET_CACHE).
+
+    A browser cannot share its cache directory with another running browser,
+    so each driver gets a copy of a per-browser seed cache. When a driver
+    quits, its cache becomes the new seed if there is none yet or the seed is
+    older than `max_age` seconds; otherwise it is deleted. After the first
+    browser has loaded the application, later browsers (recycled, isolated,
+    DRIVER_POOL=false, parallel workers) load static assets from disk.
+
+    `sample(driver)` classifies the static assets of the current page from
+    the Resource Timing API: served from cache (nothing transferred),
+    revalidated (only headers transferred, 304) or downloaded.
+    """
+
+    def __init__(self, cache_dir=Config.ASSET_CACHE_DIR, max_age=Config.ASSET_CACHE_MAX_AGE):
+        self.cache_dir = Path(cache_dir)
+        self.max_age = max_age
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.downloaded_bytes = 0
+        self.saved_bytes = 0
+
+    #----------------------------------- Cache directories -----------------------------------#
+
+    def seed_dir(self, browser) -> Path:
+        return self.cache_dir / browser
+
+    def new_cache_dir(self, browser) -> str:
+        """Copy the browser's seed cache (if any) into a new temporary directory."""
+        cache = tempfile.mkdtemp(prefix=f"secucumber-cache-{browser}-")
+        seed = self.seed_dir(browser)
+        if seed.is_dir():
+            try:
+                shutil.copytree(seed, cache, dirs_exist_ok=True)
+            except (OSError, shutil.Error):
+                # A worker was replacing the seed; start with an empty cache
+                logger.debug("Could not copy the %s asset cache", browser, exc_info=True)
+        return cache
+
+    def release(self, browser, cache) -> None:
+        """Keep a quit browser's cache as the new seed when the current one is missing or old."""
+        seed = self.seed_dir(browser)
+        try:
+            expired = not seed.is_dir() or time.time() - seed.stat().st_mtime > self.max_age
+            if expired and any(Path(cache).iterdir()):
+                self._promote(cache, seed)
+                return
+        except OSError:
+            logger.debug("Could not update the %s asset cache", browser, exc_info=True)
+        shutil.rmtree(cache, ignore_errors=True)
+
+    @staticmethod
+    def _promote(cache, seed) -> None:
+        """Rename the cache into place; renames are atomic, so racing workers are safe."""
+        seed.parent.mkdir(parents=True, exist_ok=True)
+        if seed.is_dir():
+            retired = Path(tempfile.mkdtemp(prefix=f".{seed.name}-old-", dir=seed.parent))
+            os.replace(seed, retired / seed.name)
+            shutil.rmtree(retired, ignore_errors=True)
+        try:
+            os.replace(cache, seed)
+        except OSError:
+            # Another worker promoted its cache first
+            shutil.rmtree(cache, ignore_errors=True)
+            return
+        # The seed's age is the time it was promoted
+        os.utime(seed)
+
+    #----------------------------------- Statistics -----------------------------------#
+
+    def sample(self, driver) -> None:
+        """Count the current page's static assets as hits, revalidations or misses."""
+        try:
+            entries = driver.execute_script(ASSET_TIMING_JS) or []
+        except WebDriverException:
+            logger.debug("Resource timing unavailable", exc_info=True)
+            return
+        for transferred, encoded, _ in entries:
+            if transferred == 0:
+                self.hits += 1
+                self.saved_bytes += encoded
+            elif transferred < encoded:
+                self.revalidated += 1
+                self.downloaded_bytes += transferred
+                self.saved_bytes += encoded
+            else:
+                self.misses += 1
+                self.downloaded_bytes += transferred
+
+    def summary(self) -> str:
+        total = self.hits + self.revalidated + self.misses
+        return (f"Asset cache: {self.hits}/{total} static asset(s) from cache, {self.revalidated} revalidated, "
+                f"{self.misses} downloaded; {self.downloaded_bytes / 1024:.0f} KiB transferred, "
+                f"{self.saved_bytes / 1024:.0f} KiB served locally")
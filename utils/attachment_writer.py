@@ -0,0 +1,165 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+
+import allure
+
+from utils.config import Config
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional: without it screenshots stay PNG at full size
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# format -> (allure attachment type, file extension, Pillow format name)
+SCREENSHOT_FORMATS = {
+    "png": (allure.attachment_type.PNG, "png", "PNG"),
+    "jpeg": (allure.attachment_type.JPG, "jpg", "JPEG"),
+    # allure has no WEBP attachment type; a plain mime type string is accepted too
+    "webp": ("image/webp", "webp", "WEBP"),
+}
+
+
+class AttachmentWriter:
+    """Writes screenshot attachments on a background thread.
+
+    The test thread only fetches the screenshot (base64, no decoding).
+    Decoding, optional downscaling/re-encoding and the write to a temporary
+    file happen on a worker thread fed by a bounded queue. Identical images
+    (same content hash) are encoded once. attach_pending() waits for the
+    files and attaches them with allure.attach.file; features/environment.py
+    calls it after every step, so the screenshots land on the step that took
+    them.
+
+    When disabled, or if the queue stays full, screenshots are attached
+    synchronously as before.
+    """
+
+    def __init__(self, image_format=Config.SCREENSHOT_FORMAT, max_width=Config.SCREENSHOT_MAX_WIDTH,
+                 quality=Config.SCREENSHOT_QUALITY, queue_size=Config.SCREENSHOT_QUEUE_SIZE,
+                 enabled=Config.SCREENSHOT_ASYNC):
+        if image_format not in SCREENSHOT_FORMATS:
+            raise ValueError(f"Unsupported screenshot format: {image_format}")
+        if Image is None and (image_format != "png" or max_width):
+            logger.warning("Pillow is not installed; screenshots are kept as full-size PNG")
+            image_format, max_width = "png", 0
+        self.image_format = image_format
+        self.max_width = max_width
+        self.quality = quality
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._written = set()
+        self._pending = []
+        self._dir = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def attach_screenshot(self, driver, name="screenshot") -> None:
+        """Capture the current page; it is attached by the next attach_pending()."""
+        if not self.enabled:
+            allure.attach(driver.get_screenshot_as_png(), name=name,
+                          attachment_type=allure.attachment_type.PNG)
+            return
+
+        encoded = driver.get_screenshot_as_base64()
+        digest = hashlib.sha1(encoded.encode("ascii")).hexdigest()
+        attachment_type, extension, _ = SCREENSHOT_FORMATS[self.image_format]
+        with self._lock:
+            if self._dir is None:
+                self._dir = tempfile.mkdtemp(prefix="screenshots-")
+            path = os.path.join(self._dir, f"{digest}.{extension}")
+            self._pending.append((path, name, attachment_type, extension))
+            if path in self._written:
+                return
+            self._written.add(path)
+            self._ensure_worker()
+        try:
+            self._queue.put((encoded, path), timeout=5)
+        except queue.Full:
+            logger.warning("Attachment queue is full, writing %s synchronously", name)
+            self._write(encoded, path)
+
+    def attach_pending(self) -> None:
+        """Wait for the screenshots taken so far and attach them to the current Allure step."""
+        if not self._pending:
+            return
+        self.flush()
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for path, name, attachment_type, extension in pending:
+            if os.path.exists(path):
+                allure.attach.file(path, name=name, attachment_type=attachment_type, extension=extension)
+            else:
+                logger.warning("Screenshot %s was not written, skipping the attachment", name)
+
+    def flush(self) -> None:
+        """Block until every queued screenshot is on disk."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Flush, stop the worker thread and remove the temporary files."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        if self._pending:
+            logger.warning("%d screenshot(s) taken outside a step were not attached", len(self._pending))
+            self._pending.clear()
+        self._written.clear()
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    #----------------------------------- Internals -----------------------------------#
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="attachment-writer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception:
+                logger.exception("Failed to write attachment")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, encoded, path) -> None:
+        data = self._encode(base64.b64decode(encoded))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    def _encode(self, png) -> bytes:
+        if self.image_format == "png" and not self.max_width:
+            return png
+        image = Image.open(io.BytesIO(png))
+        if self.max_width and image.width > self.max_width:
+            height = round(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height))
+        _, _, pillow_format = SCREENSHOT_FORMATS[self.image_format]
+        if pillow_format == "JPEG":
+            image = image.convert("RGB")
+        output = io.BytesIO()
+        image.save(output, format=pillow_format, quality=self.quality)
+        return output.getvalue()
+
+
+# Shared by all page objects; attached by features/environment.py after each step
+attachment_writer = AttachmentWriter()
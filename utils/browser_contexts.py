@@ -0,0 +1,224 @@
+"""Isolated browser contexts inside one shared Chromium (Config.BROWSER_CONTEXTS).
+
+A BrowserHost launches a single Chrome/Edge. Every driver handed out by
+DriverFactory is then a ContextDriver: a WebDriver session attached to that
+browser through its debugger address, working in a tab of its own CDP
+browser context (separate cookies, storage and cache, like an incognito
+window). Creating a context takes milliseconds instead of launching a browser.
+
+The parallel runner starts the host once and passes its address to the
+workers in HOST_ENV, so all workers share one browser process and one
+chromedriver. A context is disposed when its driver quits, or by the browser
+when the worker process dies and its DevTools connection drops.
+"""
+import itertools
+import json
+import logging
+import os
+import threading
+import urllib.request
+
+import websocket
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# "<chromedriver url> <debugger address>" of a host started by another process
+HOST_ENV = "BROWSER_CONTEXT_HOST"
+
+# Capability that carries the debugger address in the new-session response
+DEBUGGER_CAPABILITIES = {"chrome": "goog:chromeOptions", "edge": "ms:edgeOptions"}
+
+
+class BrowserSession:
+    """Browser-level DevTools connection (Target.* methods are not allowed on page sessions).
+
+    A reader thread keeps draining the socket: replies are handed to the
+    waiting `send`, events (of the attached tabs, e.g. Network.* after
+    Network.enable) are dropped instead of piling up between commands.
+    """
+
+    def __init__(self, debugger_address, timeout=30):
+        with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=timeout) as response:
+            url = json.load(response)["webSocketDebuggerUrl"]
+        self._socket = websocket.create_connection(url, timeout=None, suppress_origin=True)
+        self._timeout = timeout
+        self._ids = itertools.count(1)
+        self._send_lock = threading.Lock()
+        self._replies = {}
+        self._replied = threading.Condition()
+        self._closed = False
+        self._reader = threading.Thread(target=self._read, name="cdp-reader", daemon=True)
+        self._reader.start()
+
+    def send(self, method, params=None, session_id=None) -> dict:
+        """Send a command to the browser, or to the target attached as `session_id`."""
+        message = {"method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        with self._send_lock:
+            message_id = message["id"] = next(self._ids)
+            self._socket.send(json.dumps(message))
+        with self._replied:
+            if not self._replied.wait_for(lambda: message_id in self._replies or self._closed,
+                                          timeout=self._timeout):
+                raise WebDriverException(f"{method} timed out after {self._timeout}s")
+            message = self._replies.pop(message_id, None)
+        if message is None:
+            raise WebDriverException(f"{method} failed: DevTools connection closed")
+        if "error" in message:
+            raise WebDriverException(f"{method} failed: {message['error'].get('message')}")
+        return message.get("result", {})
+
+    def close(self) -> None:
+        try:
+            self._socket.close()
+        except (OSError, websocket.WebSocketException):
+            pass
+
+    def _read(self) -> None:
+        try:
+            while True:
+                message = json.loads(self._socket.recv())
+                if "id" not in message:
+                    continue
+                with self._replied:
+                    self._replies[message["id"]] = message
+                    self._replied.notify_all()
+        except (OSError, ValueError, websocket.WebSocketException):
+            pass
+        finally:
+            with self._replied:
+                self._closed = True
+                self._replied.notify_all()
+
+
+class ContextDriver(webdriver.Remote):
+    """WebDriver session confined to its own browser context of a shared browser.
+
+    `window_handles` still lists the tabs of every context in the browser;
+    only `current_window_handle` and `context_handle` belong to this driver.
+    `execute_cdp_cmd` goes to this driver's tab through the browser
+    connection, not through chromedriver.
+    """
+
+    def __init__(self, driver_url, debugger_address, options):
+        options.debugger_address = debugger_address
+        super().__init__(command_executor=driver_url, options=options)
+        try:
+            self._browser = BrowserSession(debugger_address)
+        except Exception:
+            super().quit()
+            raise
+        self.context_id = None
+        self.context_handle = None
+        self._cdp_session = None
+        self.new_context()
+
+    def new_context(self) -> None:
+        """Move to a fresh browser context and dispose of the previous one.
+
+        Per-tab CDP settings (such as blocked URLs) do not carry over.
+        """
+        previous = self.context_id
+        self.context_id = self._browser.send("Target.createBrowserContext",
+                                             {"disposeOnDetach": True})["browserContextId"]
+        self.context_handle = self._browser.send("Target.createTarget", {
+            "url": "about:blank", "browserContextId": self.context_id})["targetId"]
+        self._cdp_session = self._browser.send("Target.attachToTarget", {
+            "targetId": self.context_handle, "flatten": True})["sessionId"]
+        self.switch_to.window(self.context_handle)
+        if previous:
+            self._dispose(previous)
+
+    def execute_cdp_cmd(self, cmd, cmd_args) -> dict:
+        """Run a DevTools command in this driver's tab."""
+        return self._browser.send(cmd, cmd_args, session_id=self._cdp_session)
+    
+    def reset(self) -> bool:
+        """Start over with empty cookies and storage (DriverPool's reset for contexts)."""
+        try:
+            self.new_context()
+            return True
+        except (WebDriverException, OSError, websocket.WebSocketException):
+            logger.exception("Failed to renew browser context")
+            return False
+
+    def _dispose(self, context_id) -> None:
+        try:
+            self._browser.send("Target.disposeBrowserContext", {"browserContextId": context_id})
+        except (WebDriverException, OSError, websocket.WebSocketException):
+            logger.warning("Could not dispose browser context %s", context_id, exc_info=True)
+
+    def quit(self) -> None:
+        """End the session; the shared browser keeps running."""
+        try:
+            if self.context_id:
+                self._dispose(self.context_id)
+            self._browser.close()
+        finally:
+            super().quit()
+
+
+class BrowserHost:
+    """The one browser (and chromedriver) that ContextDrivers attach to."""
+
+    def __init__(self):
+        self.driver_url = None
+        self.debugger_address = None
+        self._driver = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.driver_url is not None
+
+    def attach_from_env(self) -> bool:
+        """Use the host another process published in HOST_ENV, if any."""
+        value = os.getenv(HOST_ENV)
+        if not value or self.running:
+            return self.running
+        self.driver_url, self.debugger_address = value.split()
+        return True
+
+    def start(self, browser, launch) -> None:
+        """Launch the host browser with `launch()` unless one is already available."""
+        with self._lock:
+            if self.attach_from_env():
+                return
+            driver = launch()
+            try:
+                self.debugger_address = driver.capabilities[DEBUGGER_CAPABILITIES[browser]]["debuggerAddress"]
+            except KeyError:
+                self._quit(driver)
+                raise WebDriverException(f"{browser} did not report a debugger address")
+            self._driver = driver
+            self.driver_url = driver.service.service_url
+            logger.info("Shared browser for browser contexts at %s", self.debugger_address)
+
+    def environment(self) -> dict:
+        """Variables that make worker processes attach to this host."""
+        return {HOST_ENV: f"{self.driver_url} {self.debugger_address}"}
+
+    def new_driver(self, options) -> ContextDriver:
+        return ContextDriver(self.driver_url, self.debugger_address, options)
+
+    def shutdown(self) -> None:
+        """Quit the host browser if this process launched it."""
+        with self._lock:
+            if self._driver is not None:
+                try:
+                    self._quit(self._driver)
+                except WebDriverException:
+                    logger.exception("Failed to quit the shared browser")
+            self._driver = None
+            self.driver_url = None
+            self.debugger_address = None
+
+    @staticmethod
+    def _quit(driver) -> None:
+        """Quit through DriverFactory, which also removes the startup-cache profile and stores the asset cache."""
+        # Imported here: driver_factory imports this module
+        from utils.driver_factory import DriverFactory
+        DriverFactory.quit_driver(driver)
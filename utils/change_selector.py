@@ -0,0 +1,528 @@
+"""Select the behave scenarios affected by a change.
+
+Usage:
+    python -m utils.change_selector --base origin/main --output affected.txt
+    python -m behave @affected.txt
+
+    git diff -U0 origin/main | python -m utils.change_selector --diff - --tags=@smoke
+
+A static index links every scenario to the step functions its steps match,
+and every Python symbol (function, method, class attribute such as a locator)
+to the symbols it references: steps -> page objects -> BasePage / WaitHelper
+-> DriverFactory. Hooks in features/environment.py run for every scenario, so
+their dependencies affect all of them. The changed lines of a diff are mapped
+to symbols and scenarios, and the scenarios depending on them are written as
+a behave include file (one FILE:LINE per line).
+
+The index is resolved statically, so anything it cannot attribute to a symbol
+(unknown files, deleted or renamed modules) selects every scenario.
+The per-file part of the index is cached and only re-parsed for files whose
+content changed.
+"""
+import argparse
+import ast
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from behave.matchers import make_matcher
+from behave.model import ScenarioOutline
+from behave.parser import parse_file
+from behave.tag_expression import make_tag_expression
+
+from utils.parallel_runner import default_tags
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+INDEXED_DIRS = ("features", "pages", "utils")
+ENVIRONMENT_MODULE = "features.environment"
+MODULE_SCOPE = "<module>"
+# Changes to these paths never affect a scenario
+IGNORED_PATTERNS = ("*.md", ".gitignore", "benchmarks/*", ".github/*", "structure")
+STEP_DECORATORS = {"given", "when", "then", "step"}
+CACHE_VERSION = 1
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+#----------------------------------- Per-file extraction -----------------------------------#
+
+def _module_name(path) -> str:
+    return ".".join(Path(path).with_suffix("").parts)
+
+
+def _call_type(value):
+    """Class name from `Name(...)` (or `Name(...) if x else None`), else None."""
+    if isinstance(value, ast.IfExp):
+        return _call_type(value.body) or _call_type(value.orelse)
+    if isinstance(value, ast.Call) and isinstance(value.func, ast.Name):
+        return value.func.id
+    return None
+
+
+def _references(node):
+    """Raw names and attribute chains used inside `node`."""
+    refs = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+            refs.add(("name", child.id))
+        elif isinstance(child, ast.Attribute):
+            owner = child.value
+            if isinstance(owner, ast.Name):
+                refs.add(("self", child.attr) if owner.id in ("self", "cls") else ("attr", owner.id, child.attr))
+            elif isinstance(owner, ast.Attribute) and isinstance(owner.value, ast.Name):
+                if owner.value.id in ("self", "cls"):
+                    refs.add(("selfattr", owner.attr, child.attr))
+                elif owner.value.id == "context":
+                    refs.add(("context", owner.attr, child.attr))
+    return sorted(refs)
+
+
+def _span(node):
+    start = min([node.lineno] + [decorator.lineno for decorator in getattr(node, "decorator_list", [])])
+    return [start, node.end_lineno]
+
+
+def _step_patterns(node):
+    """[[step_type, pattern], ...] for @given/@when/@then/@step decorators."""
+    patterns = []
+    for decorator in node.decorator_list:
+        if (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Name)
+                and decorator.func.id in STEP_DECORATORS and decorator.args
+                and isinstance(decorator.args[0], ast.Constant) and isinstance(decorator.args[0].value, str)):
+            patterns.append([decorator.func.id, decorator.args[0].value])
+    return patterns
+
+
+def _import_target(module, node):
+    """Absolute module of an ImportFrom, resolving relative imports."""
+    if not node.level:
+        return node.module or ""
+    base = module.split(".")[:-node.level]
+    return ".".join(base + ([node.module] if node.module else []))
+
+
+def extract_python(path, source):
+    """Symbols, raw references and type hints of one module (cacheable, JSON-safe)."""
+    module = _module_name(path)
+    tree = ast.parse(source, filename=str(path))
+    data = {"module": module, "symbols": {}, "refs": {}, "imports": {}, "types": {},
+            "classes": {}, "context_types": {}, "steps": []}
+
+    def add_symbol(name, node, refs):
+        data["symbols"][name] = _span(node)
+        data["refs"][name] = refs
+
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                data["imports"][alias.asname or alias.name.split(".")[0]] = alias.name
+        elif isinstance(node, ast.ImportFrom):
+            target = _import_target(module, node)
+            for alias in node.names:
+                data["imports"][alias.asname or alias.name] = f"{target}:{alias.name}"
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            add_symbol(node.name, node, _references(node))
+            for step_type, pattern in _step_patterns(node):
+                data["steps"].append([step_type, pattern, node.name])
+        elif isinstance(node, ast.ClassDef):
+            add_symbol(node.name, node, _references(ast.Module(body=node.bases + node.decorator_list, type_ignores=[])))
+            info = {"bases": [base.id for base in node.bases if isinstance(base, ast.Name)], "attr_types": {}}
+            data["classes"][node.name] = info
+            for member in node.body:
+                if isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    add_symbol(f"{node.name}.{member.name}", member, _references(member))
+                    for child in ast.walk(member):
+                        if isinstance(child, ast.Assign) and _call_type(child.value):
+                            for target in child.targets:
+                                if (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                                        and target.value.id == "self"):
+                                    info["attr_types"][target.attr] = _call_type(child.value)
+                elif isinstance(member, (ast.Assign, ast.AnnAssign)):
+                    targets = member.targets if isinstance(member, ast.Assign) else [member.target]
+                    for target in targets:
+                        if isinstance(target, ast.Name):
+                            add_symbol(f"{node.name}.{target.id}", member, _references(member))
+                            if member.value is not None and _call_type(member.value):
+                                info["attr_types"][target.id] = _call_type(member.value)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    add_symbol(target.id, node, _references(node))
+                    if node.value is not None and _call_type(node.value):
+                        data["types"][target.id] = _call_type(node.value)
+
+    # Page objects and helpers stored on the behave context by steps and hooks
+    for child in ast.walk(tree):
+        if isinstance(child, ast.Assign) and _call_type(child.value):
+            for target in child.targets:
+                if (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                        and target.value.id == "context"):
+                    data["context_types"][target.attr] = f"{module}:{_call_type(child.value)}"
+    return data
+
+
+def extract_feature(path, relative):
+    """Scenario locations and the line spans used to map feature edits to them."""
+    feature = parse_file(str(path))
+    if feature is None:
+        return {"scenarios": [], "blocks": []}
+    scenarios, blocks = [], []
+    top_level = list(feature.scenarios)
+    starts = [min([item.line] + [tag.line for tag in item.tags if getattr(tag, "line", None)]) for item in top_level]
+    for index, item in enumerate(top_level):
+        end = starts[index + 1] - 1 if index + 1 < len(top_level) else 10 ** 9
+        rows = item.scenarios if isinstance(item, ScenarioOutline) else [item]
+        block = {"span": [starts[index], end], "rows": {}}
+        for scenario in rows:
+            location = f"{relative.as_posix()}:{scenario.line}"
+            scenarios.append({"location": location, "tags": sorted(scenario.effective_tags),
+                              "steps": [[step.step_type, step.name] for step in scenario.all_steps]})
+            block["rows"][str(scenario.line)] = location
+        blocks.append(block)
+    return {"scenarios": scenarios, "blocks": blocks}
+
+
+#----------------------------------- Index -----------------------------------#
+
+class DependencyIndex:
+    """Scenario -> step function -> symbol graph for the whole project."""
+
+    def __init__(self, root=PROJECT_ROOT, cache_file=None):
+        self.root = Path(root)
+        self.cache_file = Path(cache_file) if cache_file else self.root / ".change-selector" / "index.json"
+        self.files = {}
+        self.reparsed = []
+
+    #----------------------------------- Building -----------------------------------#
+
+    def build(self) -> "DependencyIndex":
+        """Load the cache and re-extract only files whose content changed."""
+        cached = self._load_cache()
+        for directory in INDEXED_DIRS:
+            for path in sorted((self.root / directory).rglob("*")):
+                if path.suffix not in (".py", ".feature") or "__pycache__" in path.parts:
+                    continue
+                relative = path.relative_to(self.root).as_posix()
+                content = path.read_bytes()
+                digest = hashlib.sha1(content).hexdigest()
+                entry = cached.get(relative)
+                if entry is None or entry["hash"] != digest:
+                    entry = {"hash": digest, "data": self._extract(Path(relative), content)}
+                    self.reparsed.append(relative)
+                self.files[relative] = entry
+        if self.reparsed or set(cached) != set(self.files):
+            self._save_cache()
+        self._link()
+        return self
+
+    def _extract(self, relative, content):
+        if relative.suffix == ".feature":
+            return extract_feature(self.root / relative, relative)
+        try:
+            return extract_python(relative, content.decode("utf-8"))
+        except (SyntaxError, UnicodeDecodeError):
+            return None
+
+    def _load_cache(self) -> dict:
+        try:
+            cache = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return cache.get("files", {}) if cache.get("version") == CACHE_VERSION else {}
+
+    def _save_cache(self) -> None:
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"version": CACHE_VERSION, "files": self.files}), encoding="utf-8")
+        os.replace(tmp_path, self.cache_file)
+
+    #----------------------------------- Linking -----------------------------------#
+
+    def _link(self) -> None:
+        """Resolve raw references into symbol -> symbol edges and scenario roots."""
+        self.modules = {}
+        self.module_files = {}
+        self.scenarios = {}
+        self.feature_blocks = {}
+        for relative, entry in self.files.items():
+            data = entry["data"]
+            if data is None:
+                continue
+            if relative.endswith(".feature"):
+                self.feature_blocks[relative] = data["blocks"]
+                for scenario in data["scenarios"]:
+                    self.scenarios[scenario["location"]] = scenario
+            else:
+                self.modules[data["module"]] = data
+                self.module_files[relative] = data["module"]
+
+        self.context_types = {}
+        for data in self.modules.values():
+            self.context_types.update(data["context_types"])
+
+        self.edges = defaultdict(set)
+        for module, data in self.modules.items():
+            for name, refs in data["refs"].items():
+                symbol = f"{module}:{name}"
+                self.edges[symbol].add(f"{module}:{MODULE_SCOPE}")
+                owner = name.split(".")[0] if "." in name else None
+                if owner:
+                    self.edges[symbol].add(f"{module}:{owner}")
+                if name in data["classes"]:
+                    init = self._member(f"{module}:{name}", "__init__")
+                    if init:
+                        self.edges[symbol].add(init)
+                for ref in refs:
+                    self.edges[symbol].update(self._resolve(module, owner, ref))
+
+        self.step_definitions = [(step_type, make_matcher(None, pattern), f"{module}:{function}")
+                                 for module, data in self.modules.items()
+                                 for step_type, pattern, function in data["steps"]]
+        environment = self.modules.get(ENVIRONMENT_MODULE, {"symbols": {}})
+        self.hook_symbols = {f"{ENVIRONMENT_MODULE}:{name}" for name in environment["symbols"]}
+
+    def _symbol(self, qualified):
+        """Follow re-exports until `module:name` is a defined symbol, else None."""
+        for _ in range(10):
+            module, _, name = qualified.partition(":")
+            data = self.modules.get(module)
+            if data is None:
+                return None
+            if name in data["symbols"]:
+                return qualified
+            if name not in data["imports"]:
+                return None
+            qualified = data["imports"][name]
+        return None
+
+    def _resolve_name(self, module, name):
+        data = self.modules[module]
+        if name in data["symbols"]:
+            return f"{module}:{name}"
+        if name in data["imports"]:
+            return self._symbol(data["imports"][name])
+        return None
+
+    def _member(self, class_symbol, member):
+        """`Class.member`, looked up through the base classes."""
+        module, _, class_name = class_symbol.partition(":")
+        data = self.modules.get(module)
+        if data is None or class_name not in data["classes"]:
+            return None
+        if f"{class_name}.{member}" in data["symbols"]:
+            return f"{module}:{class_name}.{member}"
+        for base in data["classes"][class_name]["bases"]:
+            base_symbol = self._resolve_name(module, base)
+            found = base_symbol and self._member(base_symbol, member)
+            if found:
+                return found
+        return None
+
+    def _attr_type(self, class_symbol, attribute):
+        module, _, class_name = class_symbol.partition(":")
+        data = self.modules.get(module)
+        if data is None or class_name not in data["classes"]:
+            return None
+        info = data["classes"][class_name]
+        if attribute in info["attr_types"]:
+            return self._resolve_name(module, info["attr_types"][attribute])
+        for base in info["bases"]:
+            base_symbol = self._resolve_name(module, base)
+            found = base_symbol and self._attr_type(base_symbol, attribute)
+            if found:
+                return found
+        return None
+
+    def _typed_member(self, symbol, member):
+        """Member of a class, or of the class a module-level singleton was built from."""
+        module, _, name = symbol.partition(":")
+        data = self.modules.get(module)
+        if data is None:
+            return None
+        if name in data["classes"]:
+            return self._member(symbol, member)
+        if name in data["types"]:
+            class_symbol = self._resolve_name(module, data["types"][name])
+            return class_symbol and self._member(class_symbol, member)
+        return None
+
+    def _resolve(self, module, owner, ref):
+        """Symbols one raw reference points to (possibly none)."""
+        owner_symbol = f"{module}:{owner}" if owner else None
+        kind = ref[0]
+        found = []
+        if kind == "name":
+            # Class bodies see their own attributes (e.g. a locator dict built from locators)
+            found.append(owner_symbol and self._member(owner_symbol, ref[1]))
+            found.append(self._resolve_name(module, ref[1]))
+        elif kind == "attr":
+            target = self._resolve_name(module, ref[1])
+            found.append(target)
+            found.append(target and self._typed_member(target, ref[2]))
+        elif kind == "self" and owner_symbol:
+            found.append(self._member(owner_symbol, ref[1]))
+        elif kind == "selfattr" and owner_symbol:
+            found.append(self._member(owner_symbol, ref[1]))
+            attr_class = self._attr_type(owner_symbol, ref[1])
+            found.append(attr_class and self._member(attr_class, ref[2]))
+        elif kind == "context":
+            class_symbol = self.context_types.get(ref[1])
+            class_symbol = class_symbol and self._symbol(class_symbol)
+            found.append(class_symbol and self._member(class_symbol, ref[2]))
+        return {symbol for symbol in found if symbol}
+
+    #----------------------------------- Queries -----------------------------------#
+
+    def scenario_roots(self, location) -> set:
+        """Step functions matched by the scenario's steps, plus the environment hooks."""
+        roots = set(self.hook_symbols)
+        for step_type, text in self.scenarios[location]["steps"]:
+            for definition_type, matcher, symbol in self.step_definitions:
+                if definition_type in (step_type, "step") and matcher.match(text):
+                    roots.add(symbol)
+                    break
+        return roots
+
+    def affected_symbols(self, changed) -> set:
+        """Every symbol that (transitively) depends on a changed symbol."""
+        dependents = defaultdict(set)
+        for symbol, targets in self.edges.items():
+            for target in targets:
+                dependents[target].add(symbol)
+        affected, pending = set(changed), list(changed)
+        while pending:
+            for dependent in dependents[pending.pop()]:
+                if dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+        return affected
+
+    def symbol_at(self, relative, line):
+        """Innermost symbol of a module whose span contains `line`."""
+        module = self.module_files[relative]
+        best, best_size = f"{module}:{MODULE_SCOPE}", None
+        for name, (start, end) in self.modules[module]["symbols"].items():
+            if start <= line <= end and (best_size is None or end - start < best_size):
+                best, best_size = f"{module}:{name}", end - start
+        return best
+
+    def scenarios_at(self, relative, line) -> set:
+        """Scenarios touched by an edit of a feature file line."""
+        for block in self.feature_blocks.get(relative, []):
+            start, end = block["span"]
+            if start <= line <= end:
+                row = block["rows"].get(str(line))
+                return {row} if row and len(block["rows"]) > 1 else set(block["rows"].values())
+        # Feature header or Background: every scenario of the file
+        return {location for block in self.feature_blocks.get(relative, []) for location in block["rows"].values()}
+
+
+#----------------------------------- Diff parsing -----------------------------------#
+
+def parse_diff(diff_text):
+    """{path: set(new-side line numbers)}; None marks a deleted or renamed file."""
+    changes = {}
+    path = None
+    for line in diff_text.splitlines():
+        if line.startswith("diff --git "):
+            path = line.split(" b/", 1)[-1]
+            changes.setdefault(path, set())
+        elif line.startswith("rename from ") or line.startswith("deleted file"):
+            changes[path] = None
+        elif line.startswith("+++ ") and path is not None:
+            target = line[4:]
+            if target != "/dev/null":
+                path = target[2:] if target.startswith("b/") else target
+                changes.setdefault(path, set())
+        elif path is not None and changes.get(path) is not None:
+            match = HUNK_HEADER.match(line)
+            if match:
+                start, count = int(match.group(1)), int(match.group(2) or 1)
+                # Pure deletions (count 0) touch the lines around the removal point
+                lines = range(start, start + count) if count else (start, start + 1)
+                changes[path].update(line_number for line_number in lines if line_number > 0)
+    return changes
+
+
+def git_diff(base, root=PROJECT_ROOT) -> str:
+    """Diff between `base` and the working tree."""
+    return subprocess.run(["git", "diff", "-U0", "--find-renames", base, "--"], capture_output=True,
+                          text=True, check=True, cwd=root).stdout
+
+
+#----------------------------------- Selection -----------------------------------#
+
+def select_scenarios(index, changes, tags=None):
+    """Return (locations, reasons) for the scenarios affected by `changes`.
+
+    tags: tag expressions; behave.ini's default_tags when none are given.
+    """
+    everything = sorted(index.scenarios)
+    changed_symbols, direct, reasons = set(), set(), []
+    for path, lines in changes.items():
+        if any(fnmatch.fnmatch(path, pattern) for pattern in IGNORED_PATTERNS):
+            continue
+        if path.endswith(".feature") and lines is not None:
+            for line in lines:
+                direct.update(location for location in index.scenarios_at(path, line) if location in index.scenarios)
+        elif path in index.module_files and lines is not None:
+            changed_symbols.update(index.symbol_at(path, line) for line in lines)
+        elif not path.endswith(".py") or Path(path).parts[0] in INDEXED_DIRS:
+            reasons.append(f"{path}: not attributable to a symbol, selecting everything")
+            direct.update(everything)
+        # Python files outside the indexed directories are not used by scenarios
+
+    affected = index.affected_symbols(changed_symbols)
+    reasons.extend(sorted(changed_symbols))
+    selected = direct | {location for location in everything if index.scenario_roots(location) & affected}
+
+    tag_expression = make_tag_expression(tags or default_tags())
+    locations = [location for location in everything
+                 if location in selected and tag_expression.check(index.scenarios[location]["tags"])]
+    return locations, reasons
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m utils.change_selector",
+                                     description="Select the behave scenarios affected by a git diff.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--base", default="origin/main", help="Git ref to diff the working tree against")
+    source.add_argument("--diff", help="Read a unified diff from this file ('-' for stdin) instead of running git")
+    parser.add_argument("-t", "--tags", action="append", default=[],
+                        help="Tag expression, same syntax as behave --tags (default: behave.ini default_tags)")
+    parser.add_argument("-o", "--output", help="Write the selection as a behave include file (run: behave @FILE)")
+    parser.add_argument("--cache", default=str(PROJECT_ROOT / ".change-selector" / "index.json"),
+                        help="Index cache file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.diff:
+        diff_text = sys.stdin.read() if args.diff == "-" else Path(args.diff).read_text(encoding="utf-8")
+    else:
+        diff_text = git_diff(args.base)
+
+    index = DependencyIndex(cache_file=args.cache).build()
+    locations, reasons = select_scenarios(index, parse_diff(diff_text), args.tags)
+
+    print(f"🔎 Index: {len(index.files)} file(s), {len(index.reparsed)} re-parsed")
+    for reason in reasons:
+        print(f"  changed: {reason}")
+    print(f"🎯 {len(locations)} of {len(index.scenarios)} scenario(s) affected")
+    for location in locations:
+        print(f"  {location}")
+    if args.output:
+        Path(args.output).write_text("".join(f"{location}\n" for location in locations), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
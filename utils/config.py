@@ -5,15 +5,105 @@ dotenv.load_dotenv()
 
 class Config:
     
+    #PATHS (relative paths resolve against the project root so parallel workers share them)
+    PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    
     #ENVIRONMENT VARIABLES
     BASE_URL = os.getenv("BASE_URL", "https://opensource-demo.orangehrmlive.com")
     BROWSER = os.getenv("BROWSER", 'chrome').lower()
+    # "record": proxy BASE_URL and archive the traffic; "replay": serve the archive locally (utils/replay_server.py)
+    REPLAY_MODE = os.getenv("REPLAY_MODE", "off").lower()
+    REPLAY_ARCHIVE = os.path.join(PROJECT_ROOT, os.getenv("REPLAY_ARCHIVE", ".replay/orangehrm.json.gz"))
+    # Fixed so the local origin (cookies, storage, cached assets) is the same in every run
+    REPLAY_PORT = int(os.getenv("REPLAY_PORT", 8800))
     HEADLESS = os.getenv("HEADLESS", "false").lower() == "true"
     
     #TIMEOUTS
+    # "explicit" (default): implicit wait disabled, only WaitHelper waits apply.
+    # "implicit": legacy mode, IMPLICIT_WAIT is set on the driver as well.
+    WAIT_MODE = os.getenv("WAIT_MODE", "explicit").lower()
     IMPLICIT_WAIT = int(os.getenv("IMPLICIT_WAIT", 10))
     EXPLICIT_WAIT = int(os.getenv("EXPLICIT_WAIT", 10))
     PAGE_LOAD_TIMEOUT = int(os.getenv("PAGE_LOAD_TIMEOUT", 30))
+    # "poll" (default): WebDriverWait asks the browser every poll interval.
+    # "observer": one async script per wait, answered by a MutationObserver.
+    WAIT_BACKEND = os.getenv("WAIT_BACKEND", "poll").lower()
+    
+    #ADAPTIVE WAITS (timeouts learned per locator: percentile (1-99) of recent
+    # appear times * factor, between ADAPTIVE_WAIT_MIN and the static timeout)
+    ADAPTIVE_WAITS = os.getenv("ADAPTIVE_WAITS", "false").lower() == "true"
+    ADAPTIVE_WAIT_DB = os.path.join(PROJECT_ROOT, os.getenv("ADAPTIVE_WAIT_DB", ".history/waits.sqlite3"))
+    ADAPTIVE_WAIT_PERCENTILE = int(os.getenv("ADAPTIVE_WAIT_PERCENTILE", 95))
+    if not 1 <= ADAPTIVE_WAIT_PERCENTILE <= 99:
+        raise ValueError(f"ADAPTIVE_WAIT_PERCENTILE must be between 1 and 99, got {ADAPTIVE_WAIT_PERCENTILE}")
+    ADAPTIVE_WAIT_FACTOR = float(os.getenv("ADAPTIVE_WAIT_FACTOR", 3.0))
+    ADAPTIVE_WAIT_MIN = float(os.getenv("ADAPTIVE_WAIT_MIN", 1.0))
+    ADAPTIVE_WAIT_SAMPLES = int(os.getenv("ADAPTIVE_WAIT_SAMPLES", 5))
+    ADAPTIVE_WAIT_KEEP = int(os.getenv("ADAPTIVE_WAIT_KEEP", 50))
+    
+    #LEAN MODE (skip heavy resources on page load; correctness relies on explicit waits)
+    LEAN_MODE = os.getenv("LEAN_MODE", "false").lower() == "true"
+    PAGE_LOAD_STRATEGY = os.getenv("PAGE_LOAD_STRATEGY", "eager" if LEAN_MODE else "normal").lower()
+    BLOCK_IMAGES = os.getenv("BLOCK_IMAGES", "false").lower() == "true"
+    BLOCK_FONTS = os.getenv("BLOCK_FONTS", str(LEAN_MODE)).lower() == "true"
+    BLOCKED_URL_PATTERNS = [pattern.strip() for pattern in os.getenv(
+        "BLOCKED_URL_PATTERNS",
+        "*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*" if LEAN_MODE else "",
+    ).split(",") if pattern.strip()]
+    
+    #FORM FILLING ("type": real keystrokes, "js": set values via JavaScript + input/change events)
+    FILL_STRATEGY = os.getenv("FILL_STRATEGY", "type").lower()
+    
+    #ELEMENT CACHE (reuse located elements until the page navigates, refreshes or is clicked)
+    ELEMENT_CACHE = os.getenv("ELEMENT_CACHE", "false").lower() == "true"
+    
+    #STARTUP CACHE (cached driver binary paths + pre-initialized profile template)
+    STARTUP_CACHE = os.getenv("STARTUP_CACHE", "false").lower() == "true"
+    STARTUP_CACHE_DIR = os.path.join(PROJECT_ROOT, os.getenv("STARTUP_CACHE_DIR", ".startup-cache"))
+    
+    #ASSET CACHE (HTTP disk cache copied into every new browser; re-seeded after ASSET_CACHE_MAX_AGE seconds)
+    ASSET_CACHE = os.getenv("ASSET_CACHE", "false").lower() == "true"
+    ASSET_CACHE_DIR = os.path.join(PROJECT_ROOT, os.getenv("ASSET_CACHE_DIR", ".asset-cache"))
+    ASSET_CACHE_MAX_AGE = int(os.getenv("ASSET_CACHE_MAX_AGE", 86400))
+    
+    #DRIVER POOL
+    DRIVER_POOL = os.getenv("DRIVER_POOL", "true").lower() == "true"
+    DRIVER_RECYCLE_AFTER = int(os.getenv("DRIVER_RECYCLE_AFTER", 20))
+    ISOLATION_TAG = os.getenv("ISOLATION_TAG", "isolated")
+    # Consecutive Scenario Outline rows keep the browser and reset the page in place
+    OUTLINE_RESET = os.getenv("OUTLINE_RESET", "true").lower() == "true"
+    # Spare browsers launched in the background ahead of need (0 disables pre-warming)
+    PREWARM_DEPTH = int(os.getenv("PREWARM_DEPTH", 0))
+    # One shared Chrome/Edge; every driver is a session in its own isolated browser context
+    BROWSER_CONTEXTS = os.getenv("BROWSER_CONTEXTS", "false").lower() == "true"
+    
+    #SESSION CACHE
+    SESSION_CACHE_DIR = os.path.join(PROJECT_ROOT, os.getenv("SESSION_CACHE_DIR", ".session-cache"))
+    SESSION_TTL = int(os.getenv("SESSION_TTL", 900))
+    
+    #SCENARIO HISTORY (duration + outcome per scenario; SCENARIO_ORDER: file | failed-first | longest-first)
+    SCENARIO_HISTORY = os.getenv("SCENARIO_HISTORY", "false").lower() == "true"
+    SCENARIO_HISTORY_DB = os.path.join(PROJECT_ROOT, os.getenv("SCENARIO_HISTORY_DB", ".history/scenarios.sqlite3"))
+    SCENARIO_HISTORY_RUNS = int(os.getenv("SCENARIO_HISTORY_RUNS", 10))
+    SCENARIO_ORDER = os.getenv("SCENARIO_ORDER", "file").lower()
+    
+    #SCREENSHOTS (format: png | jpeg | webp; jpeg/webp and downscaling need Pillow)
+    SCREENSHOT_ASYNC = os.getenv("SCREENSHOT_ASYNC", "true").lower() == "true"
+    SCREENSHOT_FORMAT = os.getenv("SCREENSHOT_FORMAT", "png").lower()
+    SCREENSHOT_MAX_WIDTH = int(os.getenv("SCREENSHOT_MAX_WIDTH", 0))
+    SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", 80))
+    SCREENSHOT_QUEUE_SIZE = int(os.getenv("SCREENSHOT_QUEUE_SIZE", 16))
+    
+    #PROFILING (WebDriver command instrumentation, off by default)
+    PROFILE_COMMANDS = os.getenv("PROFILE_COMMANDS", "false").lower() == "true"
+    PROFILE_REPORT = os.path.join(PROJECT_ROOT, os.getenv("PROFILE_REPORT", "reports/webdriver-profile.json"))
+    PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", 10))
+    
+    #PAGE METRICS (Navigation/Paint/Resource/Long Task timings after navigations and measured actions)
+    PERF_METRICS = os.getenv("PERF_METRICS", "false").lower() == "true"
+    PERF_METRICS_FILE = os.path.join(PROJECT_ROOT, os.getenv("PERF_METRICS_FILE", "reports/perf-metrics.jsonl"))
+    # How long a measured click may take to start navigating before it counts as in-page (ms)
+    PERF_NAVIGATION_GRACE = int(os.getenv("PERF_NAVIGATION_GRACE", 300))
     
     #USER CREDENTIALS
     USERNAME = os.getenv("USERNAME","Admin")
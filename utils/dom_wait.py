@@ -0,0 +1,110 @@
+"""Event-driven waits: resolve inside the page as soon as a condition holds.
+
+One execute_async_script call installs a MutationObserver and answers when
+the DOM changes into the expected state, instead of WebDriverWait asking the
+browser every poll interval. Used by WaitHelper with WAIT_BACKEND=observer.
+"""
+from utils.js_locator import FIND_ALL_JS, to_js_locator
+
+# Element states understood by WAIT_JS
+VISIBLE = "visible"
+CLICKABLE = "clickable"
+PRESENT = "present"
+ABSENT = "absent"
+HIDDEN = "hidden"
+TEXT = "text"
+
+# arguments: [[name, kind, query, state, text], ...], timeout in ms, callback.
+# Calls back with [name, element, waited] for the first target in the expected
+# state (element is null for absent/hidden; waited is false when it already was
+# at the first check), or null on timeout. Visibility changes
+# caused only by CSS (transitions, stylesheets) do not mutate the DOM, so a
+# slow in-page re-check backs the observer up without any extra round trip.
+WAIT_JS = FIND_ALL_JS + """
+const [targets, timeout, done] = [arguments[0], arguments[1], arguments[arguments.length - 1]];
+function check() {
+    for (const [name, kind, query, state, text] of targets) {
+        let elements = [];
+        try {
+            elements = findAll(kind, query);
+        } catch (e) {
+            elements = [];
+        }
+        const visible = elements.filter(isVisible);
+        if (state === 'present' && elements.length) {
+            return [name, elements[0]];
+        }
+        if (state === 'visible' && visible.length) {
+            return [name, visible[0]];
+        }
+        if (state === 'clickable') {
+            const enabled = visible.find(element => !element.disabled);
+            if (enabled) {
+                return [name, enabled];
+            }
+        }
+        if (state === 'text' && elements.length && (elements[0].innerText || elements[0].value || '').includes(text)) {
+            return [name, elements[0]];
+        }
+        if (state === 'absent' && !elements.length) {
+            return [name, null];
+        }
+        if (state === 'hidden' && !visible.length) {
+            return [name, null];
+        }
+    }
+    return null;
+}
+const found = check();
+if (found) {
+    done([found[0], found[1], false]);
+    return;
+}
+let finished = false;
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    clearInterval(backstop);
+    clearTimeout(deadline);
+    done(result && [result[0], result[1], true]);
+}
+const observer = new MutationObserver(() => {
+    const result = check();
+    if (result) {
+        finish(result);
+    }
+});
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+const backstop = setInterval(() => {
+    const result = check();
+    if (result) {
+        finish(result);
+    }
+}, 100);
+const deadline = setTimeout(() => finish(null), timeout);
+"""
+
+# WebDriver's default script timeout (DriverFactory does not change it); reading
+# the actual value would cost a round trip per wait
+SCRIPT_TIMEOUT = 30
+SCRIPT_TIMEOUT_MARGIN = 1.0
+
+
+def wait_in_page(driver, targets, timeout):
+    """Wait for the first of `targets` to reach its state.
+
+    targets: [(name, locator, state), ...], or (name, locator, TEXT, text).
+    Returns (name, element, waited), or None when nothing matched within the
+    timeout (capped just below the script timeout); waited is False when
+    the target was already in its state at the first check. WebDriverException
+    (scripts unavailable, page navigated mid-wait, ...) is left to the
+    caller, which falls back to polling.
+    """
+    budget = min(timeout, SCRIPT_TIMEOUT - SCRIPT_TIMEOUT_MARGIN)
+    payload = [[target[0], *to_js_locator(target[1]), target[2], target[3] if len(target) > 3 else ""]
+               for target in targets]
+    result = driver.execute_async_script(WAIT_JS, payload, int(budget * 1000))
+    return (result[0], result[1], bool(result[2])) if result else None
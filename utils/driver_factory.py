@@ -1,19 +1,48 @@
+import logging
+import shutil
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.edge.options import Options as EdgeOptions
 
+from utils.asset_cache import AssetCache
+from utils.browser_contexts import DEBUGGER_CAPABILITIES, BrowserHost, ContextDriver
 from utils.config import Config
+from utils.profiler import profiler
+from utils.startup_cache import CHROMIUM_STARTUP_ARGS, StartupCache
+
+logger = logging.getLogger(__name__)
 
 class DriverFactory:
     """Factory class responsible for creating WebDriver instances based on the given configuration."""
     
+    # Resolved binaries and profile templates (used when Config.STARTUP_CACHE is on)
+    startup_cache = StartupCache()
+    # Temporary profile directory of each driver launched from the template
+    _profile_dirs = {}
+    # HTTP cache shared between browsers (used when Config.ASSET_CACHE is on)
+    asset_cache = AssetCache()
+    # (browser, cache directory) of each driver launched with the asset cache
+    _asset_cache_dirs = {}
+    # Shared browser that drivers attach to when Config.BROWSER_CONTEXTS is on
+    browser_host = BrowserHost()
+    # Browsers already warned about that lean-mode URL blocking does not apply to them
+    _url_blocking_warned = set()
+    
     @staticmethod
     def create_driver():
         browser = Config.BROWSER.lower()
         
-        if browser == 'chrome':
+        if Config.BROWSER_CONTEXTS:
+            driver = DriverFactory._create_context_driver(browser)
+        elif browser == 'chrome':
             driver = DriverFactory._create_driver_chrome()
         elif browser == 'firefox':
             driver = DriverFactory._create_driver_firefox()
@@ -22,9 +51,72 @@ class DriverFactory:
         else:
             raise ValueError(f"Unsupported browser: {browser}")
         
-        driver.implicitly_wait(Config.IMPLICIT_WAIT)
+        DriverFactory._block_urls(driver)
+        DriverFactory._configure_waits(driver)
         driver.set_page_load_timeout(Config.PAGE_LOAD_TIMEOUT)
-        return driver
+        return profiler.instrument(driver)
+    
+    @staticmethod
+    def _configure_waits(driver):
+        """Apply Config.WAIT_MODE: explicit waits only, or the legacy implicit wait; check WAIT_BACKEND."""
+        wait_mode = Config.WAIT_MODE
+        if wait_mode == 'explicit':
+            driver.implicitly_wait(0)
+        elif wait_mode == 'implicit':
+            if Config.IMPLICIT_WAIT:
+                # Every find_elements()/absence check inside a WebDriverWait poll
+                # will block for the implicit timeout before the explicit wait sees it
+                logger.warning("Implicit wait (%ss) is active together with explicit waits; "
+                               "negative checks can stall. Set WAIT_MODE=explicit to avoid this.",
+                               Config.IMPLICIT_WAIT)
+            driver.implicitly_wait(Config.IMPLICIT_WAIT)
+        else:
+            raise ValueError(f"Unsupported wait mode: {wait_mode}")
+        if Config.WAIT_BACKEND not in ("poll", "observer"):
+            raise ValueError(f"Unsupported wait backend: {Config.WAIT_BACKEND}")
+    
+    @staticmethod
+    def _blocked_url_patterns():
+        """URL patterns dropped by the browser in lean mode (Chromium only)."""
+        patterns = list(Config.BLOCKED_URL_PATTERNS)
+        extensions = []
+        if Config.BLOCK_IMAGES:
+            extensions += ["png", "jpg", "jpeg", "gif", "svg", "webp", "ico"]
+        if Config.BLOCK_FONTS:
+            extensions += ["woff", "woff2", "ttf", "otf", "eot"]
+        # Patterns match the whole URL: cache-busted assets end in "?v=..."
+        for extension in extensions:
+            patterns += [f"*.{extension}", f"*.{extension}?*"]
+        return patterns
+    
+    @staticmethod
+    def supports_cdp(driver) -> bool:
+        """Chromium drivers and ContextDrivers; Selenium's execute_cdp_cmd raises on Firefox."""
+        return hasattr(driver, "execute_cdp_cmd") and driver.name != "firefox"
+    
+    @staticmethod
+    def _block_urls(driver):
+        """Block resource URLs through CDP where the browser supports it."""
+        patterns = DriverFactory._blocked_url_patterns()
+        if not patterns:
+            return
+        if not DriverFactory.supports_cdp(driver):
+            # Firefox blocks images and fonts through preferences, but not custom patterns
+            skipped = Config.BLOCKED_URL_PATTERNS if driver.name == "firefox" else patterns
+            if skipped and driver.name not in DriverFactory._url_blocking_warned:
+                DriverFactory._url_blocking_warned.add(driver.name)
+                logger.warning("Lean mode: %s has no CDP, these URLs are not blocked: %s",
+                               driver.name, ", ".join(skipped))
+            return
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    
+    @staticmethod
+    def _apply_lean_chromium_options(options):
+        """Page load strategy and content settings shared by Chrome and Edge."""
+        options.page_load_strategy = Config.PAGE_LOAD_STRATEGY
+        if Config.BLOCK_IMAGES:
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
     
     @staticmethod
     def _create_driver_chrome():
@@ -37,10 +129,10 @@ class DriverFactory:
             options.add_argument("--window-size=1920,1080")
             options.add_argument("--no-sandbox")
             options.add_argument("--disable-dev-shm-usage")
+        DriverFactory._apply_lean_chromium_options(options)
 
         # Always create the Chrome driver; options may include headless args when configured
-        driver = webdriver.Chrome(options=options)
-        return driver
+        return DriverFactory._launch('chrome', webdriver.Chrome, Service, options)
     
     @staticmethod
     def _create_driver_firefox():
@@ -49,9 +141,14 @@ class DriverFactory:
         options = FirefoxOptions()
         if Config.HEADLESS:
             options.add_argument("--headless")
+        options.page_load_strategy = Config.PAGE_LOAD_STRATEGY
+        # Firefox has no CDP URL blocking; preferences cover images and web fonts
+        if Config.BLOCK_IMAGES:
+            options.set_preference("permissions.default.image", 2)
+        if Config.BLOCK_FONTS:
+            options.set_preference("browser.display.use_document_fonts", 0)
         
-        driver = webdriver.Firefox(options=options)
-        return driver
+        return DriverFactory._launch('firefox', webdriver.Firefox, webdriver.FirefoxService, options)
     
     @staticmethod
     def _create_driver_edge():
@@ -60,14 +157,285 @@ class DriverFactory:
         options = EdgeOptions()
         if Config.HEADLESS:
             options.add_argument("--headless")
+        DriverFactory._apply_lean_chromium_options(options)
         
-        driver = webdriver.Edge(options=options)
+        return DriverFactory._launch('edge', webdriver.Edge, webdriver.EdgeService, options)
+    
+    @staticmethod
+    def start_browser_host(browser):
+        """Launch the browser shared by all browser contexts (no-op once running)."""
+        launchers = {'chrome': DriverFactory._create_driver_chrome, 'edge': DriverFactory._create_driver_edge}
+        if browser not in DEBUGGER_CAPABILITIES:
+            raise ValueError(f"Browser contexts need Chrome or Edge, not {browser}")
+        DriverFactory.browser_host.start(browser, launchers[browser])
+        return DriverFactory.browser_host
+    
+    @staticmethod
+    def _create_context_driver(browser):
+        """Attach to the shared browser (launched on first use) in a new browser context."""
+        host = DriverFactory.start_browser_host(browser)
+        # Launch arguments belong to the host; the attached session only needs the W3C settings
+        options = EdgeOptions() if browser == 'edge' else ChromeOptions()
+        options.page_load_strategy = Config.PAGE_LOAD_STRATEGY
+        return host.new_driver(options)
+    
+    @staticmethod
+    def _launch(browser, driver_class, service_class, options):
+        """Start the browser, on a copy of the shared asset cache when it is enabled."""
+        if not Config.ASSET_CACHE:
+            return DriverFactory._start(browser, driver_class, service_class, options)
+        
+        cache = DriverFactory.asset_cache.new_cache_dir(browser)
+        if browser == 'firefox':
+            options.set_preference("browser.cache.disk.parent_directory", cache)
+        else:
+            options.add_argument(f"--disk-cache-dir={cache}")
+        try:
+            driver = DriverFactory._start(browser, driver_class, service_class, options)
+        except Exception:
+            shutil.rmtree(cache, ignore_errors=True)
+            raise
+        DriverFactory._asset_cache_dirs[driver] = (browser, cache)
+        return driver
+    
+    @staticmethod
+    def _start(browser, driver_class, service_class, options):
+        """Start the browser, through the startup cache when it is enabled."""
+        if not Config.STARTUP_CACHE:
+            return driver_class(options=options)
+        
+        paths = DriverFactory.startup_cache.binary_paths(browser)
+        if paths.get("browser_path"):
+            options.binary_location = paths["browser_path"]
+        profile = DriverFactory.startup_cache.new_profile(browser)
+        if browser == 'firefox':
+            options.add_argument("-profile")
+            options.add_argument(profile)
+        else:
+            options.add_argument(f"--user-data-dir={profile}")
+            for argument in CHROMIUM_STARTUP_ARGS:
+                options.add_argument(argument)
+        
+        try:
+            driver = driver_class(options=options, service=service_class(executable_path=paths["driver_path"]))
+        except Exception:
+            shutil.rmtree(profile, ignore_errors=True)
+            raise
+        DriverFactory._profile_dirs[driver] = profile
         return driver
     
     @staticmethod
     def quit_driver(driver):
         if driver:
             driver.quit()
-            
-    
-            
\ No newline at end of file
+            profile = DriverFactory._profile_dirs.pop(driver, None)
+            if profile:
+                shutil.rmtree(profile, ignore_errors=True)
+            # The browser has exited, so its cache can be copied safely
+            cache = DriverFactory._asset_cache_dirs.pop(driver, None)
+            if cache:
+                DriverFactory.asset_cache.release(*cache)
+
+
+class DriverPool:
+    """Keeps warm WebDriver instances alive for the whole run.
+
+    Drivers are handed out with `acquire()` and given back with `release()`.
+    A released driver has its state wiped (cookies, storage, extra windows)
+    and is parked on `about:blank` until the next scenario needs it.
+    Drivers are recycled after `recycle_after` scenarios or as soon as a
+    health check fails.
+    """
+
+    def __init__(self, recycle_after=Config.DRIVER_RECYCLE_AFTER, prewarmer=None):
+        self.recycle_after = recycle_after
+        self.prewarmer = prewarmer
+        self._idle = []
+        self._uses = {}
+
+    def acquire(self, fresh=False):
+        """Return a ready driver, launching a new one when none is available.
+
+        fresh: skip the idle drivers and always launch a new browser.
+        """
+        while self._idle and not fresh:
+            driver = self._idle.pop()
+            if DriverPool.is_healthy(driver):
+                return driver
+            logger.warning("Discarding unhealthy pooled driver")
+            self._discard(driver)
+
+        driver = self.prewarmer.take() if self.prewarmer else DriverFactory.create_driver()
+        self._uses[driver] = 0
+        return driver
+
+    def release(self, driver, discard=False):
+        """Give a driver back to the pool.
+
+        discard: quit the driver instead of keeping it (isolated scenarios).
+        """
+        if driver is None:
+            return
+        uses = self._uses.get(driver, 0) + 1
+        self._uses[driver] = uses
+
+        if discard or (self.recycle_after and uses >= self.recycle_after):
+            self._discard(driver)
+            return
+        if not DriverPool.reset_driver(driver):
+            self._discard(driver)
+            return
+        self._idle.append(driver)
+
+    def shutdown(self):
+        """Quit every idle driver. Call once at the end of the run."""
+        while self._idle:
+            self._discard(self._idle.pop())
+        self._uses.clear()
+
+    def _discard(self, driver):
+        self._uses.pop(driver, None)
+        try:
+            DriverFactory.quit_driver(driver)
+        except WebDriverException:
+            logger.exception("Failed to quit pooled driver")
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        """Cheap liveness probe: the session must still answer commands."""
+        try:
+            return bool(driver.window_handles)
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def reset_driver(driver) -> bool:
+        """Wipe browser state so the next scenario starts clean.
+
+        Returns False when the driver could not be reset and should be dropped.
+        """
+        if isinstance(driver, ContextDriver):
+            # The other tabs belong to other contexts; a new context is empty anyway
+            if not driver.reset():
+                return False
+            try:
+                # Blocked URLs are set per tab, and the new context has a new one
+                DriverFactory._block_urls(driver)
+                return True
+            except WebDriverException:
+                logger.exception("Failed to block URLs in the new browser context")
+                return False
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            # Storage is per-origin, so it has to be cleared before leaving the page
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except WebDriverException:
+                pass
+            driver.delete_all_cookies()
+            if DriverFactory.supports_cdp(driver):
+                # Chromium: also drop cookies set for other domains
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+
+            driver.get("about:blank")
+            return True
+        except WebDriverException:
+            logger.exception("Failed to reset pooled driver")
+            return False
+
+
+class DriverPrewarmer:
+    """Launches spare browsers on background threads ahead of need.
+
+    `take()` returns a spare that finished starting while the previous
+    scenario was running and immediately schedules its replacement, keeping
+    `depth` launches in flight. Metrics record how often the startup cost was
+    fully hidden (hit), partly hidden (the spare was still starting) or paid
+    in full (miss).
+    """
+
+    def __init__(self, depth=Config.PREWARM_DEPTH):
+        self.depth = depth
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.hidden_seconds = 0.0
+        self.waited_seconds = 0.0
+        self._pending = deque()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, depth), thread_name_prefix="driver-prewarm")
+
+    def start(self) -> None:
+        """Begin warming the first spares (call from before_all)."""
+        self._fill()
+
+    def take(self):
+        """Return a ready driver, launching one synchronously if no spare is available."""
+        with self._lock:
+            future = self._pending.popleft() if self._pending else None
+
+        driver = None
+        if future is not None:
+            was_ready = future.done()
+            started = time.perf_counter()
+            try:
+                driver, launch_seconds = future.result()
+            except Exception:
+                # Not only WebDriverException: a driver download or an OS error fails the launch too
+                logger.exception("Pre-warmed browser failed to start, launching one now")
+            else:
+                waited = time.perf_counter() - started
+                if DriverPool.is_healthy(driver):
+                    if was_ready:
+                        self.hits += 1
+                    else:
+                        self.partial_hits += 1
+                    self.waited_seconds += waited
+                    self.hidden_seconds += max(0.0, launch_seconds - waited)
+                else:
+                    DriverFactory.quit_driver(driver)
+                    driver = None
+
+        self._fill()
+        if driver is None:
+            self.misses += 1
+            started = time.perf_counter()
+            driver = DriverFactory.create_driver()
+            self.waited_seconds += time.perf_counter() - started
+        return driver
+
+    def shutdown(self) -> None:
+        """Quit every unused spare, waiting for launches still in progress."""
+        with self._lock:
+            self._closed = True
+            pending, self._pending = list(self._pending), deque()
+        for future in pending:
+            try:
+                driver, _ = future.result()
+                DriverFactory.quit_driver(driver)
+            except Exception:
+                logger.exception("Failed to clean up pre-warmed browser")
+        self._executor.shutdown(wait=True)
+
+    def summary(self) -> str:
+        taken = self.hits + self.partial_hits + self.misses
+        return (f"Pre-warmed browsers: {self.hits}/{taken} ready, {self.partial_hits} still starting, "
+                f"{self.misses} cold; startup hidden {self.hidden_seconds:.1f}s, "
+                f"waited {self.waited_seconds:.1f}s")
+
+    def _fill(self) -> None:
+        with self._lock:
+            while not self._closed and len(self._pending) < self.depth:
+                self._pending.append(self._executor.submit(self._launch))
+
+    @staticmethod
+    def _launch():
+        started = time.perf_counter()
+        driver = DriverFactory.create_driver()
+        return driver, time.perf_counter() - started
@@ -0,0 +1,67 @@
+"""Helpers for resolving Selenium (By, value) locators inside the page with JavaScript.
+
+Locators are translated to either a CSS selector or an XPath expression in
+Python, so scripts only need the small FIND_ALL_JS function below.
+"""
+from selenium.webdriver.common.by import By
+
+# findAll(kind, query) -> Array<Element>; kind is "css" or "xpath"
+FIND_ALL_JS = """
+function findAll(kind, query) {
+    if (kind === 'xpath') {
+        const result = document.evaluate(query, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const elements = [];
+        for (let i = 0; i < result.snapshotLength; i++) {
+            elements.push(result.snapshotItem(i));
+        }
+        return elements;
+    }
+    return Array.from(document.querySelectorAll(query));
+}
+function isVisible(element) {
+    if (!element.isConnected) {
+        return false;
+    }
+    const style = window.getComputedStyle(element);
+    if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') {
+        return false;
+    }
+    const rect = element.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+"""
+
+
+def _xpath_literal(value: str) -> str:
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    parts = value.split('"')
+    return "concat(" + ", '\"', ".join(f'"{part}"' for part in parts) + ")"
+
+
+def _css_string(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def to_js_locator(locator):
+    """Translate a (By, value) tuple into a [kind, query] pair understood by FIND_ALL_JS."""
+    by, value = locator
+    if by == By.CSS_SELECTOR:
+        return ["css", value]
+    if by == By.XPATH:
+        return ["xpath", value]
+    if by == By.ID:
+        return ["css", f"[id={_css_string(value)}]"]
+    if by == By.NAME:
+        return ["css", f"[name={_css_string(value)}]"]
+    if by == By.CLASS_NAME:
+        return ["xpath", f"//*[contains(concat(' ', normalize-space(@class), ' '), {_xpath_literal(' ' + value + ' ')})]"]
+    if by == By.TAG_NAME:
+        return ["css", value]
+    if by == By.LINK_TEXT:
+        return ["xpath", f"//a[normalize-space(.)={_xpath_literal(value)}]"]
+    if by == By.PARTIAL_LINK_TEXT:
+        return ["xpath", f"//a[contains(., {_xpath_literal(value)})]"]
+    raise ValueError(f"Unsupported locator strategy: {by}")
@@ -0,0 +1,433 @@
+"""Replay the login scenarios as concurrent virtual users over HTTP.
+
+Usage:
+    python -m utils.load_runner -u 200 --ramp-up 30 --duration 60
+    python -m utils.load_runner -u 50 --rps 100 -t @negative --json reports/load.json
+    python -m utils.load_runner -u 20 --duration 10 --stub
+
+Every scenario in the given feature files is translated into the requests
+LoginPage.login() makes the browser send: load the login page (following
+redirects from BASE_URL) and read its CSRF token, post `_token`, `username`
+and `password` to /auth/validate, and follow the redirect to the dashboard
+or back to the login page. Empty credentials are stopped by the form's
+client-side validation, so those scenarios only load the login page. A
+scenario fails when the outcome differs from its Then step.
+
+Virtual users start evenly over --ramp-up seconds and loop over the
+scenarios until --duration ends; each has its own cookies, and all of them
+share one pool of keep-alive connections. --rps caps the total request rate.
+The report lists throughput, errors and latency percentiles per request.
+--stub runs against utils.login_stub on a local port instead of BASE_URL.
+"""
+import argparse
+import asyncio
+import html
+import json
+import re
+import ssl
+import statistics
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from behave.parser import parse_file
+from behave.tag_expression import make_tag_expression
+
+from pages.login_page import LoginPage
+from utils.config import Config
+from utils.login_stub import LoginStubServer
+
+# <auth-login :token="&quot;...&quot;"> on the login page
+TOKEN_PATTERN = re.compile(r':token="([^"]*)"')
+MAX_REDIRECTS = 5
+
+# Step text -> (action, value group); anything else makes the scenario unusable
+STEP_ACTIONS = [
+    (re.compile(r"I am on the OrangeHRM login page$"), "open"),
+    (re.compile(r"I enter (?:valid |invalid )?username [\"'](.*)[\"']$"), "username"),
+    (re.compile(r"I enter (?:valid |invalid )?password [\"'](.*)[\"']$"), "password"),
+    (re.compile(r"I leave the username field empty$"), "username"),
+    (re.compile(r"I leave the password field empty$"), "password"),
+    (re.compile(r"I click on the login button$"), "submit"),
+    (re.compile(r"I should be redirected to the dashboard page$"), LoginPage.OUTCOME_SUCCESS),
+    (re.compile(r"I should see an error message"), LoginPage.OUTCOME_ERROR),
+    (re.compile(r"I should see the dropdown in the header$"), None),
+]
+
+
+class LoginFlow:
+    """One login scenario reduced to credentials and the expected outcome."""
+
+    def __init__(self, name, username="", password="", expected=None):
+        self.name = name
+        self.username = username
+        self.password = password
+        self.expected = expected
+
+    @staticmethod
+    def from_scenario(scenario):
+        """Translate a scenario's steps, or return None when a step has no HTTP equivalent."""
+        flow = LoginFlow(scenario.name)
+        for step in scenario.all_steps:
+            for pattern, action in STEP_ACTIONS:
+                match = pattern.match(step.name)
+                if match:
+                    break
+            else:
+                return None
+            if action in ("username", "password"):
+                setattr(flow, action, match.group(1) if match.groups() else "")
+            elif action in (LoginPage.OUTCOME_SUCCESS, LoginPage.OUTCOME_ERROR):
+                flow.expected = action
+        return flow
+
+
+def load_flows(paths, tags=None):
+    """Return (flows, skipped scenario names) for the scenarios in `paths`."""
+    tag_expression = make_tag_expression(tags or [])
+    feature_files = []
+    for path in paths:
+        path = Path(path)
+        feature_files.extend(sorted(path.rglob("*.feature")) if path.is_dir() else [path])
+    flows, skipped = [], []
+    for feature_file in feature_files:
+        feature = parse_file(str(feature_file))
+        if feature is None:
+            continue
+        for scenario in feature.walk_scenarios():
+            if not tag_expression.check(scenario.effective_tags):
+                continue
+            flow = LoginFlow.from_scenario(scenario)
+            if flow is None:
+                skipped.append(scenario.name)
+            else:
+                flows.append(flow)
+    return flows, skipped
+
+
+#----------------------------------- HTTP client -----------------------------------#
+
+class Response:
+    def __init__(self, status, headers, cookies, body):
+        self.url = None
+        self.status = status
+        self.headers = headers
+        self.cookies = cookies
+        self.body = body
+
+
+class ConnectionPool:
+    """HTTP/1.1 keep-alive connections to one origin, at most `size` in use at once."""
+
+    def __init__(self, base_url, size):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.host_header = parts.netloc
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def request(self, method, path, headers, body=b"") -> Response:
+        async with self._slots:
+            while True:
+                reused = bool(self._idle)
+                reader, writer = self._idle.pop() if reused else await asyncio.open_connection(
+                    self.host, self.port, ssl=self.ssl)
+                try:
+                    response, keep_alive = await self._exchange(reader, writer, method, path, headers, body)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused:
+                        # The server closed an idle keep-alive connection; retry on a new one
+                        continue
+                    raise
+                except BaseException:
+                    # Cancelled (request timeout) or a malformed response: the connection
+                    # is in the middle of an exchange and cannot be reused
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return response
+
+    async def _exchange(self, reader, writer, method, path, headers, body):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host_header}", "Accept-Encoding: identity",
+                 f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+        status_line = await reader.readuntil(b"\r\n")
+        if not status_line:
+            raise ConnectionError("Connection closed")
+        status = int(status_line.split()[1])
+        response_headers, cookies = {}, []
+        while True:
+            line = (await reader.readuntil(b"\r\n")).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                cookies.append(value)
+            response_headers[name] = value
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            content = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            content = await self._read_chunked(reader)
+        elif "content-length" in response_headers:
+            content = await reader.readexactly(int(response_headers["content-length"]))
+        else:
+            content = await reader.read()
+            response_headers["connection"] = "close"
+        keep_alive = response_headers.get("connection", "").lower() != "close"
+        return Response(status, response_headers, cookies, content), keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader) -> bytes:
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                # Trailers end with an empty line
+                while (await reader.readuntil(b"\r\n")) != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    def close(self) -> None:
+        while self._idle:
+            self._idle.pop()[1].close()
+
+
+class RatePacer:
+    """Spaces requests 1/rps seconds apart across all virtual users (rps=0: no limit)."""
+
+    def __init__(self, rps):
+        self.interval = 1.0 / rps if rps else 0.0
+        self._next = time.perf_counter()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+#----------------------------------- Measurements -----------------------------------#
+
+class LoadStats:
+    """Latencies (seconds) and error counts per request name and per scenario."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.iterations = 0
+        self.failed_iterations = 0
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, name, seconds, error=False) -> None:
+        self.latencies.setdefault(name, []).append(seconds)
+        self.errors[name] = self.errors.get(name, 0) + bool(error)
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        rows = {}
+        for name, samples in self.latencies.items():
+            cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else samples * 99
+            rows[name] = {"count": len(samples), "errors": self.errors.get(name, 0),
+                          "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+                          "p50_ms": round(cuts[49] * 1000, 1), "p90_ms": round(cuts[89] * 1000, 1),
+                          "p95_ms": round(cuts[94] * 1000, 1), "p99_ms": round(cuts[98] * 1000, 1),
+                          "max_ms": round(max(samples) * 1000, 1)}
+        requests = sum(row["count"] for name, row in rows.items() if not name.startswith("scenario:"))
+        errors = sum(row["errors"] for name, row in rows.items() if not name.startswith("scenario:"))
+        return {"elapsed_s": round(elapsed, 2), "requests": requests, "errors": errors,
+                "rps": round(requests / elapsed, 2) if elapsed else 0.0,
+                "iterations": self.iterations, "failed_iterations": self.failed_iterations, "requests_by_name": rows}
+
+
+#----------------------------------- Virtual users -----------------------------------#
+
+class VirtualUser:
+    """One simulated browser: its own cookies, requests through the shared pool."""
+
+    def __init__(self, base_url, pool, pacer, stats):
+        self.base_url = base_url.rstrip("/")
+        self.pool = pool
+        self.pacer = pacer
+        self.stats = stats
+        self.cookies = {}
+
+    async def send(self, name, method, url, form=None, referer=None, follow=True) -> Response:
+        for _ in range(MAX_REDIRECTS + 1):
+            headers = {"User-Agent": "secucumber-load"}
+            if self.cookies:
+                headers["Cookie"] = "; ".join(f"{key}={value}" for key, value in self.cookies.items())
+            if referer:
+                headers["Referer"] = referer
+            body = b""
+            if form is not None:
+                body = urlencode(form).encode("utf-8")
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+            parts = urlsplit(url)
+            await self.pacer.wait()
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    self.pool.request(method, (parts.path or "/") + (f"?{parts.query}" if parts.query else ""),
+                                      headers, body),
+                    Config.PAGE_LOAD_TIMEOUT)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                self.stats.record(name, time.perf_counter() - started, error=True)
+                raise
+            self.stats.record(name, time.perf_counter() - started, error=response.status >= 400)
+            response.url = url
+            for cookie in response.cookies:
+                key, _, value = cookie.split(";", 1)[0].partition("=")
+                self.cookies[key.strip()] = value.strip()
+            location = response.headers.get("location")
+            if not (follow and 300 <= response.status < 400 and location):
+                return response
+            # Browsers turn the request into a GET after a redirect
+            referer, url, method, form = url, urljoin(url, location), "GET", None
+        return response
+
+    async def run(self, flow) -> bool:
+        """Run one scenario and return whether it ended as its Then step expects."""
+        login_page = await self.send("GET login page", "GET", self.base_url)
+        if login_page.status != 200:
+            return False
+        if not flow.username or not flow.password:
+            # The form's "Required" validation keeps the browser from posting
+            return flow.expected != LoginPage.OUTCOME_SUCCESS
+        match = TOKEN_PATTERN.search(login_page.body.decode("utf-8", "replace"))
+        token = html.unescape(match.group(1)).strip('"') if match else ""
+        # The form posts to .../auth/validate next to .../auth/login
+        response = await self.send("POST auth/validate", "POST", urljoin(login_page.url, "validate"),
+                                   form={"_token": token, "username": flow.username, "password": flow.password},
+                                   referer=login_page.url, follow=False)
+        location = response.headers.get("location", "")
+        outcome = LoginPage.OUTCOME_SUCCESS if LoginPage.DASHBOARD_PATH in location else LoginPage.OUTCOME_ERROR
+        if location:
+            name = "GET dashboard" if outcome == LoginPage.OUTCOME_SUCCESS else "GET login page (error)"
+            landing = await self.send(name, "GET", urljoin(response.url, location), referer=login_page.url)
+            if landing.status != 200:
+                return False
+        self.cookies.clear()
+        return flow.expected is None or outcome == flow.expected
+
+
+async def _user_loop(user, flows, offset, start_delay, deadline, stats):
+    await asyncio.sleep(start_delay)
+    index = offset
+    while time.perf_counter() < deadline:
+        flow = flows[index % len(flows)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            passed = await user.run(flow)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            passed = False
+            user.cookies.clear()
+        stats.iterations += 1
+        stats.failed_iterations += not passed
+        stats.record(f"scenario: {flow.name}", time.perf_counter() - started, error=not passed)
+
+
+async def run_load(base_url, flows, users, ramp_up, duration, rps=0.0, pool_size=None) -> dict:
+    """Run `users` virtual users over `flows` and return the report."""
+    stats = LoadStats()
+    pool = ConnectionPool(base_url, pool_size or users)
+    pacer = RatePacer(rps)
+    deadline = time.perf_counter() + duration
+    try:
+        await asyncio.gather(*(
+            _user_loop(VirtualUser(base_url, pool, pacer, stats), flows, index,
+                       ramp_up * index / users, deadline, stats)
+            for index in range(users)))
+    finally:
+        pool.close()
+    stats.finished = time.perf_counter()
+    return stats.report()
+
+
+#----------------------------------- CLI -----------------------------------#
+
+def print_report(report) -> None:
+    print("\n" + "="*50)
+    print(f"{report['requests']} request(s) in {report['elapsed_s']}s ({report['rps']} req/s), "
+          f"{report['errors']} error(s); {report['iterations']} scenario run(s), "
+          f"{report['failed_iterations']} failed")
+    # As wide as the longest name, so outline rows ("... -- @1.2") stay apart
+    width = max([len("request")] + [len(name) for name in report["requests_by_name"]])
+    print(f"{'request':{width}} {'count':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    # Requests first, then whole scenarios
+    for name, row in sorted(report["requests_by_name"].items(), key=lambda item: item[0].startswith("scenario:")):
+        print(f"{name:{width}} {row['count']:7} {row['errors']:5} {row['rps']:8} {row['p50_ms']:8} "
+              f"{row['p90_ms']:8} {row['p95_ms']:8} {row['p99_ms']:8} {row['max_ms']:8}")
+    print("(latencies in ms)")
+    print("="*50)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m utils.load_runner",
+                                     description="Replay the login scenarios as concurrent virtual users over HTTP.")
+    parser.add_argument("paths", nargs="*", default=[str(Path(Config.PROJECT_ROOT) / "features" / "Login.feature")],
+                        help="Feature files or directories (default: features/Login.feature)")
+    parser.add_argument("-t", "--tags", action="append", default=[],
+                        help="Tag expression, same syntax as behave --tags")
+    parser.add_argument("-u", "--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which the users start")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run, ramp-up included")
+    parser.add_argument("--rps", type=float, default=0.0, help="Target requests per second (0: unlimited)")
+    parser.add_argument("--pool-size", type=int, default=0, help="Open connections (default: one per user)")
+    parser.add_argument("--base-url", default=Config.BASE_URL, help="Application to load (default: BASE_URL)")
+    parser.add_argument("--stub", action="store_true", help="Start utils.login_stub and load it instead")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    parser.add_argument("--max-error-rate", type=float, default=0.0,
+                        help="Exit with 1 when failed scenario runs exceed this fraction")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    flows, skipped = load_flows(args.paths, args.tags)
+    for name in skipped:
+        print(f"⚠️  Skipped (no HTTP equivalent for a step): {name}")
+    if not flows:
+        print("No scenarios matched.")
+        return 0
+
+    stub = LoginStubServer() if args.stub else None
+    base_url = stub.start() if stub else args.base_url
+    print(f"🚦 {args.users} virtual user(s) over {len(flows)} scenario(s) against {base_url} "
+          f"for {args.duration:.0f}s (ramp-up {args.ramp_up:.0f}s"
+          + (f", {args.rps:.0f} req/s" if args.rps else "") + ")")
+    try:
+        report = asyncio.run(run_load(base_url, flows, max(1, args.users), args.ramp_up, args.duration,
+                                      args.rps, args.pool_size or None))
+    finally:
+        if stub:
+            stub.stop()
+
+    print_report(report)
+    if args.json:
+        Path(args.json).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    error_rate = report["failed_iterations"] / report["iterations"] if report["iterations"] else 1.0
+    return 1 if error_rate > args.max_error_rate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Minimal stand-in for OrangeHRM's login flow, for load-testing the load runner itself.
+
+Usage:
+    python -m utils.login_stub [--port 8801] [--latency 20]
+
+Speaks the same protocol the browser uses on the real login page: the login
+page carries a per-session CSRF token, the form posts `_token`, `username`
+and `password` to /auth/validate and is redirected to the dashboard or back
+to the login page. Credentials are Config.USERNAME / Config.PASSWORD (the
+username is case-insensitive, as in OrangeHRM).
+"""
+import argparse
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+from utils.config import Config
+
+LOGIN_PATH = "/web/index.php/auth/login"
+VALIDATE_PATH = "/web/index.php/auth/validate"
+DASHBOARD_PATH = "/web/index.php/dashboard/index"
+SESSION_COOKIE = "orangehrm"
+
+LOGIN_HTML = """<!DOCTYPE html>
+<html><body><div id="app"><auth-login :error="{error}" :token="&quot;{token}&quot;"></auth-login></div></body></html>
+"""
+DASHBOARD_HTML = """<!DOCTYPE html>
+<html><body><h6>Dashboard</h6><p class="oxd-userdropdown-name">{user}</p></body></html>
+"""
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Hundreds of virtual users connect at once; the default backlog of 5 drops SYNs
+    request_queue_size = 512
+
+
+class LoginStubServer:
+    """Serves the login flow on http://127.0.0.1:<port>; sessions live in memory."""
+
+    def __init__(self, port=0, latency=0.0, username=Config.USERNAME, password=Config.PASSWORD):
+        self.port = port
+        self.latency = latency
+        self.username = username
+        self.password = password
+        self.url = None
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self) -> str:
+        self._server = _Server(("127.0.0.1", self.port), _handler_for(self))
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, name="login-stub", daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def session(self, session_id) -> dict:
+        with self._lock:
+            if session_id not in self._sessions:
+                self._sessions[session_id] = {"token": secrets.token_hex(16), "user": None, "error": False}
+            return self._sessions[session_id]
+
+    def authenticate(self, form) -> bool:
+        return form.get("username", "").lower() == self.username.lower() and form.get("password") == self.password
+
+
+def _handler_for(stub):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Send headers and body in one segment: separate small writes stall on delayed ACKs
+        wbufsize = -1
+        disable_nagle_algorithm = True
+
+        def _session(self):
+            cookies = dict(part.strip().split("=", 1) for part in self.headers.get("Cookie", "").split(";")
+                           if "=" in part)
+            session_id = cookies.get(SESSION_COOKIE)
+            if session_id is None:
+                session_id = secrets.token_hex(16)
+                self._new_cookie = f"{SESSION_COOKIE}={session_id}; Path=/; HttpOnly"
+            return stub.session(session_id)
+
+        def _reply(self, status, body="", location=None):
+            if stub.latency:
+                time.sleep(stub.latency)
+            payload = body.encode("utf-8")
+            self.send_response(status)
+            if location:
+                self.send_header("Location", location)
+            if self._new_cookie:
+                self.send_header("Set-Cookie", self._new_cookie)
+            self.send_header("Content-Type", "text/html; charset=UTF-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            self._new_cookie = None
+            session = self._session()
+            path = self.path.split("?", 1)[0]
+            if path in ("/", "/web/index.php"):
+                self._reply(302, location=DASHBOARD_PATH if session["user"] else LOGIN_PATH)
+            elif path == LOGIN_PATH:
+                error, session["error"] = session["error"], False
+                self._reply(200, LOGIN_HTML.format(error="&quot;Invalid credentials&quot;" if error else "null",
+                                                   token=session["token"]))
+            elif path == DASHBOARD_PATH:
+                if session["user"]:
+                    self._reply(200, DASHBOARD_HTML.format(user=session["user"]))
+                else:
+                    self._reply(302, location=LOGIN_PATH)
+            else:
+                self._reply(404, "Not found")
+
+        def do_POST(self):
+            self._new_cookie = None
+            session = self._session()
+            length = int(self.headers.get("Content-Length") or 0)
+            form = dict(parse_qsl(self.rfile.read(length).decode("utf-8"), keep_blank_values=True))
+            if self.path != VALIDATE_PATH:
+                self._reply(404, "Not found")
+            elif form.get("_token") != session["token"]:
+                self._reply(403, "CSRF token validation failed")
+            elif stub.authenticate(form):
+                session["user"] = form["username"]
+                self._reply(302, location=DASHBOARD_PATH)
+            else:
+                session["error"] = True
+                self._reply(302, location=LOGIN_PATH)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m utils.login_stub", description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8801, help="Local port (0 picks a free one)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Milliseconds added to every response")
+    args = parser.parse_args(argv)
+    stub = LoginStubServer(args.port, args.latency / 1000)
+    print(f"🧪 Login stub at {stub.start()} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Shared by the parallel runner's workers so their lines carry the same run id
+RUN_ID_ENV = "PERF_RUN_ID"
+
+# Buffered observers for entries that getEntriesByType() does not return
+# (long tasks, largest contentful paint). Installed once per document; with
+# `buffered: true` they also receive the entries recorded before installation.
+_OBSERVERS_JS = """
+function observe() {
+    if (window.__secucumberPerf) {
+        return window.__secucumberPerf;
+    }
+    const perf = window.__secucumberPerf = {longTasks: [], lcp: null, navigating: false};
+    const supported = (window.PerformanceObserver && PerformanceObserver.supportedEntryTypes) || [];
+    if (supported.includes('longtask')) {
+        new PerformanceObserver(list => {
+            for (const entry of list.getEntries()) {
+                perf.longTasks.push([entry.startTime, entry.duration]);
+            }
+        }).observe({type: 'longtask', buffered: true});
+    }
+    if (supported.includes('largest-contentful-paint')) {
+        new PerformanceObserver(list => {
+            const entries = list.getEntries();
+            perf.lcp = entries[entries.length - 1].startTime;
+        }).observe({type: 'largest-contentful-paint', buffered: true});
+    }
+    return perf;
+}
+"""
+
+# Before an action: remember the document and flag it when it starts unloading.
+# Returns [timeOrigin, now]; METRICS_JS takes it as its first argument.
+ARM_JS = _OBSERVERS_JS + """
+const perf = observe();
+perf.navigating = false;
+window.addEventListener('beforeunload', () => { perf.navigating = true; }, {once: true});
+return [performance.timeOrigin, performance.now()];
+"""
+
+# Async. arguments[0]: ARM_JS result or null (page just loaded), arguments[1]:
+# ms to wait for a click to start navigating, arguments[2]: ms to wait for
+# the new document to finish loading. Resources and long tasks are counted
+# from the start of the document, or from arming when the action stayed on it.
+METRICS_JS = _OBSERVERS_JS + """
+const [armed, grace, timeout] = arguments;
+const done = arguments[arguments.length - 1];
+const started = Date.now();
+const perf = observe();
+const sameDocument = () => armed !== null && performance.timeOrigin === armed[0];
+const round = value => (value === null || value === undefined) ? null : Math.round(value * 10) / 10;
+
+function collect(navigated) {
+    const since = navigated ? 0 : armed[1];
+    const navigation = performance.getEntriesByType('navigation')[0];
+    const paint = {};
+    for (const entry of performance.getEntriesByType('paint')) {
+        paint[entry.name] = entry.startTime;
+    }
+    const resources = performance.getEntriesByType('resource').filter(entry => entry.startTime >= since);
+    const byType = {};
+    for (const entry of resources) {
+        byType[entry.initiatorType] = (byType[entry.initiatorType] || 0) + 1;
+    }
+    const longTasks = perf.longTasks.filter(([start]) => start >= since).map(([, duration]) => duration);
+    done({
+        url: location.href,
+        navigated: navigated,
+        navigation: navigation ? {
+            type: navigation.type,
+            ttfb_ms: round(navigation.responseStart),
+            dom_interactive_ms: round(navigation.domInteractive),
+            dom_content_loaded_ms: round(navigation.domContentLoadedEventEnd) || null,
+            load_ms: round(navigation.loadEventEnd) || null,
+            transfer_bytes: navigation.transferSize
+        } : null,
+        paint: {
+            first_paint_ms: round(paint['first-paint']),
+            first_contentful_paint_ms: round(paint['first-contentful-paint']),
+            largest_contentful_paint_ms: round(perf.lcp)
+        },
+        resources: {
+            count: resources.length,
+            transfer_bytes: resources.reduce((total, entry) => total + entry.transferSize, 0),
+            decoded_bytes: resources.reduce((total, entry) => total + entry.decodedBodySize, 0),
+            by_type: byType
+        },
+        long_tasks: {
+            count: longTasks.length,
+            total_ms: round(longTasks.reduce((total, duration) => total + duration, 0)),
+            longest_ms: round(longTasks.length ? Math.max(...longTasks) : 0)
+        }
+    });
+}
+
+(function poll() {
+    const elapsed = Date.now() - started;
+    if (sameDocument()) {
+        // An unload ends this script; the caller runs it again in the new document
+        if (!perf.navigating && elapsed >= grace) {
+            return setTimeout(() => collect(false), 0);
+        }
+    } else if (document.readyState === 'complete' || elapsed >= timeout) {
+        // One more task so buffered observer entries are delivered first
+        return setTimeout(() => collect(true), 0);
+    }
+    if (elapsed >= timeout) {
+        return setTimeout(() => collect(false), 0);
+    }
+    setTimeout(poll, 50);
+})();
+"""
+
+
+def load_seconds(metrics):
+    """Load time of the measured document in seconds (load event, else DOMContentLoaded), or None."""
+    navigation = (metrics or {}).get("navigation") or {}
+    loaded = navigation.get("load_ms") or navigation.get("dom_content_loaded_ms")
+    return None if loaded is None else loaded / 1000
+
+
+class PageMetricsLog:
+    """Run-wide JSON Lines file of client-side page metrics (Config.PERF_METRICS_FILE).
+
+    One line per measurement, appended as it is taken, so files from many
+    runs (and from parallel workers writing at the same time) can be
+    concatenated for trend analysis. Lines carry the run id, worker and
+    scenario next to the metrics.
+    """
+
+    def __init__(self, path=Config.PERF_METRICS_FILE):
+        self.path = path
+        self.run_id = os.getenv(RUN_ID_ENV) or time.strftime("%Y%m%dT%H%M%S")
+        self.scenario = None
+        self.written = 0
+        self._lock = threading.Lock()
+
+    def start_scenario(self, name) -> None:
+        self.scenario = name
+
+    def write(self, metrics) -> None:
+        record = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "run": self.run_id,
+                  "worker": os.getenv("BEHAVE_WORKER_ID"), "scenario": self.scenario, **metrics}
+        line = json.dumps(record) + "\n"
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                # One append-mode write per line keeps concurrent workers' lines whole
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(line)
+                self.written += 1
+        except OSError:
+            logger.warning("Could not write page metrics to %s", self.path, exc_info=True)
+
+    def summary(self) -> str:
+        return f"Page metrics: {self.written} measurement(s) appended to {self.path}"
+
+
+page_metrics_log = PageMetricsLog()
@@ -0,0 +1,309 @@
+"""Run behave scenarios in parallel across several worker processes.
+
+Usage:
+    python -m utils.parallel_runner -j 4
+    python -m utils.parallel_runner -j 4 --tags=@smoke features/Login.feature
+
+Each worker is a separate `python -m behave` process that receives its own
+slice of scenarios (as FILE:LINE locations), so every worker keeps exactly one
+warm driver from the DriverPool. With BROWSER_CONTEXTS=true the workers share
+one browser instead, each driver in its own browser context. Worker Allure results are merged into a single
+results directory and the worker summaries into one exit code.
+"""
+import argparse
+import configparser
+import json
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from behave.configuration import read_configuration
+from behave.model import ScenarioOutline
+from behave.parser import parse_file
+from behave.tag_expression import make_tag_expression
+
+from utils.config import Config
+from utils.driver_factory import DriverFactory
+from utils.page_metrics import RUN_ID_ENV, page_metrics_log
+from utils.profiler import merge_reports, worker_report_path
+from utils.scenario_history import ScenarioHistory, longest_processing_time
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ALLURE_FORMATTER = "allure_behave.formatter:AllureFormatter"
+BEHAVE_INI = PROJECT_ROOT / "behave.ini"
+# Set by run_worker on the command line (behave appends them to the ini's)
+WORKER_OPTIONS = ("format", "outfiles", "paths")
+
+
+def default_tags():
+    """behave.ini's default_tags: what a plain `behave` selects when no --tags are given."""
+    if not BEHAVE_INI.is_file():
+        return []
+    return read_configuration(str(BEHAVE_INI)).get("default_tags") or []
+
+
+def collect_scenarios(paths, tags=None):
+    """Return the FILE:LINE location of every scenario (outline rows expanded).
+
+    paths: feature directories, feature files or FILE:LINE locations.
+    tags: tag expressions; behave.ini's default_tags when none are given.
+    """
+    tag_expression = make_tag_expression(tags or default_tags())
+    feature_files = []
+    for path in paths:
+        filename, _, line = str(path).rpartition(":")
+        if line.isdigit():
+            feature_files.append((Path(filename), int(line)))
+        elif Path(path).is_dir():
+            feature_files.extend((item, None) for item in sorted(Path(path).rglob("*.feature")))
+        else:
+            feature_files.append((Path(path), None))
+
+    locations = []
+    for feature_file, line in feature_files:
+        feature = parse_file(str(feature_file))
+        if feature is None:
+            continue
+        for scenario in feature.walk_scenarios():
+            if line is not None and scenario.line != line:
+                continue
+            if tag_expression.check(scenario.effective_tags):
+                location = f"{feature_file.resolve()}:{scenario.line}"
+                if location not in locations:
+                    locations.append(location)
+    return locations
+
+
+def _line(location) -> int:
+    return int(location.rpartition(":")[2])
+
+
+def outline_groups(locations):
+    """Group locations so that the rows of one Scenario Outline stay together.
+
+    Returns lists of locations in input order (rows by line); any other
+    scenario is a group of its own. Rows on one worker run back to back, so
+    they can share the browser and reset the page in place (OUTLINE_RESET).
+    """
+    outline_of = {}
+    for filename in dict.fromkeys(location.rpartition(":")[0] for location in locations):
+        feature = parse_file(filename)
+        if feature is None:
+            continue
+        for item in feature.walk_scenarios(with_outlines=True):
+            if isinstance(item, ScenarioOutline):
+                for row in item.scenarios:
+                    outline_of[f"{filename}:{row.line}"] = (filename, item.line)
+    groups = {}
+    for location in locations:
+        groups.setdefault(outline_of.get(location, location), []).append(location)
+    return [sorted(group, key=_line) for group in groups.values()]
+
+
+def partition(locations, workers, durations=None):
+    """Split locations into `workers` buckets, empty buckets dropped.
+
+    Buckets are balanced by expected run time ({location: seconds} from the
+    history, longest first; each scenario counts the same without history)
+    and never split the rows of a Scenario Outline.
+    """
+    buckets = longest_processing_time(outline_groups(locations), workers, durations or {})
+    return [bucket for bucket in buckets if bucket]
+
+
+def recorded_durations(locations):
+    """{absolute location: median seconds} from the scenario history (may be empty)."""
+    history = ScenarioHistory()
+    try:
+        durations = history.durations()
+    finally:
+        history.close()
+    by_key = {}
+    for location in locations:
+        filename, _, line = location.rpartition(":")
+        key = f"{Path(os.path.relpath(filename, PROJECT_ROOT)).as_posix()}:{line}"
+        if key in durations:
+            by_key[location] = durations[key]
+    return by_key
+
+
+def write_worker_config(work_dir) -> None:
+    """Copy behave.ini into a worker directory, without the options run_worker sets itself.
+
+    behave only reads the behave.ini of its working directory, and formatters
+    given on the command line are added to the ini's rather than replacing
+    them: run from the project root, every worker would also write its
+    results into the shared allure-results directory.
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(BEHAVE_INI, encoding="utf-8")
+    if parser.has_section("behave"):
+        for option in WORKER_OPTIONS:
+            parser.remove_option("behave", option)
+    with open(Path(work_dir) / "behave.ini", "w", encoding="utf-8") as config:
+        parser.write(config)
+
+
+def run_worker(worker_id, locations, work_dir, extra_env=None, tags=None):
+    """Run one behave process over `locations` and return its exit code.
+
+    The worker runs inside its own directory, with the project's behave.ini
+    settings (default_tags included) but its own output files. `tags` are
+    the expressions the locations were selected with; they replace
+    default_tags, as on the command line.
+    """
+    work_dir = Path(work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    write_worker_config(work_dir)
+    command = [
+        sys.executable, "-m", "behave",
+        "--no-capture",
+        "-f", ALLURE_FORMATTER, "-o", str(work_dir / "allure-results"),
+        "-f", "json", "-o", str(work_dir / "behave.json"),
+        *(f"--tags={tag}" for tag in tags or []),
+        *locations,
+    ]
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    env["BEHAVE_WORKER_ID"] = str(worker_id)
+    env.update(extra_env or {})
+
+    with open(work_dir / "behave.log", "w", encoding="utf-8") as log:
+        process = subprocess.run(command, cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return process.returncode
+
+
+def merge_allure_results(worker_dirs, results_dir):
+    """Copy every worker's Allure files into one results directory.
+
+    Allure file names are UUID based, so a plain copy never collides.
+    """
+    results_dir = Path(results_dir)
+    results_dir.mkdir(parents=True, exist_ok=True)
+    copied = 0
+    for worker_dir in worker_dirs:
+        source = Path(worker_dir) / "allure-results"
+        if not source.is_dir():
+            continue
+        for item in source.iterdir():
+            shutil.copy2(item, results_dir / item.name)
+            copied += 1
+    return copied
+
+
+def _resolve_location(location, base_dir):
+    filename, _, line = location.rpartition(":")
+    return f"{(Path(base_dir) / filename).resolve()}:{line}"
+
+
+def merge_summaries(worker_dirs, buckets):
+    """Aggregate scenario statuses from every worker's behave JSON report.
+
+    Only the locations dispatched to a worker are counted: behave also reports
+    the de-selected scenarios of a feature file as skipped.
+    """
+    summary = {"passed": 0, "failed": 0, "skipped": 0, "untested": 0}
+    failed_locations = []
+    for worker_dir, bucket in zip(worker_dirs, buckets):
+        selected = set(bucket)
+        report = Path(worker_dir) / "behave.json"
+        if not report.is_file():
+            continue
+        try:
+            features = json.loads(report.read_text(encoding="utf-8") or "[]")
+        except ValueError:
+            continue
+        for feature in features:
+            for element in feature.get("elements", []):
+                if element.get("type") == "background" or "location" not in element:
+                    continue
+                location = _resolve_location(element["location"], worker_dir)
+                if location not in selected:
+                    continue
+                status = element.get("status", "untested")
+                summary[status] = summary.get(status, 0) + 1
+                if status in ("failed", "error"):
+                    failed_locations.append(location)
+    return summary, failed_locations
+
+
+def run_parallel(locations, jobs, results_dir, work_root, tags=None):
+    """Run locations across `jobs` workers, merge results, return the exit code.
+
+    tags: the expressions `locations` were selected with (None: default_tags).
+    """
+    durations = recorded_durations(locations)
+    buckets = partition(locations, jobs, durations)
+    work_root = Path(work_root)
+    if work_root.exists():
+        shutil.rmtree(work_root)
+    worker_dirs = [work_root / f"worker-{index}" for index in range(len(buckets))]
+
+    print(f"🚀 Running {len(locations)} scenario(s) on {len(buckets)} worker(s)"
+          + (f", balanced by {len(durations)} recorded duration(s)" if durations else ""))
+    # Page metrics lines of every worker belong to the same run
+    extra_env = {RUN_ID_ENV: page_metrics_log.run_id}
+    if Config.BROWSER_CONTEXTS and len(buckets) > 1:
+        # One browser for all workers, each scenario in its own browser context
+        host = DriverFactory.start_browser_host(Config.BROWSER.lower())
+        extra_env.update(host.environment())
+        print(f"🌐 Workers share one browser at {host.debugger_address}")
+    try:
+        with ThreadPoolExecutor(max_workers=len(buckets) or 1) as executor:
+            futures = [executor.submit(run_worker, index, bucket, worker_dirs[index], extra_env, tags)
+                       for index, bucket in enumerate(buckets)]
+            return_codes = [future.result() for future in futures]
+    finally:
+        DriverFactory.browser_host.shutdown()
+
+    copied = merge_allure_results(worker_dirs, results_dir)
+    summary, failed_locations = merge_summaries(worker_dirs, buckets)
+    profiled = 0
+    if Config.PROFILE_COMMANDS:
+        profiled = merge_reports([worker_report_path(worker_id=index) for index in range(len(buckets))])
+
+    print("\n" + "="*50)
+    print(", ".join(f"{count} {status}" for status, count in summary.items()))
+    for location in failed_locations:
+        print(f"❌ {os.path.relpath(location, PROJECT_ROOT)}")
+    for index, code in enumerate(return_codes):
+        if code != 0:
+            print(f"Worker {index} exited with {code}, see {worker_dirs[index] / 'behave.log'}")
+    print(f"📁 {copied} Allure file(s) merged into {results_dir}")
+    if profiled:
+        print(f"⏱️  {profiled} worker profile(s) merged into {Config.PROFILE_REPORT}")
+    print("="*50)
+
+    return 0 if all(code == 0 for code in return_codes) else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m utils.parallel_runner",
+                                     description="Run behave scenarios across a pool of worker processes.")
+    parser.add_argument("paths", nargs="*", default=[str(PROJECT_ROOT / "features")],
+                        help="Feature files or directories (default: features/)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("-t", "--tags", action="append", default=[],
+                        help="Tag expression, same syntax as behave --tags (default: behave.ini default_tags)")
+    parser.add_argument("--results", default=str(PROJECT_ROOT / "allure-results"),
+                        help="Merged Allure results directory")
+    parser.add_argument("--work-dir", default=str(PROJECT_ROOT / ".parallel"),
+                        help="Scratch directory for per-worker output")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    locations = collect_scenarios(args.paths, args.tags)
+    if not locations:
+        print("No scenarios matched.")
+        return 0
+    return run_parallel(locations, max(1, args.jobs), args.results, args.work_dir, args.tags)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
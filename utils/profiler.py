@@ -0,0 +1,241 @@
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+from utils.config import Config
+
+
+def worker_report_path(path=Config.PROFILE_REPORT, worker_id=None) -> str:
+    """Report path of one parallel-runner worker (BEHAVE_WORKER_ID), or `path` outside workers."""
+    worker_id = os.getenv("BEHAVE_WORKER_ID") if worker_id is None else worker_id
+    if worker_id is None:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.worker-{worker_id}{extension}"
+
+
+def merge_reports(paths, path=Config.PROFILE_REPORT) -> int:
+    """Merge worker reports into one at `path`, sum the totals and delete the parts; returns the count."""
+    merged = {"commands": {}, "page_methods": {}, "steps": []}
+    found = 0
+    for part in paths:
+        try:
+            with open(part, encoding="utf-8") as file:
+                report = json.load(file)
+        except (OSError, ValueError):
+            continue
+        found += 1
+        for section in ("commands", "page_methods"):
+            for name, stats in report.get(section, {}).items():
+                total = merged[section].setdefault(name, dict.fromkeys(stats, 0))
+                for key, value in stats.items():
+                    total[key] = round(total.get(key, 0) + value, 2)
+        merged["steps"].extend(report.get("steps", []))
+        os.remove(part)
+    if found:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(merged, file, indent=2)
+    return found
+
+
+def _payload_size(value) -> int:
+    """Approximate bytes on the wire: size of the JSON payload."""
+    if value is None:
+        return 0
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _Stats:
+    __slots__ = ("count", "seconds", "bytes_sent", "bytes_received")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def add(self, seconds, sent=0, received=0):
+        self.count += 1
+        self.seconds += seconds
+        self.bytes_sent += sent
+        self.bytes_received += received
+
+    def merge(self, other):
+        self.count += other.count
+        self.seconds += other.seconds
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+
+    def to_dict(self):
+        return {"count": self.count, "ms": round(self.seconds * 1000, 2),
+                "bytes_sent": self.bytes_sent, "bytes_received": self.bytes_received}
+
+
+class _StepRecord:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.commands = defaultdict(_Stats)
+        self.page_methods = defaultdict(_Stats)
+        self.wait_seconds = 0.0
+        self.wait_sleep_seconds = 0.0
+
+    @property
+    def command_seconds(self):
+        return sum(stats.seconds for stats in self.commands.values())
+
+    def to_dict(self):
+        return {
+            "step": self.name,
+            "ms": round(self.duration * 1000, 2),
+            "command_ms": round(self.command_seconds * 1000, 2),
+            "wait_ms": round(self.wait_seconds * 1000, 2),
+            "wait_sleep_ms": round(self.wait_sleep_seconds * 1000, 2),
+            "commands": {name: stats.to_dict() for name, stats in self.commands.items()},
+            "page_methods": {name: stats.to_dict() for name, stats in self.page_methods.items()},
+        }
+
+
+class CommandProfiler:
+    """Opt-in WebDriver command instrumentation (Config.PROFILE_COMMANDS).
+
+    `instrument(driver)` wraps driver.execute, the single funnel every
+    WebDriver command goes through, and records name, latency and payload
+    size per behave step and per page-object method. WaitHelper reports its
+    waits through `wait_span()`, so time spent sleeping between polls can be
+    told apart from time spent in commands. When disabled nothing is wrapped
+    and `wait_span()` returns a shared no-op context.
+    """
+
+    def __init__(self, enabled=Config.PROFILE_COMMANDS):
+        self.enabled = enabled
+        self.steps = []
+        self._current = None
+        self._wait_command_seconds = None
+
+    #----------------------------------- Hooks -----------------------------------#
+
+    def instrument(self, driver):
+        if not self.enabled:
+            return driver
+        execute = driver.execute
+
+        def profiled_execute(driver_command, params=None):
+            started = time.perf_counter()
+            response = None
+            try:
+                response = execute(driver_command, params)
+                return response
+            finally:
+                self._record_command(driver_command, time.perf_counter() - started, params, response)
+
+        driver.execute = profiled_execute
+        return driver
+
+    def start_step(self, name) -> None:
+        if self.enabled:
+            self._current = _StepRecord(name)
+
+    def end_step(self) -> None:
+        if self.enabled and self._current is not None:
+            self._current.duration = time.perf_counter() - self._current.started
+            self.steps.append(self._current)
+            self._current = None
+
+    def wait_span(self):
+        """Context manager wrapped around every WaitHelper wait."""
+        if not self.enabled or self._current is None:
+            return nullcontext()
+        return self._wait_span()
+
+    @contextmanager
+    def _wait_span(self):
+        if self._wait_command_seconds is not None:
+            # Nested wait: the outer span already accounts for it
+            yield
+            return
+        self._wait_command_seconds = 0.0
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if self._current is not None:
+                self._current.wait_seconds += elapsed
+                self._current.wait_sleep_seconds += max(0.0, elapsed - self._wait_command_seconds)
+            self._wait_command_seconds = None
+
+    #----------------------------------- Recording -----------------------------------#
+
+    def _record_command(self, command, seconds, params, response):
+        record = self._current
+        if record is None:
+            return
+        sent = _payload_size(params)
+        received = _payload_size(response.get("value") if isinstance(response, dict) else response)
+        record.commands[command].add(seconds, sent, received)
+        record.page_methods[self._page_method()].add(seconds, sent, received)
+        if self._wait_command_seconds is not None:
+            self._wait_command_seconds += seconds
+
+    @staticmethod
+    def _page_method() -> str:
+        """Name of the outermost page-object method on the call stack."""
+        found = "<step>"
+        frame = sys._getframe(2)
+        while frame is not None:
+            owner = frame.f_locals.get("self")
+            if owner is not None and type(owner).__module__.startswith("pages."):
+                found = f"{type(owner).__name__}.{frame.f_code.co_name}"
+            frame = frame.f_back
+        return found
+
+    #----------------------------------- Reporting -----------------------------------#
+
+    def write_report(self, path=None, top_n=Config.PROFILE_TOP_N) -> None:
+        """Write the JSON report and print the slowest steps.
+
+        Parallel-runner workers write worker_report_path(); the runner merges them.
+        """
+        if not self.enabled:
+            return
+        path = path or worker_report_path()
+        totals = defaultdict(_Stats)
+        page_methods = defaultdict(_Stats)
+        for step in self.steps:
+            for name, stats in step.commands.items():
+                totals[name].merge(stats)
+            for name, stats in step.page_methods.items():
+                page_methods[name].merge(stats)
+
+        report = {
+            "commands": {name: stats.to_dict() for name, stats in totals.items()},
+            "page_methods": {name: stats.to_dict() for name, stats in page_methods.items()},
+            "steps": [step.to_dict() for step in self.steps],
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+        print(f"\n⏱️  Slowest steps (full report: {path})")
+        for step in sorted(self.steps, key=lambda item: item.duration, reverse=True)[:top_n]:
+            command_count = sum(stats.count for stats in step.commands.values())
+            other = step.duration - step.command_seconds - step.wait_sleep_seconds
+            print(f"  {step.duration * 1000:8.0f} ms  {step.name}\n"
+                  f"              {command_count} command(s) {step.command_seconds * 1000:.0f} ms, "
+                  f"wait sleep {step.wait_sleep_seconds * 1000:.0f} ms, other {max(0.0, other) * 1000:.0f} ms")
+        print("  Busiest commands:")
+        for name, stats in sorted(totals.items(), key=lambda item: item[1].seconds, reverse=True)[:top_n]:
+            print(f"  {stats.seconds * 1000:8.0f} ms  {name} x{stats.count}")
+
+
+# Shared by DriverFactory, WaitHelper and features/environment.py
+profiler = CommandProfiler()
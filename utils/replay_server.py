@@ -0,0 +1,322 @@
+"""Local record/replay stand-in for the application under test.
+
+Usage:
+    python -m utils.replay_server record [--archive .replay/orangehrm.json.gz] [--upstream URL] [--port 8800]
+    python -m utils.replay_server replay [--archive .replay/orangehrm.json.gz] [--port 8800]
+
+With REPLAY_MODE=record|replay, features/environment.py starts the server
+in before_all and points Config.BASE_URL at it, so no test code changes.
+
+record: a reverse proxy in front of Config.BASE_URL. Every exchange (request
+    method, path, referer and form fields; response status, headers and body)
+    is stored in a gzipped JSON archive when the run ends. Identical bodies
+    are stored once.
+replay: serves the archive without touching the network. A request matches
+    the recorded exchange with the same method, path, referer path and form
+    fields (the volatile CSRF `_token` excluded), falling back to method,
+    path and form. Only GET and HEAD requests fall back further, to method
+    and path: an unrecorded form submission is a 404 rather than the
+    response to another one. The referer tells apart
+    pages fetched at the same path in different states, such as the login
+    page before and after a failed login.
+
+The server listens on Config.REPLAY_PORT (plus the worker number under the
+parallel runner), so the recorded and replayed origins stay the same from
+run to run.
+
+Responses are rewritten for the local origin at serve time: upstream URLs in
+Location headers and text bodies, and the Secure/Domain cookie attributes
+that would make the browser drop cookies on http://localhost. Record with a
+single behave process; parallel workers would overwrite each other's
+exchanges.
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import http.client
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Modes understood by ReplayServer (Config.REPLAY_MODE)
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+REPLAY_MODES = (MODE_OFF, MODE_RECORD, MODE_REPLAY)
+
+# Form fields that change on every request and must not take part in matching
+VOLATILE_FIELDS = {"_token"}
+
+# Requests without side effects: may fall back to an exchange recorded with another form
+SAFE_METHODS = {"GET", "HEAD"}
+
+# Not forwarded in either direction; lengths and encodings are recomputed locally
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade", "te",
+                      "trailer", "content-length", "content-encoding", "host", "accept-encoding"}
+# Dropped from responses: they pin the upstream origin or HTTPS
+ORIGIN_BOUND_HEADERS = {"strict-transport-security", "content-security-policy", "alt-svc", "report-to", "nel"}
+TEXT_TYPES = ("text/", "javascript", "json", "xml", "svg")
+
+
+def default_port() -> int:
+    """Config.REPLAY_PORT, offset by the parallel runner's worker number (one server per worker)."""
+    return Config.REPLAY_PORT + int(os.getenv("BEHAVE_WORKER_ID") or 0)
+
+
+def _form_key(headers, body) -> str:
+    """Request body as a matching key: sorted form fields without volatile ones, else a hash."""
+    if not body:
+        return ""
+    if "application/x-www-form-urlencoded" in headers.get("Content-Type", ""):
+        fields = [(name, value) for name, value in parse_qsl(body.decode("utf-8", "replace"), keep_blank_values=True)
+                  if name not in VOLATILE_FIELDS]
+        return urlencode(sorted(fields))
+    try:
+        document = json.loads(body)
+    except ValueError:
+        return hashlib.sha1(body).hexdigest()
+    if isinstance(document, dict):
+        document = {name: value for name, value in document.items() if name not in VOLATILE_FIELDS}
+    return json.dumps(document, sort_keys=True)
+
+
+class Archive:
+    """Recorded exchanges, keyed by (method, path, referer path, form key)."""
+
+    def __init__(self, origin=""):
+        self.origin = origin
+        self.exchanges = {}
+
+    def add(self, key, status, headers, body) -> None:
+        self.exchanges[key] = {"status": status, "headers": headers, "body": body}
+
+    def find(self, key):
+        """The exchange recorded for `key`, else for its method, path and form (GET/HEAD: method and path)."""
+        exchange = self.exchanges.get(key)
+        if exchange is None:
+            method, path, _, form = key
+            partials = [(method, path, form), (method, path)] if method in SAFE_METHODS else [(method, path, form)]
+            # Latest recorded wins: dicts keep insertion order
+            for partial in partials:
+                for candidate, recorded in reversed(self.exchanges.items()):
+                    if (candidate[0], candidate[1], candidate[3])[:len(partial)] == partial:
+                        return recorded
+        return exchange
+
+    def save(self, path) -> None:
+        """Merge into the archive at `path` (same origin only) and write it atomically."""
+        path = Path(path)
+        merged = Archive.load(path) if path.is_file() else Archive(self.origin)
+        if merged.origin != self.origin:
+            merged = Archive(self.origin)
+        merged.exchanges.update(self.exchanges)
+
+        bodies = {}
+        exchanges = []
+        for (method, request_path, referer, form), exchange in merged.exchanges.items():
+            digest = hashlib.sha1(exchange["body"]).hexdigest()
+            bodies[digest] = base64.b64encode(exchange["body"]).decode("ascii")
+            exchanges.append({"method": method, "path": request_path, "referer": referer, "form": form,
+                              "status": exchange["status"], "headers": exchange["headers"], "body": digest})
+        document = {"version": 1, "origin": self.origin, "bodies": bodies, "exchanges": exchanges}
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle, staging = tempfile.mkstemp(prefix=f".{path.name}-", dir=path.parent)
+        with os.fdopen(handle, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as output:
+            output.write(json.dumps(document).encode("utf-8"))
+        os.replace(staging, path)
+
+    @staticmethod
+    def load(path) -> "Archive":
+        with gzip.open(path, "rb") as source:
+            document = json.loads(source.read())
+        archive = Archive(document["origin"])
+        bodies = document["bodies"]
+        for item in document["exchanges"]:
+            key = (item["method"], item["path"], item["referer"], item["form"])
+            archive.add(key, item["status"], [tuple(header) for header in item["headers"]],
+                        base64.b64decode(bodies[item["body"]]))
+        return archive
+
+
+class ReplayServer:
+    """Records or replays the application on http://localhost:<port> (Config.REPLAY_MODE).
+
+    `start()` returns the local base URL to use instead of the upstream one.
+    `stop()` shuts the server down and, when recording, writes the archive.
+    """
+
+    def __init__(self, mode=Config.REPLAY_MODE, archive=Config.REPLAY_ARCHIVE, upstream=Config.BASE_URL, port=None):
+        if mode not in (MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Unsupported replay mode: {mode}")
+        self.mode = mode
+        self.archive_path = archive
+        self.upstream = upstream.rstrip("/")
+        self.port = default_port() if port is None else port
+        self.served = 0
+        self.unmatched = 0
+        self.url = None
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+        if mode == MODE_REPLAY:
+            if not Path(archive).is_file():
+                raise FileNotFoundError(f"No replay archive at {archive}; run once with REPLAY_MODE=record")
+            self.archive = Archive.load(archive)
+            self.upstream = self.archive.origin
+        else:
+            self.archive = Archive(self.upstream)
+
+    def start(self) -> str:
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), _handler_for(self))
+        self._server.daemon_threads = True
+        # "localhost" rather than 127.0.0.1: browsers treat it as a secure context
+        self.url = f"http://localhost:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        logger.info("Replay server (%s) for %s at %s", self.mode, self.upstream, self.url)
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        if self.mode == MODE_RECORD and self.archive.exchanges:
+            self.archive.save(self.archive_path)
+
+    def summary(self) -> str:
+        if self.mode == MODE_RECORD:
+            return f"Replay archive: {len(self.archive.exchanges)} exchange(s) recorded to {self.archive_path}"
+        return f"Replay server: {self.served} response(s) served, {self.unmatched} request(s) not in the archive"
+
+    #----------------------------------- Exchanges -----------------------------------#
+
+    def handle(self, method, path, headers, body):
+        """Return (status, headers, body) for one request, already rewritten for the local origin."""
+        referer = urlsplit(headers.get("Referer", "")).path
+        key = (method, path, referer, _form_key(headers, body))
+        if self.mode == MODE_RECORD:
+            status, response_headers, response_body = self._forward(method, path, headers, body)
+            with self._lock:
+                self.archive.add(key, status, response_headers, response_body)
+        else:
+            exchange = self.archive.find(key)
+            with self._lock:
+                if exchange is None:
+                    self.unmatched += 1
+                else:
+                    self.served += 1
+            if exchange is None:
+                logger.warning("Not in the replay archive: %s %s", method, path)
+                return 404, [("Content-Type", "text/plain")], b"Not in the replay archive"
+            status, response_headers, response_body = exchange["status"], exchange["headers"], exchange["body"]
+        return self._localize(status, response_headers, response_body)
+
+    def _forward(self, method, path, headers, body):
+        target = urlsplit(self.upstream)
+        connection_class = http.client.HTTPSConnection if target.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(target.netloc, timeout=Config.PAGE_LOAD_TIMEOUT)
+        forwarded = {name: value.replace(self.url, self.upstream) for name, value in headers.items()
+                     if name.lower() not in HOP_BY_HOP_HEADERS}
+        # Plain bodies can be rewritten and archived as they are
+        forwarded["Accept-Encoding"] = "identity"
+        try:
+            connection.request(method, path, body=body or None, headers=forwarded)
+            response = connection.getresponse()
+            return response.status, [(name, value) for name, value in response.getheaders()
+                                     if name.lower() not in HOP_BY_HOP_HEADERS], response.read()
+        finally:
+            connection.close()
+
+    def _localize(self, status, headers, body):
+        upstream_host = urlsplit(self.upstream).netloc
+        localized = []
+        text = False
+        for name, value in headers:
+            lower = name.lower()
+            if lower in HOP_BY_HOP_HEADERS or lower in ORIGIN_BOUND_HEADERS:
+                continue
+            if lower == "location":
+                value = value.replace(self.upstream, self.url)
+            elif lower == "set-cookie":
+                value = re.sub(r";\s*(Secure|Domain=[^;]*)", "", value, flags=re.IGNORECASE)
+                value = re.sub(r"SameSite=None", "SameSite=Lax", value, flags=re.IGNORECASE)
+            elif lower == "content-type":
+                text = any(marker in value for marker in TEXT_TYPES)
+            localized.append((name, value))
+        if text:
+            body = body.replace(self.upstream.encode(), self.url.encode())
+            body = body.replace(f"//{upstream_host}".encode(), f"//{urlsplit(self.url).netloc}".encode())
+        return status, localized, body
+
+
+def _handler_for(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _serve(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            try:
+                status, headers, response_body = server.handle(self.command, self.path, self.headers, body)
+            except OSError as error:
+                logger.warning("Upstream request failed: %s %s: %s", self.command, self.path, error)
+                status, headers, response_body = 502, [("Content-Type", "text/plain")], str(error).encode()
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(response_body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(response_body)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _serve
+
+        def log_message(self, format, *args):
+            logger.debug("replay %s", format % args)
+
+    return Handler
+
+
+#----------------------------------- CLI -----------------------------------#
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m utils.replay_server",
+                                     description="Record the application under test, or serve a recording.")
+    parser.add_argument("mode", choices=(MODE_RECORD, MODE_REPLAY))
+    parser.add_argument("--archive", default=Config.REPLAY_ARCHIVE, help="Archive file (.json.gz)")
+    parser.add_argument("--upstream", default=Config.BASE_URL, help="Application to record (record mode)")
+    parser.add_argument("--port", type=int, default=Config.REPLAY_PORT, help="Local port (0 picks a free one)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    server = ReplayServer(args.mode, args.archive, args.upstream, args.port)
+    print(f"🎞️  {args.mode.capitalize()}ing {server.upstream} at {server.start()} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(server.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import logging
+import os
+import sqlite3
+import statistics
+import time
+from dataclasses import dataclass
+
+from behave.model import ScenarioOutline
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Execution orders understood by ScenarioHistory.reorder()
+ORDER_FILE = "file"
+ORDER_FAILED_FIRST = "failed-first"
+ORDER_LONGEST_FIRST = "longest-first"
+SCENARIO_ORDERS = (ORDER_FILE, ORDER_FAILED_FIRST, ORDER_LONGEST_FIRST)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenario_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    location TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scenario_runs_location ON scenario_runs (location, id);
+"""
+
+
+@dataclass(frozen=True)
+class ScenarioStats:
+    """Summary of the most recent runs of one scenario."""
+    duration: float
+    failures: int
+    last_status: str
+
+    @property
+    def last_failed(self) -> bool:
+        return self.last_status in ("failed", "error")
+
+
+def scenario_location(scenario) -> str:
+    """Stable key: FILE:LINE relative to the project root, whatever the working directory."""
+    path = os.path.relpath(os.path.abspath(scenario.filename), Config.PROJECT_ROOT)
+    return f"{path.replace(os.sep, '/')}:{scenario.line}"
+
+
+class ScenarioHistory:
+    """Per-scenario durations and outcomes in a local SQLite file.
+
+    `record()` is called from after_scenario; parallel workers share the same
+    file, so writes use SQLite's own locking. `stats()` summarizes the last
+    `runs` results of each scenario and `reorder()` uses it to change the
+    order behave runs features and scenarios in. Any database problem is
+    logged and treated as "no history", which keeps the file order.
+    """
+
+    def __init__(self, db_path=Config.SCENARIO_HISTORY_DB, runs=Config.SCENARIO_HISTORY_RUNS):
+        self.db_path = db_path
+        self.runs = runs
+        self._connection = None
+
+    #----------------------------------- Storage -----------------------------------#
+
+    def _connect(self):
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(self.db_path, timeout=30)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def record(self, location, status, duration) -> None:
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT INTO scenario_runs (location, status, duration, finished_at) VALUES (?, ?, ?, ?)",
+                    (location, status, duration, time.time()))
+        except sqlite3.Error:
+            logger.warning("Could not record the result of %s", location, exc_info=True)
+
+    def stats(self) -> dict:
+        """{location: ScenarioStats} over the last `runs` results of each scenario."""
+        if self._connection is None and not os.path.exists(self.db_path):
+            return {}
+        try:
+            rows = self._connect().execute(
+                "SELECT location, status, duration FROM scenario_runs ORDER BY id DESC").fetchall()
+        except sqlite3.Error:
+            logger.warning("Scenario history unavailable, keeping the file order", exc_info=True)
+            return {}
+
+        recent = {}
+        for location, status, duration in rows:
+            runs = recent.setdefault(location, [])
+            if len(runs) < self.runs:
+                runs.append((status, duration))
+        return {location: ScenarioStats(duration=statistics.median(duration for _, duration in runs),
+                                        failures=sum(status in ("failed", "error") for status, _ in runs),
+                                        last_status=runs[0][0])
+                for location, runs in recent.items()}
+
+    def durations(self) -> dict:
+        """{location: median duration in seconds}."""
+        return {location: stats.duration for location, stats in self.stats().items()}
+
+    def runs_since(self, timestamp) -> list:
+        """[[location, status, duration, finished_at], ...] recorded after `timestamp`."""
+        if self._connection is None and not os.path.exists(self.db_path):
+            return []
+        try:
+            rows = self._connect().execute(
+                "SELECT location, status, duration, finished_at FROM scenario_runs WHERE finished_at >= ? ORDER BY id",
+                (timestamp,)).fetchall()
+        except sqlite3.Error:
+            logger.warning("Scenario history unavailable", exc_info=True)
+            return []
+        return [list(row) for row in rows]
+
+    def import_runs(self, runs) -> None:
+        """Add runs exported by runs_since() on another machine."""
+        try:
+            with self._connect() as connection:
+                connection.executemany(
+                    "INSERT INTO scenario_runs (location, status, duration, finished_at) VALUES (?, ?, ?, ?)",
+                    [tuple(run) for run in runs])
+        except sqlite3.Error:
+            logger.warning("Could not import %d scenario run(s)", len(runs), exc_info=True)
+
+    def prune(self) -> None:
+        """Drop everything but the last `runs` results of each scenario."""
+        try:
+            with self._connect() as connection:
+                connection.execute("""
+                    DELETE FROM scenario_runs WHERE id IN (
+                        SELECT id FROM (
+                            SELECT id, ROW_NUMBER() OVER (PARTITION BY location ORDER BY id DESC) AS position
+                            FROM scenario_runs
+                        ) WHERE position > ?
+                    )""", (self.runs,))
+        except sqlite3.Error:
+            logger.warning("Could not prune the scenario history", exc_info=True)
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    #----------------------------------- Scheduling -----------------------------------#
+
+    def reorder(self, features, order=Config.SCENARIO_ORDER) -> None:
+        """Reorder features, scenarios and outline rows in place before the run.
+
+        failed-first: scenarios that failed last time, then ones that failed
+            recently, then ones without history, then the rest.
+        longest-first: by median duration; scenarios without history count
+            as the average known duration.
+        behave runs a feature as a unit, so features are ranked by their best
+        (failed-first) or total (longest-first) scenario score. Sorting is
+        stable: without history the file order is kept.
+        """
+        if order not in SCENARIO_ORDERS:
+            raise ValueError(f"Unsupported SCENARIO_ORDER: {order}")
+        if order == ORDER_FILE:
+            return
+        stats = self.stats()
+        if not stats:
+            return
+
+        if order == ORDER_FAILED_FIRST:
+            def score(scenario):
+                item = stats.get(scenario_location(scenario))
+                if item is None:
+                    return 2
+                return 0 if item.last_failed else 1 if item.failures else 3
+            combine = min
+        else:
+            average = statistics.mean(item.duration for item in stats.values())
+
+            def score(scenario):
+                item = stats.get(scenario_location(scenario))
+                return -(item.duration if item else average)
+            combine = sum
+
+        def container_score(container):
+            if isinstance(container, ScenarioOutline):
+                return combine(score(row) for row in container.scenarios)
+            if hasattr(container, "run_items"):
+                return combine([container_score(item) for item in container.run_items] or [0])
+            return score(container)
+
+        for feature in features:
+            self._sort_container(feature, container_score, score)
+        features.sort(key=container_score)
+
+    def _sort_container(self, container, container_score, score) -> None:
+        """Sort a feature or rule's run items (and outline rows) in place."""
+        for item in container.run_items:
+            if isinstance(item, ScenarioOutline):
+                item.scenarios.sort(key=score)
+            elif hasattr(item, "run_items"):
+                self._sort_container(item, container_score, score)
+        container.run_items.sort(key=container_score)
+        container.scenarios.sort(key=container_score)
+
+
+def longest_processing_time(groups, workers, durations) -> list:
+    """Split groups of locations into `workers` buckets with similar total duration.
+
+    groups: lists of locations that must run in the same bucket (the rows of
+    one Scenario Outline), weighed by their summed duration. Longest-
+    processing-time-first: each group, longest first, goes to the bucket
+    with the least work so far. Locations without history count as the
+    average known duration (1 s with no history). The result is deterministic
+    for the same input: ties keep the input order and go to the
+    lowest-numbered bucket. Buckets can be empty when there are fewer groups
+    than workers.
+    """
+    default = statistics.mean(durations.values()) if durations else 1.0
+    weights = [sum(durations.get(location, default) for location in group) for group in groups]
+    loads = [0.0] * workers
+    buckets = [[] for _ in range(workers)]
+    for position in sorted(range(len(groups)), key=lambda item: -weights[item]):
+        index = loads.index(min(loads))
+        buckets[index].extend(groups[position])
+        loads[index] += weights[position]
+    return buckets
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from selenium.common.exceptions import WebDriverException
+
+from pages.login_page import LoginPage
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Cookie fields accepted by WebDriver's add_cookie
+COOKIE_FIELDS = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+
+class SessionCache:
+    """Caches authenticated session cookies on disk, one entry per credential set.
+
+    The first scenario that needs a user logs in through the UI and stores the
+    session cookies. Later scenarios (in any worker process) inject the cookies
+    into their driver and land directly on the dashboard. Entries expire after
+    `ttl` seconds and are refreshed automatically when the server rejects them.
+    """
+
+    def __init__(self, cache_dir=Config.SESSION_CACHE_DIR, ttl=Config.SESSION_TTL):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+
+    def login(self, driver, username, password) -> None:
+        """Make `driver` authenticated as `username`, logging in through the UI only if needed."""
+        key = self._key(username, password)
+        if self._restore(driver, key):
+            return
+
+        with self._lock(key):
+            # Another worker may have refreshed the session while we were waiting
+            if self._restore(driver, key, locked=True):
+                return
+            logger.info("Logging in through the UI as %s", username)
+            cookies = self._ui_login(driver, username, password)
+            self._store(key, username, cookies)
+
+    def invalidate(self, username, password) -> None:
+        self._path(self._key(username, password)).unlink(missing_ok=True)
+
+    #----------------------------------- Cookie handling -----------------------------------#
+
+    def _restore(self, driver, key, locked=False) -> bool:
+        """Inject cached cookies and verify the session; drop the entry when expired or stale.
+
+        locked: the caller already holds the lock for `key`.
+        """
+        entry = self._load(key)
+        if entry is None:
+            return False
+        if time.time() - entry.get("created", 0) > self.ttl:
+            self._discard(key, entry, locked)
+            return False
+        cookies = entry.get("cookies")
+        if not cookies:
+            return False
+        try:
+            # Cookies can only be added for the domain currently loaded
+            driver.get(Config.BASE_URL)
+            driver.delete_all_cookies()
+            for cookie in cookies:
+                driver.add_cookie(cookie)
+            if self._is_authenticated(driver):
+                return True
+        except WebDriverException:
+            logger.exception("Failed to restore cached session")
+        logger.info("Cached session is stale, refreshing it")
+        self._discard(key, entry, locked)
+        return False
+
+    @staticmethod
+    def _is_authenticated(driver) -> bool:
+        driver.get(Config.BASE_URL + LoginPage.DASHBOARD_PATH)
+        # An expired session is redirected straight back to the login form
+        if "/auth/login" in driver.current_url:
+            return False
+        return LoginPage(driver).is_login_successful()
+
+    @staticmethod
+    def _ui_login(driver, username, password) -> list:
+        login_page = LoginPage(driver)
+        login_page.open()
+        login_page.login(username, password)
+        if not login_page.is_login_successful():
+            raise AssertionError(f"UI login failed for user '{username}'")
+        return [{field: cookie[field] for field in COOKIE_FIELDS if field in cookie}
+                for cookie in driver.get_cookies()]
+
+    #----------------------------------- Disk storage -----------------------------------#
+
+    def _key(self, username, password) -> str:
+        raw = f"{Config.BASE_URL}|{username}|{password}".encode("utf-8")
+        return hashlib.sha256(raw).hexdigest()[:32]
+
+    def _path(self, key) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load(self, key):
+        """The cached entry for `key` ({created, username, cookies}), or None."""
+        try:
+            return json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _discard(self, key, entry, locked=False) -> None:
+        """Delete the entry read as `entry`, unless another worker has replaced it since."""
+        if not locked:
+            with self._lock(key):
+                self._discard(key, entry, locked=True)
+            return
+        # Under the lock no one is writing; a fresh login's entry is kept
+        if self._load(key) == entry:
+            self._path(key).unlink(missing_ok=True)
+
+    def _store(self, key, username, cookies) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = {"created": time.time(), "username": username, "cookies": cookies}
+        # Write then rename so readers in other workers never see a partial file
+        tmp_path = self._path(key).with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+        os.replace(tmp_path, self._path(key))
+
+    @contextmanager
+    def _lock(self, key, timeout=60):
+        """Cross-process lock so only one worker performs the UI login per user."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        lock_path = self.cache_dir / f"{key}.lock"
+        deadline = time.time() + timeout
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                break
+            except FileExistsError:
+                # A crashed worker can leave its lock behind
+                try:
+                    if time.time() - lock_path.stat().st_mtime > timeout:
+                        lock_path.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.time() > deadline:
+                    raise TimeoutError(f"Timed out waiting for session lock {lock_path}")
+                time.sleep(0.2)
+        try:
+            yield
+        finally:
+            lock_path.unlink(missing_ok=True)
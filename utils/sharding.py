@@ -0,0 +1,157 @@
+"""Split a behave run across several CI machines and merge the results.
+
+Usage:
+    python -m utils.sharding shard --index 0 --total 4 --out shard-0 [-j 2] [-t @regression] [paths]
+    python -m utils.sharding merge --total 4 --results allure-results shard-0 shard-1 shard-2 shard-3
+
+Every machine runs `shard` with the same scenario set and the same recorded
+durations (restore .history/ before running) and gets the same partition, so
+no coordination is needed. Partitions are balanced by the median durations in
+the scenario history; scenarios without history count as the average, and
+with no history at all every scenario counts the same. The rows of a
+Scenario Outline always stay on one shard, so they can share a browser.
+
+A shard directory holds the shard's Allure results, its status and the
+scenario runs it recorded. `merge` combines the Allure results, fails when
+any shard failed or is missing, and imports the recorded runs into the local
+history so the next split is based on them.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from utils.parallel_runner import (PROJECT_ROOT, collect_scenarios, merge_allure_results, outline_groups,
+                                   recorded_durations, run_parallel)
+from utils.scenario_history import ScenarioHistory, longest_processing_time
+
+STATUS_FILE = "status.json"
+RUNS_FILE = "history.json"
+
+
+def _relative(location) -> str:
+    filename, _, line = location.rpartition(":")
+    return f"{Path(os.path.relpath(filename, PROJECT_ROOT)).as_posix()}:{line}"
+
+
+def shard_partition(locations, total, durations=None):
+    """Deterministic split of `locations` into exactly `total` shards (some may be empty).
+
+    Locations are sorted by their project-relative path first, so machines
+    with different checkout directories compute the same split.
+    """
+    ordered = sorted(locations, key=_relative)
+    return longest_processing_time(outline_groups(ordered), total, durations or {})
+
+
+#----------------------------------- shard -----------------------------------#
+
+def run_shard(args) -> int:
+    if not 0 <= args.index < args.total:
+        raise SystemExit(f"--index must be between 0 and {args.total - 1}")
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    started = time.time()
+
+    locations = collect_scenarios(args.paths, args.tags)
+    durations = recorded_durations(locations)
+    shard = shard_partition(locations, args.total, durations)[args.index]
+
+    print(f"🧩 Shard {args.index + 1}/{args.total}: {len(shard)} of {len(locations)} scenario(s)"
+          + (f", expected {sum(durations.get(location, 0) for location in shard):.1f}s" if durations else ""))
+    exit_code = 0
+    if shard:
+        exit_code = run_parallel(shard, max(1, args.jobs), out / "allure-results", out / "work", args.tags)
+
+    history = ScenarioHistory()
+    try:
+        runs = history.runs_since(started)
+    finally:
+        history.close()
+    (out / RUNS_FILE).write_text(json.dumps(runs), encoding="utf-8")
+    status = {"index": args.index, "total": args.total, "exit_code": exit_code,
+              "scenarios": [_relative(location) for location in shard]}
+    (out / STATUS_FILE).write_text(json.dumps(status, indent=2), encoding="utf-8")
+    return exit_code
+
+
+#----------------------------------- merge -----------------------------------#
+
+def merge_shards(args) -> int:
+    shard_dirs = [Path(path) for path in args.shards]
+    statuses = {}
+    for shard_dir in shard_dirs:
+        try:
+            status = json.loads((shard_dir / STATUS_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            print(f"⚠️  {shard_dir}: no readable {STATUS_FILE}")
+            continue
+        statuses[status["index"]] = status
+
+    # The Allure layout of a shard directory is the same as a parallel worker's
+    copied = merge_allure_results(shard_dirs, args.results)
+
+    history = ScenarioHistory()
+    try:
+        for shard_dir in shard_dirs:
+            try:
+                history.import_runs(json.loads((shard_dir / RUNS_FILE).read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        history.prune()
+    finally:
+        history.close()
+
+    total = args.total or max((status["total"] for status in statuses.values()), default=0)
+    missing = [index for index in range(total) if index not in statuses]
+    failed = sorted(index for index, status in statuses.items() if status["exit_code"] != 0)
+
+    print("\n" + "="*50)
+    for index in sorted(statuses):
+        status = statuses[index]
+        print(f"{'❌' if status['exit_code'] else '✅'} Shard {index + 1}/{status['total']}: "
+              f"{len(status['scenarios'])} scenario(s), exit code {status['exit_code']}")
+    for index in missing:
+        print(f"❌ Shard {index + 1}/{total}: no result")
+    print(f"📁 {copied} Allure file(s) merged into {args.results}")
+    print("="*50)
+    return 1 if failed or missing or not statuses else 0
+
+
+#----------------------------------- CLI -----------------------------------#
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m utils.sharding",
+                                     description="Run one duration-balanced shard of the suite, or merge shards.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    shard = commands.add_parser("shard", help="Run this machine's share of the scenarios")
+    shard.add_argument("paths", nargs="*", default=[str(PROJECT_ROOT / "features")],
+                       help="Feature files or directories (default: features/)")
+    shard.add_argument("--index", type=int, required=True, help="Zero-based shard number")
+    shard.add_argument("--total", type=int, required=True, help="Number of shards")
+    shard.add_argument("-j", "--jobs", type=int, default=1, help="Parallel workers inside this shard")
+    shard.add_argument("-t", "--tags", action="append", default=[],
+                       help="Tag expression, same syntax as behave --tags (default: behave.ini default_tags)")
+    shard.add_argument("--out", default=str(PROJECT_ROOT / ".shard"), help="Shard output directory")
+    shard.set_defaults(handler=run_shard)
+
+    merge = commands.add_parser("merge", help="Combine shard directories into one result")
+    merge.add_argument("shards", nargs="+", help="Shard output directories")
+    merge.add_argument("--total", type=int, default=0,
+                       help="Expected number of shards (default: as recorded by the shards)")
+    merge.add_argument("--results", default=str(PROJECT_ROOT / "allure-results"),
+                       help="Merged Allure results directory")
+    merge.set_defaults(handler=merge_shards)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
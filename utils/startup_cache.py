@@ -0,0 +1,143 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.common.selenium_manager import SeleniumManager
+from selenium.webdriver.edge.options import Options as EdgeOptions
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Browser names understood by Selenium Manager
+SELENIUM_MANAGER_NAMES = {"chrome": "chrome", "firefox": "firefox", "edge": "MicrosoftEdge"}
+
+# Skip first-run screens and background component downloads on every launch
+CHROMIUM_STARTUP_ARGS = ["--no-first-run", "--no-default-browser-check", "--disable-component-update"]
+
+FIREFOX_STARTUP_PREFS = {
+    "browser.shell.checkDefaultBrowser": False,
+    "browser.startup.homepage_override.mstone": "ignore",
+    "browser.aboutwelcome.enabled": False,
+    "app.update.auto": False,
+    "app.update.enabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.reportingpolicy.firstRun": False,
+    "extensions.update.enabled": False,
+}
+
+
+class StartupCache:
+    """Speeds up browser cold start (Config.STARTUP_CACHE).
+
+    - Driver and browser binary paths resolved by Selenium Manager are stored
+      in `binaries.json`, so later launches skip the discovery step.
+    - A profile template with first-run work already done is built once per
+      browser and copied into a fresh directory for every new driver.
+
+    Profiles are copied rather than hard-linked: Chromium and Firefox update
+    their SQLite files in place, which would write through to the template.
+    """
+
+    def __init__(self, cache_dir=Config.STARTUP_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+        self._binaries = None
+
+    #----------------------------------- Binary resolution -----------------------------------#
+
+    def binary_paths(self, browser) -> dict:
+        """Return {"driver_path", "browser_path"}, resolving through Selenium Manager only once."""
+        binaries = self._load_binaries()
+        paths = binaries.get(browser)
+        if paths and all(Path(path).is_file() for path in paths.values() if path):
+            return paths
+
+        logger.info("Resolving %s driver with Selenium Manager", browser)
+        output = SeleniumManager().binary_paths(["--browser", SELENIUM_MANAGER_NAMES[browser]])
+        paths = {"driver_path": output.get("driver_path", ""), "browser_path": output.get("browser_path", "")}
+        binaries[browser] = paths
+        self._write_json(self.cache_dir / "binaries.json", binaries)
+        return paths
+
+    def _load_binaries(self) -> dict:
+        if self._binaries is None:
+            try:
+                self._binaries = json.loads((self.cache_dir / "binaries.json").read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._binaries = {}
+        return self._binaries
+
+    #----------------------------------- Profile template -----------------------------------#
+
+    def new_profile(self, browser) -> str:
+        """Copy the browser's profile template into a new temporary directory."""
+        template = self.template_dir(browser)
+        profile = tempfile.mkdtemp(prefix=f"secucumber-{browser}-")
+        shutil.copytree(template, profile, dirs_exist_ok=True, ignore=shutil.ignore_patterns("Singleton*", "lock"))
+        return profile
+
+    def template_dir(self, browser) -> Path:
+        template = self.cache_dir / "profiles" / browser
+        if not template.is_dir():
+            self._build_template(browser, template)
+        return template
+
+    def _build_template(self, browser, template) -> None:
+        """Build the template next to its final location, then rename it into place.
+
+        The rename is atomic, so parallel workers racing to build it are safe.
+        """
+        template.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{browser}-", dir=template.parent))
+        started = time.perf_counter()
+        try:
+            if browser == "firefox":
+                self._write_firefox_prefs(staging)
+            else:
+                self._initialize_chromium_profile(browser, staging)
+            try:
+                os.replace(staging, template)
+            except OSError:
+                # Another worker finished first
+                shutil.rmtree(staging, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        logger.info("Built %s profile template in %.1fs", browser, time.perf_counter() - started)
+
+    def _initialize_chromium_profile(self, browser, profile) -> None:
+        """Launch the browser once on the profile so first-run setup is written to disk."""
+        options = ChromeOptions() if browser == "chrome" else EdgeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument(f"--user-data-dir={profile}")
+        for argument in CHROMIUM_STARTUP_ARGS:
+            options.add_argument(argument)
+        paths = self.binary_paths(browser)
+        if paths.get("browser_path"):
+            options.binary_location = paths["browser_path"]
+        driver_class = webdriver.Chrome if browser == "chrome" else webdriver.Edge
+        service_class = webdriver.ChromeService if browser == "chrome" else webdriver.EdgeService
+        driver = driver_class(options=options, service=service_class(executable_path=paths["driver_path"]))
+        try:
+            driver.get("about:blank")
+        finally:
+            driver.quit()
+
+    @staticmethod
+    def _write_firefox_prefs(profile) -> None:
+        lines = [f"user_pref({json.dumps(name)}, {json.dumps(value)});" for name, value in FIREFOX_STARTUP_PREFS.items()]
+        (profile / "user.js").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    #----------------------------------- Helpers -----------------------------------#
+
+    def _write_json(self, path, data) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
@@ -1,31 +1,184 @@
+import logging
+import time
+from contextlib import contextmanager
+
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
 from utils.config import Config
+from utils.dom_wait import ABSENT, CLICKABLE, HIDDEN, PRESENT, TEXT, VISIBLE, wait_in_page
+from utils.profiler import profiler
+from utils.wait_stats import wait_stats
+
+logger = logging.getLogger(__name__)
+
 
 class WaitHelper:
     """Class for handling timeouts and waits"""
     
+    @staticmethod
+    @contextmanager
+    def without_implicit_wait(driver):
+        """Temporarily disable the implicit wait (only set in WAIT_MODE=implicit)."""
+        if Config.WAIT_MODE != "implicit" or not Config.IMPLICIT_WAIT:
+            yield
+            return
+        driver.implicitly_wait(0)
+        try:
+            yield
+        finally:
+            driver.implicitly_wait(Config.IMPLICIT_WAIT)
+    
+    @staticmethod
+    def _until(driver, condition, timeout, message=""):
+        """Single entry point for every explicit wait (profiled when enabled)."""
+        with profiler.wait_span():
+            return WebDriverWait(driver, timeout).until(condition, message)
+    
+    @staticmethod
+    def _until_or_now(driver, condition, timeout, message):
+        """Check the condition immediately; only start polling if it is not met yet.
+
+        With timeout=0 the condition is evaluated exactly once. WebDriverWait
+        compares the clock only after a failed check and can still sleep one
+        poll interval when the check returns within the clock's resolution.
+        """
+        result = condition(driver)
+        if result:
+            return result
+        if not timeout:
+            raise TimeoutException(message)
+        return WaitHelper._until(driver, condition, timeout, message)
+    
+    @staticmethod
+    def _until_state(driver, targets, condition, timeout, message="", pick=lambda name, element: element):
+        """Wait for element states, with learned timeouts when ADAPTIVE_WAITS is on.
+
+        Waits for elements to appear use the per-locator timeout from
+        wait_stats (never above `timeout`) and record how long they took,
+        unless the element was already there: those ~0s samples would pull
+        every learned timeout down to ADAPTIVE_WAIT_MIN. Waits for elements
+        to go away keep `timeout`.
+        """
+        if targets[0][2] in (ABSENT, HIDDEN):
+            return WaitHelper._wait_state(driver, targets, condition, timeout, message, pick)[0]
+        
+        static = timeout
+        timeout = wait_stats.timeout_for([target[1] for target in targets], static)
+        started = time.monotonic()
+        try:
+            result, waited = WaitHelper._wait_state(driver, targets, condition, timeout, message, pick)
+        except TimeoutException:
+            if timeout < static:
+                logger.info("Gave up on %s after the learned %.1fs (static timeout %ss)",
+                            ", ".join(str(target[1]) for target in targets), timeout, static)
+            raise
+        if not waited:
+            return result
+        found = next((target for target in targets if target[0] == result), targets[0])
+        wait_stats.record(found[1], time.monotonic() - started)
+        return result
+    
+    @staticmethod
+    def _wait_state(driver, targets, condition, timeout, message, pick):
+        """Wait for element states, in the page when WAIT_BACKEND=observer.
+
+        targets describe `condition` for dom_wait.wait_in_page(); `pick` turns
+        its (name, element) answer into what the polling condition would have
+        returned. When scripts cannot run (or the page navigates mid-wait)
+        the rest of the timeout is spent polling `condition` instead.
+        Returns (result, waited); waited is False when the state already
+        held at the first check.
+        """
+        checks = 0
+        
+        def counted(driver):
+            nonlocal checks
+            checks += 1
+            return condition(driver)
+        
+        if not timeout:
+            return WaitHelper._until_or_now(driver, counted, timeout, message), False
+        if Config.WAIT_BACKEND != "observer":
+            return WaitHelper._until(driver, counted, timeout, message), checks > 1
+        
+        started = time.monotonic()
+        try:
+            with profiler.wait_span():
+                found = wait_in_page(driver, targets, timeout)
+            if found:
+                return pick(found[0], found[1]), found[2]
+        except WebDriverException:
+            logger.debug("In-page wait failed, polling instead", exc_info=True)
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            raise TimeoutException(message)
+        return WaitHelper._until(driver, counted, remaining, message), checks > 1
+    
     @staticmethod
     def wait_for_element_visible(driver, locator, timeout=Config.EXPLICIT_WAIT):
         """Wait for an element to be visible on the page."""
-        wait = WebDriverWait(driver, timeout)
-        return wait.until(EC.visibility_of_element_located(locator))
+        return WaitHelper._until_state(driver, [("element", locator, VISIBLE)],
+                                       EC.visibility_of_element_located(locator), timeout)
     
     @staticmethod
     def wait_element_clickable(driver, locator, timeout=Config.EXPLICIT_WAIT):
         """Wait for an element to be clickable on the page."""
-        wait = WebDriverWait(driver, timeout)
-        return wait.until(EC.element_to_be_clickable(locator))
+        return WaitHelper._until_state(driver, [("element", locator, CLICKABLE)],
+                                       EC.element_to_be_clickable(locator), timeout)
     
     @staticmethod
     def wait_for_element_presence(driver, locator, timeout=Config.EXPLICIT_WAIT):
         """Wait for an element to be present in the DOM."""
-        wait = WebDriverWait(driver, timeout)
-        return wait.until(EC.presence_of_element_located(locator))
+        return WaitHelper._until_state(driver, [("element", locator, PRESENT)],
+                                       EC.presence_of_element_located(locator), timeout)
     
     @staticmethod
     def wait_for_element_text_visible(driver, locator, text, timeout=Config.EXPLICIT_WAIT):
         """Wait for an element to contain specific text."""
-        wait = WebDriverWait(driver, timeout)
-        return wait.until(EC.text_to_be_present_in_element(locator, text))
\ No newline at end of file
+        return WaitHelper._until_state(driver, [("element", locator, TEXT, text)],
+                                       EC.text_to_be_present_in_element(locator, text), timeout,
+                                       pick=lambda name, element: True)
+    
+    @staticmethod
+    def wait_for_any(driver, locators, timeout=Config.EXPLICIT_WAIT):
+        """Wait until any of several elements is visible and return its name.
+
+        locators: {name: locator} checked in order on every poll, so one wait
+        resolves as soon as the first outcome renders instead of timing out
+        on each candidate in turn. Raises TimeoutException if none appears.
+        """
+        def first_visible(driver):
+            for name, locator in locators.items():
+                try:
+                    if any(element.is_displayed() for element in driver.find_elements(*locator)):
+                        return name
+                except StaleElementReferenceException:
+                    continue
+            return False
+
+        with WaitHelper.without_implicit_wait(driver):
+            return WaitHelper._until_state(driver, [(name, locator, VISIBLE) for name, locator in locators.items()],
+                                           first_visible, timeout, pick=lambda name, element: name)
+    
+    @staticmethod
+    def wait_until(driver, condition, timeout=Config.EXPLICIT_WAIT, message=""):
+        """Wait for any `condition(driver)` to return a truthy value (timeout=0 checks once)."""
+        return WaitHelper._until_or_now(driver, condition, timeout, message)
+    
+    @staticmethod
+    def wait_for_element_absent(driver, locator, timeout=0):
+        """Wait until no element matches the locator (timeout=0 checks once)."""
+        with WaitHelper.without_implicit_wait(driver):
+            return WaitHelper._until_state(driver, [("element", locator, ABSENT)],
+                                           lambda d: not d.find_elements(*locator), timeout,
+                                           f"Element {locator} is still present", pick=lambda name, element: True)
+    
+    @staticmethod
+    def wait_for_element_not_visible(driver, locator, timeout=0):
+        """Wait until the element is hidden or gone (timeout=0 checks once)."""
+        with WaitHelper.without_implicit_wait(driver):
+            return WaitHelper._until_state(driver, [("element", locator, HIDDEN)],
+                                           EC.invisibility_of_element_located(locator), timeout,
+                                           f"Element {locator} is still visible", pick=lambda name, element: True)
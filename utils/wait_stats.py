@@ -0,0 +1,131 @@
+import logging
+import os
+import sqlite3
+import statistics
+import time
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wait_samples (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    locator TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS wait_samples_locator ON wait_samples (locator, id);
+"""
+
+
+def locator_key(locator) -> str:
+    by, value = locator
+    return f"{by}={value}"
+
+
+class WaitStats:
+    """How long each locator took to appear, and the timeouts learned from it (Config.ADAPTIVE_WAITS).
+
+    WaitHelper records the time every successful wait took. `timeout_for()`
+    turns the recent samples of a locator into
+        percentile(ADAPTIVE_WAIT_PERCENTILE) * ADAPTIVE_WAIT_FACTOR,
+    bounded below by ADAPTIVE_WAIT_MIN and above by the caller's static
+    timeout, so a check for an element that is not coming gives up once the
+    wait is far beyond anything seen before. Locators with fewer than
+    ADAPTIVE_WAIT_SAMPLES samples keep the static timeout.
+
+    Samples are read from SQLite on first use and written back by `flush()`
+    at the end of the run; parallel workers share the file. Any database
+    problem is logged and treated as "no history", which keeps the static
+    timeouts. When disabled nothing is read or recorded.
+    """
+
+    def __init__(self, enabled=Config.ADAPTIVE_WAITS, db_path=Config.ADAPTIVE_WAIT_DB,
+                 keep=Config.ADAPTIVE_WAIT_KEEP):
+        self.enabled = enabled
+        self.db_path = db_path
+        self.keep = keep
+        self._samples = None
+        self._pending = []
+
+    #----------------------------------- Storage -----------------------------------#
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def _load(self) -> dict:
+        if self._samples is not None:
+            return self._samples
+        self._samples = {}
+        if not os.path.exists(self.db_path):
+            return self._samples
+        try:
+            connection = self._connect()
+            try:
+                rows = connection.execute("SELECT locator, seconds FROM wait_samples ORDER BY id").fetchall()
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            logger.warning("Wait history unavailable, using static timeouts", exc_info=True)
+            return self._samples
+        for locator, seconds in rows:
+            self._samples.setdefault(locator, []).append(seconds)
+        for locator, samples in self._samples.items():
+            del samples[:-self.keep]
+        return self._samples
+
+    def flush(self) -> None:
+        """Write the samples recorded in this run and drop all but the last `keep` per locator."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO wait_samples (locator, seconds, recorded_at) VALUES (?, ?, ?)", pending)
+                    connection.execute("""
+                        DELETE FROM wait_samples WHERE id IN (
+                            SELECT id FROM (
+                                SELECT id, ROW_NUMBER() OVER (PARTITION BY locator ORDER BY id DESC) AS position
+                                FROM wait_samples
+                            ) WHERE position > ?
+                        )""", (self.keep,))
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            logger.warning("Could not save %d wait sample(s)", len(pending), exc_info=True)
+
+    #----------------------------------- Timeouts -----------------------------------#
+
+    def record(self, locator, seconds) -> None:
+        if not self.enabled:
+            return
+        key = locator_key(locator)
+        samples = self._load().setdefault(key, [])
+        samples.append(seconds)
+        del samples[:-self.keep]
+        self._pending.append((key, seconds, time.time()))
+
+    def timeout_for(self, locators, timeout) -> float:
+        """Adaptive timeout for a wait on any of `locators`; `timeout` is the static upper bound."""
+        if not self.enabled or not timeout:
+            return timeout
+        learned = []
+        for locator in locators:
+            samples = self._load().get(locator_key(locator), [])
+            if len(samples) < max(2, Config.ADAPTIVE_WAIT_SAMPLES):
+                return timeout
+            percentile = statistics.quantiles(samples, n=100, method="inclusive")[Config.ADAPTIVE_WAIT_PERCENTILE - 1]
+            learned.append(percentile * Config.ADAPTIVE_WAIT_FACTOR)
+        return min(timeout, max(Config.ADAPTIVE_WAIT_MIN, *learned))
+
+
+# Shared by WaitHelper and features/environment.py
+wait_stats = WaitStats()